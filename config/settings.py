@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 import os
+import re
 
 load_dotenv()
 
@@ -16,9 +17,39 @@ def get_env_int(var_name, default=0):
 
 DB_PORT = get_env_int("DB_PORT", 3306)
 DB_POOL_SIZE = get_env_int("DB_POOL_SIZE", 10)
+DB_POOL_TIMEOUT = get_env_int("DB_POOL_TIMEOUT", 5)
+DB_REPLICA_MAX_LAG = get_env_int("DB_REPLICA_MAX_LAG", 5)
+PROFILING = get_env_int("PROFILING", 0)
+PROFILE_CPROFILE = get_env_int("PROFILE_CPROFILE", 0)
+PROFILE_TOP_SPANS = get_env_int("PROFILE_TOP_SPANS", 20)
+RPC_REPLAY_DELAY = get_env_int("RPC_REPLAY_DELAY", 100)
 USER_SUBSCRIPTION_LIMIT = get_env_int("USER_SUBSCRIPTION_LIMIT", 4)
 UPDATE_INTERVAL = get_env_int("UPDATE_INTERVAL", 5)
 NOTIFY_INTERVAL = get_env_int("NOTIFY_INTERVAL", 5)
+UPDATE_WORKERS = get_env_int("UPDATE_WORKERS", 1)
+UPDATE_COLD_EVERY = get_env_int("UPDATE_COLD_EVERY", 6)
+UPDATE_HOT_POWER_MARGIN = get_env_int("UPDATE_HOT_POWER_MARGIN", 10)
+HISTORY_RETENTION_DAYS = get_env_int("HISTORY_RETENTION_DAYS", 90)
+HISTORY_DISPLAY_LIMIT = get_env_int("HISTORY_DISPLAY_LIMIT", 10)
+VIEW_PAGE_SIZE = get_env_int("VIEW_PAGE_SIZE", 5)
+VIEW_CACHE_SIZE = get_env_int("VIEW_CACHE_SIZE", 1024)
+FIND_RESULT_LIMIT = get_env_int("FIND_RESULT_LIMIT", 10)
+LIVENESS_WINDOW = get_env_int("LIVENESS_WINDOW", 100)
+LIVENESS_MISS_THRESHOLD = get_env_int("LIVENESS_MISS_THRESHOLD", 10)
+LIVENESS_MIN_BLOCKS = get_env_int("LIVENESS_MIN_BLOCKS", LIVENESS_WINDOW)
+LIVENESS_INTERVAL = get_env_int("LIVENESS_INTERVAL", 30)
+BLOCK_SUBSCRIPTION = get_env_int("BLOCK_SUBSCRIPTION", 0)
+BLOCK_POLL_INTERVAL = get_env_int("BLOCK_POLL_INTERVAL", 6)
+BLOCK_RECONNECT_MAX_DELAY = get_env_int("BLOCK_RECONNECT_MAX_DELAY", 60)
+PROPOSAL_FETCH_BATCH = get_env_int("PROPOSAL_FETCH_BATCH", 16)
+COMMAND_RATE_LIMIT = get_env_int("COMMAND_RATE_LIMIT", 20)
+COMMAND_BURST = get_env_int("COMMAND_BURST", 5)
+JOB_BATCH_SIZE = get_env_int("JOB_BATCH_SIZE", 50)
+JOB_LEASE_SECONDS = get_env_int("JOB_LEASE_SECONDS", 300)
+CHANGE_RETENTION_DAYS = get_env_int("CHANGE_RETENTION_DAYS", 30)
+COMPACTION_BATCH_SIZE = get_env_int("COMPACTION_BATCH_SIZE", 500)
+COMPACTION_INTERVAL = get_env_int("COMPACTION_INTERVAL", 60)
+WEBHOOK_PORT = get_env_int("WEBHOOK_PORT", 8080)
 
 DB_CONFIG = {
     'user': os.getenv('DB_USER', 'default_user'),
@@ -30,5 +61,42 @@ DB_CONFIG = {
     'collation': os.getenv('DB_COLLATION', 'utf8mb4_unicode_ci'),
 }
 
+# Optional read replica for command queries; it shares the primary's credentials and database name.
+if os.getenv('DB_REPLICA_HOST'):
+    DB_CONFIG['replica'] = {
+        'host': os.getenv('DB_REPLICA_HOST'),
+        'port': get_env_int('DB_REPLICA_PORT', DB_PORT),
+    }
+
+# "mysql" uses DB_CONFIG; "sqlite" keeps everything in the file at SQLITE_PATH.
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "namada_bot.db")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# "live" talks to the node; "record" also writes every RPC request/response to RPC_TAPE_PATH, "replay" answers from it.
+RPC_MODE = os.getenv("RPC_MODE", "live")
+RPC_TAPE_PATH = os.getenv("RPC_TAPE_PATH", "rpc_tape.jsonl")
+
 NAMADA_RPC_URL = os.getenv("NAMADA_RPC_URL")
+# Chains followed by this process, as comma separated "name=rpc_url" pairs. Without NAMADA_CHAINS the bot follows
+# NAMADA_RPC_URL as a single chain called CHAIN_NAME. The first chain is the default one for commands.
+CHAIN_NAME = os.getenv("CHAIN_NAME", "namada")
+CHAINS = {name.strip(): rpc_url.strip() for name, rpc_url in (
+    pair.split("=", 1) for pair in os.getenv("NAMADA_CHAINS", "").split(",") if pair.strip())} \
+    or {CHAIN_NAME: NAMADA_RPC_URL}
+# Chain names are stored in the VARCHAR(16) chain_id column and written into the DDL of schema migration 5.
+for chain_name in CHAINS:
+    if not re.fullmatch(r"[A-Za-z0-9_.-]{1,16}", chain_name):
+        raise ValueError(f"Invalid chain name {chain_name!r}: use 1 to 16 letters, digits, '.', '_' or '-'.")
+DEFAULT_CHAIN = next(iter(CHAINS))
+NAMADA_RPC_URL = CHAINS[DEFAULT_CHAIN]
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+if BOT_MODE not in ("polling", "webhook"):
+    raise ValueError(f"BOT_MODE must be 'polling' or 'webhook', not {BOT_MODE!r}.")
+if BOT_MODE == "webhook" and not (WEBHOOK_URL or "").startswith("https://"):
+    raise ValueError("BOT_MODE=webhook needs WEBHOOK_URL, the public https:// URL Telegram sends updates to.")
@@ -1,20 +1,42 @@
 import logging
 import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
 import mysql.connector
 from mysql.connector import pooling
-from config.settings import DB_POOL_SIZE
+from config.settings import DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_REPLICA_MAX_LAG, DB_BACKEND, SQLITE_PATH
+from service.metrics import metrics
+from service.profiling import span
 
 logger = logging.getLogger(__name__)
 
+# Server-side prepared statements kept open per connection; the least recently used one is closed beyond that.
+STATEMENT_CACHE_SIZE = 64
+PREPARED_VERBS = ('INSERT', 'UPDATE', 'DELETE')
+# How long a replica lag measurement is trusted before it is taken again.
+REPLICA_CHECK_INTERVAL = 10
+
 
 class DatabaseManager:
     _instance = None
     _lock = threading.Lock()
     _pool = None
+    _replica_pool = None
+    _replica_checked = None
+    _replica_usable = False
+    _local = threading.local()
+    _statements = weakref.WeakKeyDictionary()
     _charset = 'utf8mb4'
     _collation = 'utf8mb4_unicode_ci'
 
     def __new__(cls, db_config=None, pool_name="mypool", pool_size=DB_POOL_SIZE):
+        if DB_BACKEND == 'sqlite':
+            # Same API on an embedded database; see db.sqlite_manager.
+            from db.sqlite_manager import SQLiteDatabaseManager
+            return SQLiteDatabaseManager(SQLITE_PATH)
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
@@ -31,6 +53,7 @@ class DatabaseManager:
         cls._collation = db_config.get('collation', cls._collation)
         temp_config = db_config.copy()
         database = temp_config.pop('database', None)
+        replica = temp_config.pop('replica', None)
 
         # Connect without specifying the database to check existence / create it
         cls.create_database(temp_config, database)
@@ -39,12 +62,32 @@ class DatabaseManager:
         db_config_with_db = temp_config.copy()
         db_config_with_db['database'] = database
         try:
-            cls._pool = pooling.MySQLConnectionPool(pool_name=pool_name, pool_size=pool_size, **db_config_with_db)
+            cls._pool = cls._create_pool(pool_name, pool_size, db_config_with_db)
             logger.info("Database connection pool created successfully.")
         except mysql.connector.Error as err:
             logger.error(f"Error creating database connection pool: {err}")
             raise
 
+        if replica:
+            try:
+                cls._replica_pool = cls._create_pool(f"{pool_name}_replica", pool_size,
+                                                     {**db_config_with_db, **replica})
+                logger.info(f"Read replica pool for {replica['host']} created successfully.")
+            except mysql.connector.Error as err:
+                # Reads keep working on the primary; the replica is simply not used by this process.
+                logger.error(f"Error creating read replica pool, reading from the primary: {err}")
+
+    @staticmethod
+    def _create_pool(pool_name, pool_size, db_config):
+        """
+        Sessions are not reset when a connection goes back to the pool, since that would drop its prepared
+        statements. The connections run in autocommit mode instead: a read outside transaction() would otherwise
+        leave a REPEATABLE READ transaction open on the pooled connection, and every later checkout would keep
+        reading from that old snapshot. transaction() still opens an explicit transaction for its block.
+        """
+        return pooling.MySQLConnectionPool(pool_name=pool_name, pool_size=pool_size, pool_reset_session=False,
+                                           autocommit=True, **db_config)
+
     @staticmethod
     def create_database(db_config, database_name):
         """
@@ -66,25 +109,195 @@ class DatabaseManager:
             logger.error(f"Failed to ensure database exists: {err}")
             raise
 
-    def execute_query(self, query, params=None, commit=False):
+    def _checkout(self, pool=None):
+        """
+        Take a connection from the pool, waiting up to DB_POOL_TIMEOUT seconds while all of them are in use.
+        The time spent waiting is exported as a metric.
+        """
+        pool = pool or self._pool
+        started = time.perf_counter()
+        while True:
+            try:
+                conn = pool.get_connection()
+                break
+            except mysql.connector.errors.PoolError:
+                if time.perf_counter() - started >= DB_POOL_TIMEOUT:
+                    metrics.inc("db_pool_timeouts_total")
+                    raise
+                time.sleep(0.005)
+        metrics.inc("db_pool_checkouts_total")
+        metrics.inc("db_pool_wait_seconds_total", time.perf_counter() - started)
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """
+        The connection of the current transaction() on this thread, or one checked out for a single statement.
+        Statements outside a transaction are rolled back here when they fail.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self._checkout()
+        try:
+            yield conn
+        except mysql.connector.Error:
+            try:
+                conn.rollback()
+            except mysql.connector.Error:
+                pass
+            raise
+        finally:
+            conn.close()
+
+    def _commit(self, conn):
+        # Inside a transaction() the commit happens once, when the block ends.
+        if getattr(self._local, 'conn', None) is None:
+            conn.commit()
+
+    def _prepared_cursor(self, conn, query):
+        """
+        Return a cursor holding `query` as a server-side prepared statement on this connection, and the query
+        object to execute it with: the cursor only skips re-preparing when it is given the very same string.
+        """
+        cnx = getattr(conn, '_cnx', conn)
+        connection_id, cache = self._statements.get(cnx, (None, None))
+        if cache is None or connection_id != cnx.connection_id:
+            # New connection, or a reconnect that dropped the statements prepared on the previous session.
+            cache = OrderedDict()
+            self._statements[cnx] = (cnx.connection_id, cache)
+        entry = cache.get(query)
+        if entry is None:
+            entry = cache[query] = (conn.cursor(prepared=True), query)
+            if len(cache) > STATEMENT_CACHE_SIZE:
+                _, (evicted, _) = cache.popitem(last=False)
+                evicted.close()
+        else:
+            cache.move_to_end(query)
+        return entry
+
+    def execute_query(self, query, params=None, commit=False, model=None):
         """
         Execute a SQL query with the given parameters.
+        Rows are returned as dictionaries, or as instances of `model` (see db.models) when one is given.
+        Writes run as cached prepared statements. Reads stay on the text protocol: the binary protocol returns
+        FLOAT columns at single precision, so a stored commission rate would no longer equal the fetched one.
         """
         try:
-            with self._pool.get_connection() as conn:
-                with conn.cursor(dictionary=True) as cursor:
+            with span("db.write" if commit else "db.read"), self._connection() as conn:
+                if commit and query.lstrip()[:6].upper() in PREPARED_VERBS:
+                    cursor, prepared_query = self._prepared_cursor(conn, query)
+                    cursor.execute(prepared_query, params)
+                    self._commit(conn)
+                    return cursor.rowcount
+                with conn.cursor(dictionary=model is None) as cursor:
                     cursor.execute(query, params)
                     if commit:
-                        conn.commit()
+                        self._commit(conn)
                         return cursor.rowcount
+                    elif model is not None:
+                        columns = cursor.column_names
+                        return [model.from_columns(columns, row) for row in cursor.fetchall()]
                     else:
                         return cursor.fetchall()
         except mysql.connector.Error as err:
             logger.error(f"Error executing query: {err}")
-            if commit:
-                conn.rollback()
             raise
 
+    def execute_read(self, query, params=None, model=None):
+        """
+        Run a read-only query on the read replica when one is configured and no more than DB_REPLICA_MAX_LAG
+        seconds behind; otherwise, or when the replica fails, on the primary. Inside a transaction() reads
+        always go to the primary, so they see the transaction's own writes.
+        """
+        if self._replica_pool is None or getattr(self._local, 'conn', None) is not None or not self._replica_ready():
+            return self.execute_query(query, params, model=model)
+        try:
+            with span("db.read_replica"):
+                conn = self._checkout(self._replica_pool)
+                try:
+                    with conn.cursor(dictionary=model is None) as cursor:
+                        cursor.execute(query, params)
+                        rows = cursor.fetchall()
+                        if model is not None:
+                            columns = cursor.column_names
+                            rows = [model.from_columns(columns, row) for row in rows]
+                finally:
+                    conn.close()
+        except mysql.connector.Error as err:
+            logger.error(f"Read replica query failed, retrying on the primary: {err}")
+            metrics.inc("db_replica_fallbacks_total")
+            DatabaseManager._replica_usable = False
+            return self.execute_query(query, params, model=model)
+        metrics.inc("db_replica_reads_total")
+        return rows
+
+    def _replica_ready(self):
+        """Whether the replica is within the staleness bound, re-measured at most every REPLICA_CHECK_INTERVAL."""
+        now = time.monotonic()
+        if self._replica_checked is not None and now - self._replica_checked < REPLICA_CHECK_INTERVAL:
+            return self._replica_usable
+        DatabaseManager._replica_checked = now
+        try:
+            conn = self._checkout(self._replica_pool)
+            try:
+                with conn.cursor(dictionary=True) as cursor:
+                    cursor.execute("SHOW REPLICA STATUS")
+                    status = cursor.fetchone()
+            finally:
+                conn.close()
+        except mysql.connector.Error as err:
+            logger.error(f"Could not read replica status, reading from the primary: {err}")
+            DatabaseManager._replica_usable = False
+            return False
+
+        if status is None:
+            # Not a replica of anything, e.g. a second standalone instance used for testing: nothing to lag behind.
+            lag = 0
+        else:
+            lag = status.get('Seconds_Behind_Source')
+        usable = lag is not None and lag <= DB_REPLICA_MAX_LAG
+        if usable != self._replica_usable:
+            logger.info(f"Read replica {'in use' if usable else 'bypassed'} (lag: {lag}).")
+        if lag is not None:
+            metrics.set("db_replica_lag_seconds", lag)
+        DatabaseManager._replica_usable = usable
+        return usable
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: every statement issued on this thread inside the block, through the yielded Transaction
+        or through the regular methods of this manager, shares one pooled connection and is committed together.
+        Any exception inside the block rolls all of them back. Nested blocks join the outer one.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield Transaction(conn)
+            return
+        conn = self._checkout()
+        self._local.conn = conn
+        try:
+            conn.start_transaction()
+            yield Transaction(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            conn.close()
+
+    def table_exists(self, table_name):
+        """
+        Whether the table exists in the current database.
+        """
+        rows = self.execute_query(
+            "SELECT COUNT(*) AS tables FROM information_schema.tables WHERE table_schema = DATABASE() "
+            "AND table_name = %s", (table_name,))
+        return rows[0]['tables'] > 0
+
     def create_table(self, table_name, columns, constraints=None):
         """
         Create a new table with the given name, columns, and optional constraints.
@@ -100,6 +313,19 @@ class DatabaseManager:
             logger.error(f"Failed to create table `{table_name}`: {err}")
             raise
 
+    def create_index(self, table_name, index_name, columns, unique=False):
+        """
+        Add an index over the given columns to an existing table.
+        """
+        column_list = ", ".join([f"`{column}`" for column in columns])
+        query = f"CREATE {'UNIQUE ' if unique else ''}INDEX `{index_name}` ON `{table_name}` ({column_list})"
+        try:
+            self.execute_query(query, commit=True)
+            logger.info(f"Index `{index_name}` created on table `{table_name}` successfully.")
+        except mysql.connector.Error as err:
+            logger.error(f"Failed to create index `{index_name}` on table `{table_name}`: {err}")
+            raise
+
     def insert_data(self, table_name, data):
         """
         Insert a new record into the specified table.
@@ -114,6 +340,27 @@ class DatabaseManager:
             logger.error(f"Failed to insert data into table `{table_name}`: {err}")
             raise
 
+    def insert_many(self, table_name, rows, ignore=False):
+        """
+        Insert several records sharing the same columns into the specified table in one batch.
+        With `ignore`, rows that would violate a unique key are skipped instead of failing the batch.
+        """
+        if not rows:
+            return 0
+        columns = ", ".join([f"`{column}`" for column in rows[0].keys()])
+        placeholders = ", ".join(["%s"] * len(rows[0]))
+        query = f"INSERT {'IGNORE ' if ignore else ''}INTO `{table_name}` ({columns}) VALUES ({placeholders})"
+        try:
+            with span("db.write"), self._connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.executemany(query, [tuple(row.values()) for row in rows])
+                    self._commit(conn)
+                    logger.info(f"Inserted {cursor.rowcount} row(s) into table `{table_name}` successfully.")
+                    return cursor.rowcount
+        except mysql.connector.Error as err:
+            logger.error(f"Failed to insert data into table `{table_name}`: {err}")
+            raise
+
     def insert_data_and_get_id(self, table_name, data):
         """
         Insert a new record into the specified table and return the ID of the new record.
@@ -122,16 +369,13 @@ class DatabaseManager:
         placeholders = ", ".join(["%s"] * len(data))
         query = f"INSERT INTO `{table_name}` ({columns}) VALUES ({placeholders})"
         try:
-            with self._pool.get_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute(query, tuple(data.values()))
-                    conn.commit()
-                    cursor.execute("SELECT LAST_INSERT_ID()")
-                    last_id = cursor.fetchone()[0]  # Assuming LAST_INSERT_ID() returns a single value
-                    return last_id
+            with span("db.write"), self._connection() as conn:
+                cursor, prepared_query = self._prepared_cursor(conn, query)
+                cursor.execute(prepared_query, tuple(data.values()))
+                self._commit(conn)
+                return cursor.lastrowid
         except mysql.connector.Error as err:
             logger.error(f"Failed to insert data into table `{table_name}` and get ID: {err}")
-            conn.rollback()
             raise
 
     def update_data(self, table_name, data, conditions):
@@ -161,3 +405,43 @@ class DatabaseManager:
         except mysql.connector.Error as err:
             logger.error(f"Failed to delete from table `{table_name}`: {err}")
             raise
+
+
+class Transaction:
+    """
+    Statements issued inside DatabaseManager.transaction(). They are committed or rolled back together by the
+    context manager, never individually.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        """Run a statement; returns the rows as dictionaries for queries, the affected row count otherwise."""
+        with self.conn.cursor(dictionary=True) as cursor:
+            cursor.execute(query, params)
+            if cursor.with_rows:
+                return cursor.fetchall()
+            return cursor.rowcount
+
+    def insert_many(self, table_name, rows):
+        """Insert several records sharing the same columns with a single multi-row INSERT statement."""
+        if not rows:
+            return 0
+        columns = ", ".join([f"`{column}`" for column in rows[0].keys()])
+        row_placeholders = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+        query = f"INSERT INTO `{table_name}` ({columns}) VALUES {', '.join([row_placeholders] * len(rows))}"
+        return self.execute(query, tuple(value for row in rows for value in row.values()))
+
+
+class LazyDatabaseManager:
+    """
+    Module-level stand-in for DatabaseManager(db_config): the connection pool is only created on first use,
+    so importing a service module does not open database connections.
+    """
+
+    def __init__(self, db_config):
+        self._db_config = db_config
+
+    def __getattr__(self, name):
+        return getattr(DatabaseManager(self._db_config), name)
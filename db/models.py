@@ -0,0 +1,65 @@
+class Record:
+    """
+    Base for compact row types. Subclasses only declare __slots__, so instances carry no per-object __dict__,
+    which keeps a full validator snapshot small in memory (see scripts/measure_snapshot_memory.py).
+    """
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a record from a dictionary row; columns that are not fields are ignored."""
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(record, name, row.get(name))
+        return record
+
+    @classmethod
+    def from_columns(cls, columns, values):
+        """Build a record straight from a cursor tuple and its column names."""
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(record, name, None)
+        for name, value in zip(columns, values):
+            if name in cls.__slots__:
+                setattr(record, name, value)
+        return record
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class ValidatorRecord(Record):
+    __slots__ = ('validator_id', 'chain_id', 'validator_address', 'tendermint_address', 'voting_power', 'email',
+                 'description', 'website', 'discord_handle', 'avatar', 'commission_rate', 'max_commission_change',
+                 'state')
+
+    def to_row(self):
+        """Column values for insert/update; the auto-increment id is left to the database."""
+        row = self.as_dict()
+        del row['validator_id']
+        return row
+
+
+class ChangeEvent(Record):
+    """Difference between the stored and the freshly fetched values of one validator."""
+    __slots__ = ('validator_id', 'previous_power', 'new_power', 'previous_state', 'new_state', 'previous_rate',
+                 'new_rate', 'max_commission_change')
+
+    @property
+    def state_changed(self):
+        return self.previous_state != self.new_state
+
+    @property
+    def rate_changed(self):
+        return self.previous_rate != self.new_rate
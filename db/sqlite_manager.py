@@ -0,0 +1,322 @@
+import functools
+import logging
+import queue
+import re
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+
+from db.database_manager import Transaction
+from service.profiling import span
+
+logger = logging.getLogger(__name__)
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter('DATETIME', lambda value: datetime.fromisoformat(value.decode()))
+
+_AUTO_INCREMENT = re.compile(r'\b(?:BIG)?INT AUTO_INCREMENT PRIMARY KEY\b', re.IGNORECASE)
+_INDEX = re.compile(r'^INDEX\s+(\w+)\s*(\(.*\))$', re.IGNORECASE)
+_UNIQUE_KEY = re.compile(r'^UNIQUE KEY\s+\w+\s*(\(.*\))$', re.IGNORECASE)
+_FOR_UPDATE = re.compile(r'\s+FOR UPDATE\b', re.IGNORECASE)
+
+# Sentinels closing a transaction on the writer thread.
+_COMMIT = object()
+_ROLLBACK = object()
+
+
+@functools.lru_cache(maxsize=512)
+def translate(query):
+    """
+    Rewrite a statement written for MySQL into SQLite's dialect. The queries of this project are built from a
+    small, fixed set of strings, so the rewritten text is cached and sqlite3 reuses its compiled statement.
+    """
+    query = query.replace('%s', '?').replace('INSERT IGNORE', 'INSERT OR IGNORE')
+    # The single writer thread already serializes writers, so row locks are not needed.
+    return _FOR_UPDATE.sub('', query)
+
+
+def translate_column(properties):
+    properties = _AUTO_INCREMENT.sub('INTEGER PRIMARY KEY AUTOINCREMENT', properties)
+    # MySQL fills CURRENT_TIMESTAMP in the session time zone, SQLite in UTC; keep local time like MySQL does.
+    return properties.replace("DEFAULT CURRENT_TIMESTAMP", "DEFAULT (datetime('now', 'localtime'))")
+
+
+def fetch_rows(cursor):
+    """Rows of a finished statement as dictionaries, or the affected row count for statements without rows."""
+    if cursor.description is None:
+        return cursor.rowcount
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class SQLiteTransaction(Transaction):
+    """Statements of one transaction, handed one by one to the writer thread that holds it open."""
+
+    def __init__(self, statements):
+        super().__init__(conn=None)
+        self._statements = statements
+
+    def run(self, func):
+        """Run func(conn) on the writer thread, inside this transaction."""
+        future = Future()
+        self._statements.put((func, future))
+        return future.result()
+
+    def execute(self, query, params=None):
+        query = translate(query)
+        return self.run(lambda conn: fetch_rows(conn.execute(query, params or ())))
+
+
+class SQLiteDatabaseManager:
+    """
+    Embedded SQLite storage with the same API as the MySQL DatabaseManager, for single-instance deployments.
+
+    The database runs in WAL mode so reads never wait for the writer. Reads use one connection per thread;
+    every write goes through a single writer thread and its own connection, which replaces SQLite's
+    busy-waiting between competing writers with a queue.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, path):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(SQLiteDatabaseManager, cls).__new__(cls)
+                    instance._initialize(path)
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self, path):
+        self._path = path
+        self._local = threading.local()
+        self._writes = queue.Queue()
+        threading.Thread(target=self._write_loop, name='sqlite-writer', daemon=True).start()
+        logger.info(f"SQLite database `{path}` opened.")
+
+    def _connect(self):
+        conn = sqlite3.connect(self._path, detect_types=sqlite3.PARSE_DECLTYPES, isolation_level=None,
+                               check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            func, future = self._writes.get()
+            try:
+                future.set_result(func(conn))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _submit(self, func):
+        future = Future()
+        self._writes.put((func, future))
+        return future
+
+    def _write(self, query, params, many=False):
+        """Run one write on the writer thread, in its own transaction unless a transaction() is open here."""
+        tx = getattr(self._local, 'tx', None)
+        if tx is not None:
+            with span("db.write"):
+                return tx.run(lambda conn: conn.executemany(query, params) if many else conn.execute(query, params))
+
+        def run(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.executemany(query, params) if many else conn.execute(query, params)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return cursor
+        with span("db.write"):
+            return self._submit(run).result()
+
+    def execute_query(self, query, params=None, commit=False, model=None):
+        """
+        Execute a SQL query with the given parameters.
+        Rows are returned as dictionaries, or as instances of `model` (see db.models) when one is given.
+        """
+        try:
+            tx = getattr(self._local, 'tx', None)
+            if tx is not None:
+                # Reads inside a transaction() go through the writer so they see its uncommitted writes.
+                with span("db.write" if commit else "db.read"):
+                    rows = tx.execute(query, params)
+            elif commit:
+                return self._write(translate(query), params or ()).rowcount
+            else:
+                with span("db.read"):
+                    rows = fetch_rows(self._reader().execute(translate(query), params or ()))
+            if model is not None and not isinstance(rows, int):
+                return [model.from_row(row) for row in rows]
+            return rows
+        except sqlite3.Error as err:
+            logger.error(f"Error executing query: {err}")
+            raise
+
+    def execute_read(self, query, params=None, model=None):
+        """Read-only query; an embedded database has no replica, so this is execute_query."""
+        return self.execute_query(query, params, model=model)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: every statement issued on this thread inside the block, through the yielded transaction
+        or through the regular methods of this manager, runs on the writer connection and is committed together.
+        Any exception inside the block rolls all of them back. Nested blocks join the outer one.
+        """
+        tx = getattr(self._local, 'tx', None)
+        if tx is not None:
+            yield tx
+            return
+
+        statements = queue.Queue()
+        begun = Future()
+
+        def run(conn):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+            except Exception as e:
+                begun.set_exception(e)
+                raise
+            begun.set_result(None)
+            while True:
+                item = statements.get()
+                if item is _COMMIT or item is _ROLLBACK:
+                    conn.execute("COMMIT" if item is _COMMIT else "ROLLBACK")
+                    return
+                func, future = item
+                try:
+                    future.set_result(func(conn))
+                except Exception as e:
+                    future.set_exception(e)
+
+        done = self._submit(run)
+        # Nothing reads the statements of a transaction that failed to begin, so the failure is raised here.
+        begun.result()
+        tx = self._local.tx = SQLiteTransaction(statements)
+        outcome = _ROLLBACK
+        try:
+            yield tx
+            outcome = _COMMIT
+        finally:
+            self._local.tx = None
+            statements.put(outcome)
+            done.result()
+
+    def table_exists(self, table_name):
+        """
+        Whether the table exists in the database.
+        """
+        rows = self.execute_query("SELECT COUNT(*) AS tables FROM sqlite_master WHERE type = 'table' AND name = %s",
+                                  (table_name,))
+        return rows[0]['tables'] > 0
+
+    def create_table(self, table_name, columns, constraints=None):
+        """
+        Create a new table with the given name, columns, and optional constraints.
+        MySQL inline INDEX definitions become separate CREATE INDEX statements.
+        """
+        definitions = [f"`{column}` {translate_column(properties)}" for column, properties in columns.items()]
+        indexes = []
+        for constraint in constraints or []:
+            index = _INDEX.match(constraint)
+            unique = _UNIQUE_KEY.match(constraint)
+            if index:
+                indexes.append(f"CREATE INDEX IF NOT EXISTS `{index.group(1)}` ON `{table_name}` {index.group(2)}")
+            elif unique:
+                definitions.append(f"UNIQUE {unique.group(1)}")
+            else:
+                definitions.append(constraint)
+        try:
+            self.execute_query(f"CREATE TABLE IF NOT EXISTS `{table_name}` ({', '.join(definitions)})", commit=True)
+            for index in indexes:
+                self.execute_query(index, commit=True)
+            logger.info(f"Table `{table_name}` created successfully.")
+        except sqlite3.Error as err:
+            logger.error(f"Failed to create table `{table_name}`: {err}")
+            raise
+
+    def create_index(self, table_name, index_name, columns, unique=False):
+        """
+        Add an index over the given columns to an existing table.
+        """
+        column_list = ", ".join([f"`{column}`" for column in columns])
+        query = f"CREATE {'UNIQUE ' if unique else ''}INDEX `{index_name}` ON `{table_name}` ({column_list})"
+        try:
+            self.execute_query(query, commit=True)
+            logger.info(f"Index `{index_name}` created on table `{table_name}` successfully.")
+        except sqlite3.Error as err:
+            logger.error(f"Failed to create index `{index_name}` on table `{table_name}`: {err}")
+            raise
+
+    def insert_data(self, table_name, data):
+        """
+        Insert a new record into the specified table.
+        """
+        self.insert_data_and_get_id(table_name, data)
+        logger.info(f"Data inserted into table `{table_name}` successfully.")
+
+    def insert_many(self, table_name, rows, ignore=False):
+        """
+        Insert several records sharing the same columns into the specified table in one batch.
+        With `ignore`, rows that would violate a unique key are skipped instead of failing the batch.
+        """
+        if not rows:
+            return 0
+        columns = ", ".join([f"`{column}`" for column in rows[0].keys()])
+        placeholders = ", ".join(["?"] * len(rows[0]))
+        query = f"INSERT {'OR IGNORE ' if ignore else ''}INTO `{table_name}` ({columns}) VALUES ({placeholders})"
+        try:
+            rowcount = self._write(query, [tuple(row.values()) for row in rows], many=True).rowcount
+            logger.info(f"Inserted {rowcount} row(s) into table `{table_name}` successfully.")
+            return rowcount
+        except sqlite3.Error as err:
+            logger.error(f"Failed to insert data into table `{table_name}`: {err}")
+            raise
+
+    def insert_data_and_get_id(self, table_name, data):
+        """
+        Insert a new record into the specified table and return the ID of the new record.
+        """
+        columns = ", ".join([f"`{column}`" for column in data.keys()])
+        placeholders = ", ".join(["?"] * len(data))
+        query = f"INSERT INTO `{table_name}` ({columns}) VALUES ({placeholders})"
+        try:
+            return self._write(query, tuple(data.values())).lastrowid
+        except sqlite3.Error as err:
+            logger.error(f"Failed to insert data into table `{table_name}` and get ID: {err}")
+            raise
+
+    def update_data(self, table_name, data, conditions):
+        """
+        Update records in the specified table that meet the given conditions.
+        """
+        set_clause = ", ".join([f"`{column}` = %s" for column in data.keys()])
+        where_clause = " AND ".join([f"`{column}` = %s" for column in conditions.keys()])
+        query = f"UPDATE `{table_name}` SET {set_clause} WHERE {where_clause}"
+        rows_affected = self.execute_query(query, tuple(data.values()) + tuple(conditions.values()), commit=True)
+        logger.info(f"Updated {rows_affected} row(s) in table `{table_name}` successfully.")
+
+    def delete_data(self, table_name, conditions):
+        """
+        Delete records from the specified table that meet the given conditions.
+        """
+        where_clause = " AND ".join([f"`{column}` = %s" for column in conditions.keys()])
+        rows_affected = self.execute_query(f"DELETE FROM `{table_name}` WHERE {where_clause}",
+                                           tuple(conditions.values()), commit=True)
+        logger.info(f"Deleted {rows_affected} row(s) from table `{table_name}` successfully.")
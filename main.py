@@ -1,12 +1,25 @@
+import time
+
+BOOT_STARTED = time.perf_counter()
+
 import asyncio
 import logging
+from datetime import datetime
 from telegram.ext import Application
-from config.settings import TELEGRAM_BOT_TOKEN, UPDATE_INTERVAL, NOTIFY_INTERVAL
+from config.settings import DB_CONFIG, TELEGRAM_BOT_TOKEN, UPDATE_INTERVAL, NOTIFY_INTERVAL, LIVENESS_INTERVAL, \
+    BLOCK_SUBSCRIPTION, BOT_MODE, COMPACTION_INTERVAL, CHAINS
+from db.database_manager import DatabaseManager
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from service.notify_users import notify_users
 from service.update_database import update_database
+from service.track_liveness import track_liveness
+from service.update_proposals import update_proposals
+from service.compact_changes import compact_changes
+from service.block_listener import listen_new_blocks
 from service.init_database import init_database
 from service.bot_commands import setup_handlers
+from service.snapshot import snapshot
+from service.search_index import search_index
 
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,19 +27,52 @@ logger = logging.getLogger(__name__)
 
 async def schedule_jobs():
     scheduler = AsyncIOScheduler()
-    scheduler.add_job(update_database, "interval", minutes=UPDATE_INTERVAL)
+    # Every chain is updated and tracked on its own schedule; notifications and compaction cover all of them.
+    for chain in CHAINS:
+        # Refresh validators right after boot instead of waiting a full interval.
+        update_job = scheduler.add_job(update_database, "interval", minutes=UPDATE_INTERVAL,
+                                       next_run_time=datetime.now(), kwargs={'chain': chain},
+                                       id=f"update_database.{chain}")
+        if BLOCK_SUBSCRIPTION:
+            # New blocks are pushed over the websocket and drive the liveness tracker and epoch updates.
+            asyncio.get_running_loop().create_task(listen_new_blocks(chain, update_job))
+        else:
+            scheduler.add_job(track_liveness, "interval", seconds=LIVENESS_INTERVAL, kwargs={'chain': chain},
+                              id=f"track_liveness.{chain}")
     scheduler.add_job(notify_users, "interval", minutes=NOTIFY_INTERVAL)
+    # The first run backfills every historical proposal, so it starts right away.
+    scheduler.add_job(update_proposals, "interval", minutes=UPDATE_INTERVAL, next_run_time=datetime.now())
+    scheduler.add_job(compact_changes, "interval", minutes=COMPACTION_INTERVAL)
     scheduler.start()
 
 
+def boot():
+    """Check the schema and load the validator snapshot so commands can be answered immediately."""
+    imports_done = time.perf_counter()
+    init_database()
+    schema_done = time.perf_counter()
+    snapshot.load(DatabaseManager(DB_CONFIG))
+    search_index.rebuild(snapshot.records())
+    snapshot_done = time.perf_counter()
+    logger.info(f"Boot completed in {(snapshot_done - BOOT_STARTED) * 1000:.0f} ms "
+                f"(imports {(imports_done - BOOT_STARTED) * 1000:.0f} ms, "
+                f"schema {(schema_done - imports_done) * 1000:.0f} ms, "
+                f"snapshot of {len(snapshot)} validator(s) {(snapshot_done - schema_done) * 1000:.0f} ms).")
+
+
 def main():
     loop = asyncio.get_event_loop()
     application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
     setup_handlers(application)
+    if BOT_MODE == "webhook":
+        # Imported here so polling deployments do not need aiohttp installed.
+        from service.webhook_server import run_webhook
+        loop.run_until_complete(run_webhook(application, schedule_jobs))
+        return
     loop.run_until_complete(schedule_jobs())
     application.run_polling()
 
 
 if __name__ == "__main__":
-    init_database()
+    boot()
     main()
@@ -1,3 +1,5 @@
+import json
+import time
 import uuid
 from typing import Any, Dict, Optional, Union, List, Tuple
 from urllib.parse import urljoin
@@ -6,7 +8,15 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from .spans import span
 from .result import Result
+from .rpc_tape import tape, request_key, replayed_result
+
+try:
+    # orjson is optional; it parses RPC responses straight from bytes several times faster than json.
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 
 class NamHTTPClient:
@@ -32,14 +42,39 @@ class NamHTTPClient:
 
     def send_request(self, endpoint: str, http_method: str = "GET", **kwargs) -> Result:
         url = urljoin(self.base_url, endpoint)
+        span_name = f"rpc.{endpoint.split('?', 1)[0] or kwargs.get('json', {}).get('method', http_method)}"
+        if tape.replaying:
+            key = request_key(http_method, url, kwargs.get('json'))
+            with span(span_name):
+                entry = tape.replay(key)
+            return replayed_result(entry, key, json_loads)
+
+        started = time.perf_counter()
+        response = None
         try:
-            response = self.session.request(http_method, url, **kwargs)
+            with span(span_name):
+                response = self.session.request(http_method, url, **kwargs)
             response.raise_for_status()
-            return Result(True, response.json())
+            result = Result(True, json_loads(response.content))
         except requests.exceptions.HTTPError as e:
-            return Result(False, error=f"HTTP error: {e.response.status_code} {e.response.reason}")
+            result = Result(False, error=f"HTTP error: {e.response.status_code} {e.response.reason}")
         except requests.exceptions.RequestException as e:
-            return Result(False, error=f"Request exception: {str(e)}")
+            result = Result(False, error=f"Request exception: {str(e)}")
+        except ValueError as e:
+            result = Result(False, error=f"Invalid JSON response: {str(e)}")
+        if tape.recording:
+            self._record(http_method, url, kwargs.get('json'), time.perf_counter() - started, response, result)
+        return result
+
+    @staticmethod
+    def _record(http_method, url, json_body, elapsed, response, result):
+        key = request_key(http_method, url, json_body)
+        if response is None:
+            tape.record(key, elapsed, error=result.error)
+        elif response.status_code >= 400:
+            tape.record(key, elapsed, status=response.status_code, body=response.reason)
+        else:
+            tape.record(key, elapsed, status=response.status_code, body=response.content.decode('utf-8', 'replace'))
 
     def send_json_rpc_request(self, rpc_method: str, params: Optional[dict] = None, **kwargs) -> Result:
         json_id = str(uuid.uuid4())
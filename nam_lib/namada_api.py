@@ -3,9 +3,11 @@ import base64
 from config.settings import NAMADA_RPC_URL
 from nam_lib.result import Result
 from nam_lib.client import NamHTTPClient, find_key
+from nam_lib.spans import span
 from structs.basic import *
 from structs.bech32m import bech32m_encode
 from structs.commission_rate import extract_commission_values
+from structs.storage_proposal import parse_storage_proposal
 
 
 class NamadaAPI:
@@ -19,8 +21,9 @@ class NamadaAPI:
             if result.success:
                 resp = result.data
                 if 'result' in resp:
-                    found, height = find_key(resp, 'latest_block_height')
-                    found, catching_up = find_key(resp, 'catching_up')
+                    sync_info = resp['result'].get('sync_info') or {}
+                    height = sync_info.get('latest_block_height')
+                    catching_up = sync_info.get('catching_up')
                     if catching_up:
                         return Result(False, error="Node is still catching up.")
                     if height is not None:
@@ -57,18 +60,43 @@ class NamadaAPI:
                     return Result(False, error="JSON data does not contain the required structure.")
         return Result(True, validators_info)
 
+    def get_current_epoch(self):
+        """Fetches the current epoch."""
+        result = self._fetch_abci_query_value({"path": "/shell/epoch"})
+        if result.success:
+            return Result(True, int.from_bytes(result.data[:8], byteorder='little'))
+        return Result(False, error=result.error)
+
+    def get_commit_signatures(self, height: int):
+        """Fetches the commit signatures of a block as (tendermint_address, signed) pairs in validator set order."""
+        with NamHTTPClient(base_url=self.rpc_url) as client:
+            result = client.send_request(f'commit?height={height}')
+            if not result.success:
+                return Result(False, error=result.error)
+            find_result, signatures = find_key(result.data, 'signatures')
+            if not find_result or signatures is None:
+                return Result(False, error="Commit signatures not found in the response.")
+            # block_id_flag: 1 = absent (no address), 2 = signed the block, 3 = voted nil
+            return Result(True, [(sig.get('validator_address') or None, sig.get('block_id_flag') == 2)
+                                 for sig in signatures])
+
     def _fetch_abci_query_value(self, params):
-        """Internal method to fetch and decode the value returned by an ABCI query."""
+        """
+        Internal method to fetch and decode the value returned by an ABCI query.
+        The value is returned as a memoryview so decoders can slice it without copying.
+        """
         with NamHTTPClient(base_url=self.rpc_url) as client:
             result = client.send_json_rpc_request("abci_query", params)
             if result.success:
-                find_result, value = find_key(result.data, 'value')
-                if not find_result:
+                try:
+                    response = result.data['result']['response']
+                except (KeyError, TypeError):
                     return Result(False, error="Value not found in the response.")
+                value = response.get('value')
                 if value:
-                    return Result(True, base64.b64decode(value))
+                    return Result(True, memoryview(base64.b64decode(value)))
                 else:
-                    return Result(False, error=result.data['result']['response']['info'])
+                    return Result(False, error=response.get('info'))
             return Result(False, error=result.error)
 
     def get_validator_from_tm(self, tm_address: str):
@@ -76,8 +104,9 @@ class NamadaAPI:
         params = {"path": f"/vp/pos/validator_by_tm_addr/{tm_address}"}
         result = self._fetch_abci_query_value(params)
         if result.success:
-            address_bytes = [1] + list(result.data)[2:]
-            validator_address = bech32m_encode('tnam', address_bytes)
+            # Skip the Option tag and the Address tag, the payload prefix of an established address is 1
+            with span("bech32"):
+                validator_address = bech32m_encode('tnam', b'\x01' + result.data[2:])
             return Result(True, validator_address)
         return Result(False, error=result.error)
 
@@ -86,29 +115,38 @@ class NamadaAPI:
         params = {"path": f"/vp/pos/validator/metadata/{validator_address}"}
         result = self._fetch_abci_query_value(params)
         if result.success:
-            data = ValidatorMetaData.parse(result.data[1:])
-            metadata = {
-                'email': data['email'],
-                'description': data['description'],
-                'website': data['website'],
-                'discord_handle': data['discord_handle'],
-                'avatar': data['avatar'],
-            }
-            return Result(True, metadata)
-        return Result(False, result.error)
+            with span("decode.metadata"):
+                return Result(True, parse_validator_metadata(result.data[1:]))
+        return Result(False, error=result.error)
 
     def get_validator_commission(self, validator_address: str):
         """Fetches and parses commission information for a given validator address."""
         params = {"path": f"/vp/pos/validator/commission/{validator_address}"}
         result = self._fetch_abci_query_value(params)
         if result.success:
-            return Result(True, extract_commission_values(result.data))
-        return Result(False, result.error)
+            with span("decode.commission"):
+                return Result(True, extract_commission_values(result.data))
+        return Result(False, error=result.error)
 
     def get_validator_state(self, validator_address: str):
         """Fetches and returns the state of a given validator address."""
         params = {"path": f"/vp/pos/validator/state/{validator_address}"}
         result = self._fetch_abci_query_value(params)
         if result.success:
-            return Result(True, ValidatorState.parse(result.data[1:]).__class__.__name__)
+            with span("decode.state"):
+                return Result(True, ValidatorState.parse(result.data[1:]).__class__.__name__)
         return Result(False, error=result.error)
+
+    def get_proposal(self, proposal_id: int):
+        """Fetches and parses a governance proposal. Returns None as data when no such proposal exists yet."""
+        params = {"path": f"/vp/governance/proposal/{proposal_id}"}
+        result = self._fetch_abci_query_value(params)
+        if not result.success:
+            return Result(False, error=result.error)
+        if not result.data or result.data[0] == 0:
+            return Result(True, None)
+        try:
+            with span("decode.proposal"):
+                return Result(True, parse_storage_proposal(result.data[1:]))
+        except ValueError as e:
+            return Result(False, error=f"Failed to parse proposal {proposal_id}: {e}")
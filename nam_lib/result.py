@@ -1,4 +1,6 @@
 class Result:
+    __slots__ = ('success', 'data', 'error')
+
     def __init__(self, success, data=None, error=None):
         self.success = success
         self.data = data
@@ -0,0 +1,139 @@
+import atexit
+import glob
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+from config.settings import RPC_MODE, RPC_TAPE_PATH, RPC_REPLAY_DELAY
+from .result import Result
+
+logger = logging.getLogger(__name__)
+
+# Tapes written before they were plain text are gzip files; they are still replayed.
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def request_key(http_method, url, json_body=None):
+    """
+    Identify a request independently of its JSON-RPC id, which is random for every call: the method, the URL
+    and the canonical JSON of the body without the id.
+    """
+    if json_body is None:
+        return f"{http_method} {url}"
+    body = {key: value for key, value in json_body.items() if key != 'id'}
+    return f"{http_method} {url} {json.dumps(body, sort_keys=True, separators=(',', ':'))}"
+
+
+class RpcTape:
+    """
+    Record/replay log of RPC request/response pairs, so the update pipeline can run against captured node
+    traffic without network access.
+
+    In "record" mode every request is appended as one JSON line, with its key, the HTTP status, the response
+    body and the time the node took to answer, and flushed right away: a recorder that is killed loses at most
+    the line it was writing. Worker processes write a file of their own next to the main one. In "replay" mode
+    all of those files are loaded on first use, skipping a truncated last line, and each key is answered with
+    its recorded responses in the recorded order, the last one being repeated once the others are used up,
+    after the recorded latency scaled by RPC_REPLAY_DELAY percent.
+    """
+
+    def __init__(self, mode=RPC_MODE, path=RPC_TAPE_PATH, delay_percent=RPC_REPLAY_DELAY):
+        self.recording = mode == 'record'
+        self.replaying = mode == 'replay'
+        self.path = path
+        self.delay = delay_percent / 100
+        self._lock = threading.Lock()
+        self._file = None
+        self._responses = None
+
+    def _writer(self):
+        if self._file is None:
+            # Lines of concurrent appenders could interleave, so spawned workers get a file of their own.
+            path = self.path if multiprocessing.parent_process() is None else f"{self.path}.{os.getpid()}"
+            self._file = open(path, 'a', encoding='utf-8')
+            logger.info(f"Recording RPC traffic to {path}.")
+        return self._file
+
+    def record(self, key, elapsed, status=None, body=None, error=None):
+        line = json.dumps({'k': key, 't': round(elapsed, 6), 's': status, 'b': body, 'e': error},
+                          separators=(',', ':'))
+        with self._lock:
+            writer = self._writer()
+            writer.write(line + '\n')
+            writer.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _load(self):
+        responses = defaultdict(deque)
+        paths = sorted(glob.glob(glob.escape(self.path) + '*'))
+        for path in paths:
+            for entry in self._read(path):
+                responses[entry['k']].append(entry)
+        count = sum(map(len, responses.values()))
+        logger.info(f"Loaded {count} recorded RPC response(s) from {len(paths)} file(s).")
+        return responses
+
+    @staticmethod
+    def _read(path):
+        """
+        The entries of one tape file. A recorder killed mid-write leaves a partial last line, or for a gzip tape
+        a stream without its end marker; what was written before that is kept.
+        """
+        with open(path, 'rb') as tape_file:
+            compressed = tape_file.read(2) == GZIP_MAGIC
+        # A character cut in half decodes to a replacement character, and its line is then skipped as invalid JSON.
+        opener = gzip.open if compressed else open
+        tape_file = opener(path, 'rt', encoding='utf-8', errors='replace')
+        entries = []
+        try:
+            with tape_file:
+                for line in tape_file:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        logger.warning(f"Skipped a truncated record in {path}.")
+        except EOFError:
+            logger.warning(f"{path} ends before the end of its gzip stream; replaying the records before that.")
+        return entries
+
+    def replay(self, key):
+        """Return the next recorded entry for `key`, after its scaled latency, or None if it was never recorded."""
+        with self._lock:
+            if self._responses is None:
+                self._responses = self._load()
+            entries = self._responses.get(key)
+            if not entries:
+                return None
+            entry = entries.popleft() if len(entries) > 1 else entries[0]
+        if self.delay:
+            time.sleep(entry['t'] * self.delay)
+        return entry
+
+
+def replayed_result(entry, key, loads):
+    """Turn a recorded entry into the Result the live request returned."""
+    if entry is None:
+        return Result(False, error=f"Request exception: no recorded response for {key}")
+    if entry['e'] is not None:
+        return Result(False, error=entry['e'])
+    if entry['s'] >= 400:
+        return Result(False, error=f"HTTP error: {entry['s']} {entry['b']}")
+    try:
+        return Result(True, loads(entry['b']))
+    except ValueError as e:
+        return Result(False, error=f"Invalid JSON response: {str(e)}")
+
+
+tape = RpcTape()
+if tape.recording:
+    atexit.register(tape.close)
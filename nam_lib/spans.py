@@ -0,0 +1,84 @@
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from config.settings import PROFILING, PROFILE_TOP_SPANS
+
+_NULL_SPAN = nullcontext()
+# Collector of the profiled cycle running in this context; cycles are started by service.profiling.
+current_cycle = contextvars.ContextVar('profile_cycle', default=None)
+
+
+class SpanCollector:
+    """Durations of the spans recorded during one cycle, or outside any cycle (command handlers)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+        self._durations = defaultdict(list)
+
+    def add(self, span_name, seconds):
+        with self._lock:
+            self._durations[span_name].append(seconds)
+
+    def drain(self):
+        with self._lock:
+            durations, self._durations = self._durations, defaultdict(list)
+        return durations
+
+    def report(self, durations):
+        """Compact summary: the top spans by total time with their counts and p50/p99 in milliseconds."""
+        spans = []
+        for span_name, values in durations.items():
+            values.sort()
+            count = len(values)
+            spans.append({
+                'span': span_name,
+                'count': count,
+                'total_ms': round(sum(values) * 1000, 3),
+                'p50_ms': round(values[(count - 1) // 2] * 1000, 3),
+                'p99_ms': round(values[int((count - 1) * 0.99)] * 1000, 3),
+                'max_ms': round(values[-1] * 1000, 3),
+            })
+        spans.sort(key=lambda span: span['total_ms'], reverse=True)
+        return {
+            'cycle': self.name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'duration_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'spans': spans[:PROFILE_TOP_SPANS],
+        }
+
+
+# Spans recorded outside a profiled cycle, written out together with the next cycle report.
+_background = SpanCollector('commands')
+
+
+def take_background():
+    """Return the spans recorded outside any cycle so far, and start collecting the next ones."""
+    global _background
+    background, _background = _background, SpanCollector('commands')
+    return background
+
+
+def span(name):
+    """
+    Time the enclosed block under `name` in the current cycle's report. When profiling is off this returns a
+    shared no-op context manager, so instrumented code pays for one call and one branch.
+    """
+    if not PROFILING:
+        return _NULL_SPAN
+    return _timed(name)
+
+
+@contextmanager
+def _timed(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        (current_cycle.get() or _background).add(name, time.perf_counter() - started)
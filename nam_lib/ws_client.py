@@ -0,0 +1,47 @@
+import json
+import uuid
+from typing import AsyncIterator
+from urllib.parse import urljoin
+
+import websockets
+
+NEW_BLOCK_QUERY = "tm.event='NewBlock'"
+
+
+def websocket_url(rpc_url: str) -> str:
+    """Derive the CometBFT websocket endpoint from an http(s) RPC url."""
+    if rpc_url.startswith("https://"):
+        rpc_url = "wss://" + rpc_url[len("https://"):]
+    elif rpc_url.startswith("http://"):
+        rpc_url = "ws://" + rpc_url[len("http://"):]
+    return urljoin(rpc_url if rpc_url.endswith("/") else rpc_url + "/", "websocket")
+
+
+class NamWebSocketClient:
+    def __init__(self, rpc_url: str, query: str = NEW_BLOCK_QUERY, ping_interval: float = 20.0,
+                 open_timeout: float = 10.0):
+        self.url = websocket_url(rpc_url)
+        self.query = query
+        self.ping_interval = ping_interval
+        self.open_timeout = open_timeout
+
+    async def subscribe_new_blocks(self) -> AsyncIterator[int]:
+        """
+        Subscribe to NewBlock events and yield each block height as it is committed.
+        The generator ends, or raises, when the connection is lost; reconnecting is up to the caller.
+        """
+        async with websockets.connect(self.url, ping_interval=self.ping_interval,
+                                      open_timeout=self.open_timeout, max_size=None) as ws:
+            request = {"jsonrpc": "2.0", "id": str(uuid.uuid4()), "method": "subscribe",
+                       "params": {"query": self.query}}
+            await ws.send(json.dumps(request))
+            async for raw in ws:
+                message = json.loads(raw)
+                if 'error' in message:
+                    raise ConnectionError(f"Subscription rejected: {message['error']}")
+                # The first reply only acknowledges the subscription and carries an empty result.
+                try:
+                    header = message['result']['data']['value']['block']['header']
+                except (KeyError, TypeError):
+                    continue
+                yield int(header['height'])
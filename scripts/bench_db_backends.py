@@ -0,0 +1,132 @@
+"""
+Latency comparison of the storage backends (DB_BACKEND) on the statements the bot issues most.
+
+Each backend runs in a child process of its own, since DB_BACKEND is read at import. The child creates two
+scratch tables, bench_validators and bench_history, fills them with --validators rows, times every operation
+--repeat times after a warm-up and drops the tables again; nothing else in the database is touched. The
+median and p99 latency of every operation are printed side by side.
+
+SQLite runs on a temporary file. MySQL uses the DB_* settings (.env or environment) and is skipped when
+DB_HOST is not set; point it at a scratch database.
+
+    python scripts/bench_db_backends.py --validators 250 --repeat 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OPERATIONS = ('keyed read', 'full scan', 'single-row update', 'insert 50 rows', 'transaction of 10 updates')
+
+
+def run_backend(validators, repeat):
+    """Child process: time every operation on the backend selected by DB_BACKEND and return the latencies."""
+    sys.path.insert(0, ROOT)
+    from config.settings import DB_CONFIG
+    from db.database_manager import DatabaseManager
+
+    db = DatabaseManager(DB_CONFIG, pool_name='bench_pool', pool_size=2)
+    db.create_table('bench_validators', {
+        'validator_id': 'INT AUTO_INCREMENT PRIMARY KEY',
+        'tendermint_address': 'VARCHAR(40) NOT NULL',
+        'voting_power': 'BIGINT',
+        'state': 'VARCHAR(16)',
+    }, ['UNIQUE KEY uq_bench_tendermint_address (tendermint_address)'])
+    db.create_table('bench_history', {
+        'history_id': 'BIGINT AUTO_INCREMENT PRIMARY KEY',
+        'validator_id': 'INT NOT NULL',
+        'height': 'BIGINT NOT NULL',
+        'voting_power': 'BIGINT',
+    })
+    try:
+        addresses = [f"{index:040X}" for index in range(validators)]
+        db.insert_many('bench_validators', [
+            {'tendermint_address': address, 'voting_power': 1000, 'state': 'Consensus'} for address in addresses])
+        ids = [row['validator_id'] for row in db.execute_query("SELECT validator_id FROM bench_validators")]
+        counter = iter(range(1 << 62))
+
+        def transaction():
+            with db.transaction() as tx:
+                for validator_id in ids[:10]:
+                    tx.execute("UPDATE bench_validators SET voting_power = %s WHERE validator_id = %s",
+                               (next(counter), validator_id))
+
+        operations = {
+            'keyed read': lambda: db.execute_query(
+                "SELECT * FROM bench_validators WHERE tendermint_address = %s",
+                (addresses[next(counter) % validators],)),
+            'full scan': lambda: db.execute_query("SELECT * FROM bench_validators"),
+            'single-row update': lambda: db.execute_query(
+                "UPDATE bench_validators SET voting_power = %s WHERE validator_id = %s",
+                (next(counter), ids[next(counter) % validators]), commit=True),
+            'insert 50 rows': lambda: db.insert_many('bench_history', [
+                {'validator_id': validator_id, 'height': next(counter), 'voting_power': 1000}
+                for validator_id in ids[:50]]),
+            'transaction of 10 updates': transaction,
+        }
+        latencies = {}
+        for name, operation in operations.items():
+            for _ in range(min(repeat, 100)):
+                operation()
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                operation()
+                samples.append(time.perf_counter() - started)
+            samples.sort()
+            latencies[name] = (samples[(repeat - 1) // 2], samples[int((repeat - 1) * 0.99)])
+        return latencies
+    finally:
+        db.execute_query("DROP TABLE bench_history", commit=True)
+        db.execute_query("DROP TABLE bench_validators", commit=True)
+
+
+def measure(backend, args):
+    """Run one backend in a child process and return its latencies, or None when it is not configured."""
+    env = dict(os.environ, DB_BACKEND=backend, NAMADA_RPC_URL=os.getenv('NAMADA_RPC_URL', 'http://localhost:26657'))
+    with tempfile.TemporaryDirectory() as directory:
+        if backend == 'sqlite':
+            env['SQLITE_PATH'] = os.path.join(directory, 'bench.db')
+        elif not env.get('DB_HOST'):
+            print("mysql: skipped, DB_HOST is not set")
+            return None
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', '--validators',
+                                 str(args.validators), '--repeat', str(args.repeat)],
+                                env=env, cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"{backend}: failed\n{result.stderr}")
+        return None
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--validators', type=int, default=250)
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--backends', nargs='+', default=['sqlite', 'mysql'], choices=['sqlite', 'mysql'])
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.validators, args.repeat)))
+        return
+    # The same .env the bot reads, so DB_HOST there enables the MySQL run.
+    load_dotenv(os.path.join(ROOT, '.env'))
+
+    results = {backend: measure(backend, args) for backend in args.backends}
+    results = {backend: latencies for backend, latencies in results.items() if latencies}
+    print(f"{args.validators} validators, {args.repeat} runs per operation, median / p99 in us")
+    print(f"{'':<28}" + "".join(f"{backend:>22}" for backend in results))
+    for name in OPERATIONS:
+        print(f"{name:<28}" + "".join(f"{latencies[name][0] * 1e6:>12.0f} / {latencies[name][1] * 1e6:>7.0f}"
+                                      for latencies in results.values()))
+
+
+if __name__ == '__main__':
+    main()
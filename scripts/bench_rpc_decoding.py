@@ -0,0 +1,93 @@
+"""
+Benchmark of the RPC response path of a validator metadata query, from the response body to the decoded fields.
+
+"find_key + construct" is the path before the in-place decoding: json.loads, a recursive find_key for the
+value, base64 and a borsh_construct parse. "direct + BorshReader" is the current one: the JSON parser of
+nam_lib.client (orjson when installed), a direct lookup of result.response.value, a memoryview of the
+decoded bytes and parse_validator_metadata. Both decode the same generated response and must agree.
+"NamadaAPI.get_validator_metadata" runs the whole public call with the HTTP session stubbed out, which
+adds the client setup the bot pays on every request. No node is needed.
+
+    python scripts/bench_rpc_decoding.py --repeat 20000
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('NAMADA_RPC_URL', 'http://localhost:26657')
+
+import requests
+
+from nam_lib import client
+from nam_lib.client import find_key
+from nam_lib.namada_api import NamadaAPI
+from structs.basic import ValidatorMetaData, parse_validator_metadata
+
+METADATA = {'email': 'ops@validator.example.com', 'description': 'Namada validator operated since genesis. ' * 4,
+            'website': 'https://validator.example.com', 'discord_handle': 'validator#1234', 'avatar': None}
+
+
+def metadata_response():
+    """An abci_query response body as the node returns it for /vp/pos/validator/metadata/<address>."""
+    value = b'\x01' + ValidatorMetaData.build(METADATA)
+    return json.dumps({'jsonrpc': '2.0', 'id': 'c0ffee', 'result': {'response': {
+        'code': 0, 'log': '', 'info': '', 'index': '0', 'key': None, 'value': base64.b64encode(value).decode(),
+        'proofOps': None, 'height': '123456', 'codespace': ''}}}).encode()
+
+
+def decode_with_find_key(body):
+    found, value = find_key(json.loads(body), 'value')
+    data = ValidatorMetaData.parse(base64.b64decode(value)[1:])
+    return {field: getattr(data, field) for field in METADATA}
+
+
+def decode_in_place(body):
+    value = client.json_loads(body)['result']['response']['value']
+    return parse_validator_metadata(memoryview(base64.b64decode(value))[1:])
+
+
+class StubResponse:
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+def timed(func, repeat):
+    for _ in range(min(repeat, 1000)):
+        func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20000)
+    args = parser.parse_args()
+
+    body = metadata_response()
+    assert decode_with_find_key(body) == decode_in_place(body) == METADATA
+    requests.Session.request = lambda session, method, url, **kwargs: StubResponse(body)
+    api = NamadaAPI('http://localhost:26657')
+    assert api.get_validator_metadata('tnam1q').data == METADATA
+
+    print(f"{len(body)} byte response, JSON parser: {client.json_loads.__module__}, {args.repeat} runs each")
+    before = timed(lambda: decode_with_find_key(body), args.repeat)
+    after = timed(lambda: decode_in_place(body), args.repeat)
+    full = timed(lambda: api.get_validator_metadata('tnam1q'), args.repeat // 10)
+    print(f"{'find_key + construct':<34}{before * 1e6:8.1f} us")
+    print(f"{'direct + BorshReader':<34}{after * 1e6:8.1f} us   {before / after:5.1f}x")
+    print(f"{'NamadaAPI.get_validator_metadata':<34}{full * 1e6:8.1f} us   (stubbed HTTP, includes client setup)")
+
+
+if __name__ == '__main__':
+    main()
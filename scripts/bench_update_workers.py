@@ -0,0 +1,100 @@
+"""
+Benchmark of the sharded validator fetch (UPDATE_WORKERS) against a stubbed RPC client.
+
+Every stubbed request sleeps --latency-ms, like a round trip to the node, and spends --cpu-us of CPU time,
+like decoding its response. The script fetches the same validator set in-process (UPDATE_WORKERS=1) and
+across N worker processes, and prints the time per cycle and the speedup. Pools are warmed up before being
+timed, since the bot keeps its pool between cycles. No database or node is needed.
+
+    python scripts/bench_update_workers.py --validators 250 --latency-ms 5 --workers 1 2 4 8
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('NAMADA_RPC_URL', 'http://localhost:26657')
+
+from config.settings import DEFAULT_CHAIN
+from nam_lib.result import Result
+from service import update_database
+
+
+class StubNamadaAPI:
+    """Answers the requests of fetch_validator_info after a fixed delay, without a node."""
+
+    def __init__(self, latency, cpu):
+        self.latency = latency
+        self.cpu = cpu
+
+    def _respond(self, data):
+        time.sleep(self.latency)
+        deadline = time.perf_counter() + self.cpu
+        while time.perf_counter() < deadline:
+            pass
+        return Result(True, data)
+
+    def get_validator_from_tm(self, tm_address):
+        return self._respond('tnam1q' + tm_address.lower()[:40])
+
+    def get_validator_metadata(self, validator_address):
+        return self._respond({'email': 'ops@example.com', 'website': 'https://example.com'})
+
+    def get_validator_commission(self, validator_address):
+        return self._respond((0.05, 0.01))
+
+    def get_validator_state(self, validator_address):
+        return self._respond('Consensus')
+
+
+def install_stub(latency, cpu):
+    update_database.namada_apis[DEFAULT_CHAIN] = StubNamadaAPI(latency, cpu)
+
+
+def timed_cycles(fetch, validators, cycles):
+    fetch(validators)
+    started = time.perf_counter()
+    for _ in range(cycles):
+        fetch(validators)
+    return (time.perf_counter() - started) / cycles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--validators', type=int, default=250)
+    parser.add_argument('--latency-ms', type=float, default=5)
+    parser.add_argument('--cpu-us', type=float, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--cycles', type=int, default=3)
+    args = parser.parse_args()
+
+    latency, cpu = args.latency_ms / 1000, args.cpu_us / 1e6
+    install_stub(latency, cpu)
+    validators = [(f"{index:040X}", 1000 + index) for index in range(args.validators)]
+    print(f"{args.validators} validators, 4 requests each, {args.latency_ms:g} ms latency and "
+          f"{args.cpu_us:g} us CPU per request, {os.cpu_count()} CPU(s)")
+
+    baseline = None
+    for workers in args.workers:
+        if workers == 1:
+            elapsed = timed_cycles(update_database.fetch_validators, validators, args.cycles)
+        else:
+            # The same pool the bot uses, with the stub installed in every worker.
+            update_database._worker_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=install_stub, initargs=(latency, cpu))
+            try:
+                elapsed = timed_cycles(
+                    lambda batch: update_database.fetch_validators_sharded(batch, workers), validators, args.cycles)
+            finally:
+                update_database._worker_pool.shutdown()
+                update_database._worker_pool = None
+        baseline = baseline or elapsed
+        print(f"UPDATE_WORKERS={workers:<3} {elapsed * 1000:9.1f} ms per cycle   {baseline / elapsed:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Memory of the row containers of a validator snapshot: dictionary rows against slotted ValidatorRecords.
+
+The script builds --validators rows with the columns of the validators table and measures, with tracemalloc,
+what holding them as dictionaries (what a dictionary cursor returns) and as ValidatorRecords (what
+execute_query(model=ValidatorRecord) returns) costs. The field values are created beforehand and shared by
+both, so only the containers are compared. It also prints the pickled size of the snapshot, which is what
+a worker process sends back to the coordinator. No database is needed.
+
+    python scripts/measure_snapshot_memory.py --validators 10000
+"""
+import argparse
+import os
+import pickle
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.models import ValidatorRecord
+
+
+def sample_rows(count):
+    """Rows as a dictionary cursor returns them, one per validator."""
+    return [{
+        'validator_id': index,
+        'chain_id': 'namada',
+        'validator_address': f"tnam1q{index:039x}",
+        'tendermint_address': f"{index:040X}",
+        'voting_power': 1000 + index,
+        'email': f"ops{index}@example.com",
+        'description': None,
+        'website': f"https://validator{index}.example.com",
+        'discord_handle': None,
+        'avatar': None,
+        'commission_rate': 0.05,
+        'max_commission_change': 0.01,
+        'state': 'Consensus',
+    } for index in range(count)]
+
+
+def container_size(build):
+    """Bytes allocated by build(), which must only allocate containers around existing values."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, built
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--validators', type=int, default=10000)
+    args = parser.parse_args()
+
+    rows = sample_rows(args.validators)
+    columns = list(rows[0])
+    values = [tuple(row.values()) for row in rows]
+    dict_size, dicts = container_size(lambda: [dict(zip(columns, row)) for row in values])
+    record_size, records = container_size(lambda: [ValidatorRecord.from_columns(columns, row) for row in values])
+    assert [record.as_dict() for record in records] == dicts
+
+    print(f"{args.validators} validators, {len(columns)} columns")
+    print(f"{'':<20}{'in memory':>12}{'pickled':>12}")
+    for name, size, snapshot in (('dict rows', dict_size, dicts), ('ValidatorRecord', record_size, records)):
+        print(f"{name:<20}{size / 1e6:>9.2f} MB{len(pickle.dumps(snapshot)) / 1e6:>9.2f} MB")
+    print(f"records use {record_size / dict_size:.0%} of the memory of dict rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import logging
+import threading
+
+from nam_lib.result import Result
+
+logger = logging.getLogger(__name__)
+
+VALIDATOR_STATES = ("Consensus", "BelowCapacity", "BelowThreshold", "Inactive", "Jailed")
+
+# Rule syntax accepted by /monitor: <rule_type>=<value>
+RULE_TYPES = {
+    'power_drop': "voting power dropped by at least <value> percent in one cycle",
+    'state': "validator entered state <value>",
+    'commission_near': "commission moved within <value> of its max change per epoch",
+}
+
+
+def parse_rule_args(args):
+    """
+    Parse /monitor rule arguments such as ["power_drop=10", "state=Jailed"] into (rule_type, rule_value) pairs.
+    """
+    rules = []
+    for arg in args:
+        rule_type, sep, rule_value = arg.partition('=')
+        if not sep or rule_type not in RULE_TYPES:
+            return Result(False, error=f"Unknown alert rule '{arg}'. Use one of: "
+                                       f"{', '.join(name + '=<value>' for name in RULE_TYPES)}.")
+        if rule_type == 'state':
+            if rule_value not in VALIDATOR_STATES:
+                return Result(False, error=f"Unknown state '{rule_value}'. Use one of: {', '.join(VALIDATOR_STATES)}.")
+        else:
+            try:
+                if float(rule_value) < 0:
+                    raise ValueError
+            except ValueError:
+                return Result(False, error=f"Rule '{rule_type}' needs a non-negative number.")
+        rules.append((rule_type, rule_value))
+    return Result(True, rules)
+
+
+def compile_rule(rule_type, rule_value):
+    """
+    Turn a stored rule into a predicate over a ChangeEvent. The predicate returns a short description
+    of why the rule fired, or None.
+    """
+    if rule_type == 'power_drop':
+        threshold = float(rule_value)
+
+        def power_drop(change):
+            previous, new = change.previous_power, change.new_power
+            if previous and new < previous:
+                dropped = (previous - new) * 100 / previous
+                if dropped >= threshold:
+                    return f"Voting power dropped {dropped:.2f}% ({previous} ➔ {new})"
+            return None
+        return power_drop
+
+    if rule_type == 'state':
+        def entered_state(change):
+            if change.new_state == rule_value and change.previous_state != rule_value:
+                return f"Entered state {rule_value} (from {change.previous_state})"
+            return None
+        return entered_state
+
+    if rule_type == 'commission_near':
+        margin = float(rule_value)
+
+        def commission_near(change):
+            previous, new, max_change = change.previous_rate, change.new_rate, change.max_commission_change
+            if previous is None or new is None or max_change is None or previous == new:
+                return None
+            moved = abs(new - previous)
+            if moved >= max_change - margin:
+                return f"Commission moved {moved:.4f} ({previous} ➔ {new}), max change per epoch is {max_change}"
+            return None
+        return commission_near
+
+    raise ValueError(f"Unknown rule type: {rule_type}")
+
+
+class RuleEngine:
+    """
+    Keeps every stored alert rule compiled in memory, indexed by validator_id, so each cycle only
+    looks at the rules of validators that actually changed. Like the subscription index, the rules are
+    reloaded at the start of every update cycle, so rules written by other instances fire too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._invalidations = 0
+
+    def invalidate(self):
+        """Drop the compiled rules; they are reloaded from the database on the next evaluation."""
+        with self._lock:
+            self._index = None
+            self._invalidations += 1
+
+    def reload(self, db_manager):
+        """Compile the stored rules again, unless they were invalidated meanwhile (the next evaluation loads them)."""
+        with self._lock:
+            invalidations = self._invalidations
+        index = self._load(db_manager)
+        with self._lock:
+            if self._invalidations == invalidations:
+                self._index = index
+
+    def _load(self, db_manager):
+        query = """
+        SELECT r.rule_id, r.rule_type, r.rule_value, s.validator_id
+        FROM alert_rules r
+        JOIN subscriptions s ON r.subscription_id = s.id
+        """
+        index = {}
+        for row in db_manager.execute_query(query):
+            try:
+                predicate = compile_rule(row['rule_type'], row['rule_value'])
+            except ValueError as e:
+                logger.error(f"Skipping alert rule {row['rule_id']}: {e}")
+                continue
+            index.setdefault(row['validator_id'], []).append((row['rule_id'], predicate))
+        logger.info(f"Compiled alert rules for {len(index)} validator(s).")
+        return index
+
+    def evaluate(self, db_manager, changes):
+        """Check the rules of every changed validator in one pass and store the alerts that fired."""
+        with self._lock:
+            if self._index is None:
+                self._index = self._load(db_manager)
+            index = self._index
+
+        alerts = []
+        for change in changes:
+            for rule_id, predicate in index.get(change.validator_id, ()):
+                detail = predicate(change)
+                if detail:
+                    alerts.append({'rule_id': rule_id, 'validator_id': change.validator_id, 'detail': detail})
+        if alerts:
+            db_manager.insert_many('rule_alerts', alerts)
+        return alerts
+
+
+rule_engine = RuleEngine()
+
+
+def set_alert_rules(tx, subscription_ids, rules):
+    """
+    Replace the alert rules of several subscriptions inside a DatabaseManager.transaction().
+    The caller invalidates the rule engine once the transaction has committed.
+    """
+    placeholders = ", ".join(["%s"] * len(subscription_ids))
+    tx.execute(f"DELETE FROM alert_rules WHERE subscription_id IN ({placeholders})", tuple(subscription_ids))
+    tx.insert_many('alert_rules', [
+        {'subscription_id': subscription_id, 'rule_type': rule_type, 'rule_value': rule_value}
+        for subscription_id in subscription_ids
+        for rule_type, rule_value in rules
+    ])
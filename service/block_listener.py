@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from config.settings import CHAINS, DEFAULT_CHAIN, BLOCK_POLL_INTERVAL, BLOCK_RECONNECT_MAX_DELAY
+from nam_lib.namada_api import NamadaAPI
+from nam_lib.ws_client import NamWebSocketClient
+from service.track_liveness import track_liveness
+
+logger = logging.getLogger(__name__)
+
+
+class BlockPipeline:
+    """
+    Receives new block heights and fans them out: every block feeds the liveness tracker, and an
+    epoch transition runs the chain's scheduled database update right away instead of waiting for the next
+    interval. The update stays an APScheduler job, so its max_instances limit keeps a single cycle per chain
+    running. Jobs still running from an earlier block are not started twice; they catch up on their next run.
+    Each chain has its own pipeline, fed by its own websocket.
+    """
+
+    def __init__(self, chain, rpc_url):
+        self.chain = chain
+        self.namada_api = NamadaAPI(rpc_url)
+        self.ws_client = NamWebSocketClient(rpc_url)
+        self.update_job = None
+        self.last_height = None
+        self.last_epoch = None
+        self._running = {}
+
+    def _start(self, name, func, *args):
+        task = self._running.get(name)
+        if task is not None and not task.done():
+            return
+        loop = asyncio.get_running_loop()
+        self._running[name] = loop.run_in_executor(None, func, *args)
+
+    async def on_new_block(self, height):
+        if self.last_height is not None and height <= self.last_height:
+            return
+        self.last_height = height
+        self._start('liveness', track_liveness, height, self.chain)
+
+        loop = asyncio.get_running_loop()
+        epoch_result = await loop.run_in_executor(None, self.namada_api.get_current_epoch)
+        if not epoch_result.success:
+            logger.error(f"Failed to get current epoch: {epoch_result.error}")
+            return
+        epoch = epoch_result.data
+        if self.last_epoch is not None and epoch != self.last_epoch:
+            logger.info(f"Epoch of chain {self.chain} changed {self.last_epoch} -> {epoch} at height {height}, "
+                        f"updating validators.")
+            if self.update_job is not None:
+                self.update_job.modify(next_run_time=datetime.now())
+        self.last_epoch = epoch
+
+
+pipelines = {chain: BlockPipeline(chain, rpc_url) for chain, rpc_url in CHAINS.items()}
+
+
+async def poll_new_blocks(pipeline, duration):
+    """Fallback while the websocket is down: poll /status for `duration` seconds."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    while True:
+        height_result = await loop.run_in_executor(None, pipeline.namada_api.get_latest_height)
+        if height_result.success:
+            await pipeline.on_new_block(int(height_result.data))
+        else:
+            logger.error(f"Failed to get latest block height: {height_result.error}")
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(BLOCK_POLL_INTERVAL, remaining))
+
+
+async def listen_new_blocks(chain=DEFAULT_CHAIN, update_job=None):
+    """
+    Follow new blocks over the RPC websocket, reconnecting with exponential backoff and polling meanwhile.
+    `update_job` is the scheduled update_database job of the chain, woken up on every epoch change.
+    """
+    pipeline = pipelines[chain]
+    pipeline.update_job = update_job
+    delay = 1
+    while True:
+        try:
+            async for height in pipeline.ws_client.subscribe_new_blocks():
+                delay = 1
+                await pipeline.on_new_block(height)
+            logger.warning(f"Block subscription of chain {chain} closed by the node.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Block subscription of chain {chain} failed: {e}")
+        logger.info(f"Polling for new blocks of chain {chain} for {delay}s before reconnecting the websocket.")
+        await poll_new_blocks(pipeline, delay)
+        delay = min(delay * 2, BLOCK_RECONNECT_MAX_DELAY)
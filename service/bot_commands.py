@@ -1,14 +1,35 @@
+import html
 import re
 
-from telegram import Update
-from telegram.ext import CommandHandler, ContextTypes
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.error import BadRequest
+from telegram.ext import CallbackQueryHandler, CommandHandler, ContextTypes
 
-from config.settings import DB_CONFIG, USER_SUBSCRIPTION_LIMIT
+from config.settings import DB_CONFIG, USER_SUBSCRIPTION_LIMIT, HISTORY_DISPLAY_LIMIT, CHAINS, DEFAULT_CHAIN, \
+    VIEW_PAGE_SIZE
 from db.database_manager import *
+from db.models import ValidatorRecord
 from nam_lib.result import *
+from service.alert_rules import parse_rule_args, rule_engine, set_alert_rules
+from service.refresh_tiers import subscription_index
+from service.metrics import metrics
+from service.rendering import render_find, render_status, render_view, view_pages
+from service.search_index import MIN_QUERY_LENGTH, search_index
+from service.snapshot import snapshot
+from service.throttling import RequestCoalescer, rate_limited
 
 logger = logging.getLogger(__name__)
 
+# telegram_id -> user_id of users already present in the users table
+known_users = {}
+status_lookups = RequestCoalescer()
+
+# Telegram rejects messages longer than this many characters.
+MESSAGE_LIMIT = 4096
+
+NAMADA_ADDRESS = re.compile(r'^tnam[0-9a-zA-Z]{41}$')
+TENDERMINT_ADDRESS = re.compile(r'^[0-9A-F]{40}$')
+
 
 def check_address_format(address: str):
     if len(address) > 45:
@@ -17,15 +38,11 @@ def check_address_format(address: str):
             error="Address length exceeds the maximum allowed. Please provide a valid Tendermint or Namada address."
         )
 
-    # Defining patterns for address validation
-    namada_pattern = re.compile(r'^tnam[0-9a-zA-Z]{41}$')
-    tendermint_pattern = re.compile(r'^[0-9A-F]{40}$')
-
     # Checking if the address matches Namada pattern
-    if namada_pattern.match(address):
+    if NAMADA_ADDRESS.match(address):
         return Result(True, "Namada")
     # Checking if the address matches Tendermint pattern
-    elif tendermint_pattern.match(address):
+    elif TENDERMINT_ADDRESS.match(address):
         return Result(True, "Tendermint")
     else:
         return Result(
@@ -34,6 +51,15 @@ def check_address_format(address: str):
         )
 
 
+def check_chain(args):
+    """Chain named by the optional argument after the address of /status and /history; the default chain without one."""
+    if len(args) < 2:
+        return Result(True, DEFAULT_CHAIN)
+    if args[1] not in CHAINS:
+        return Result(success=False, error=f"Unknown chain {args[1]}. Available chains: {', '.join(CHAINS)}.")
+    return Result(True, args[1])
+
+
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.edited_message if update.edited_message else update.message
     if update.effective_chat.type == 'group':
@@ -47,16 +73,26 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     Hello👋 <b>Welcome to Namada Validator Bot</b>.
 
     <b>Commands:</b>
-    - <code>/status [address]</code>: Check a validator's current status.
+    - <code>/status [address] [chain]</code>: Check a validator's current status.
+    
+    - <code>/find [text]</code>: Search validators by email, website, discord handle, description or part of an address.
+    
+    - <code>/history [address] [chain]</code>: Show recent voting power, state and commission changes of a validator.
     
-    - <code>/monitor [address]</code>: Start monitoring a validator. Notifies on state and fee change. Max 5.
+    - <code>/monitor [address ...] [chain] [rules]</code>: Start monitoring one or more validators. Notifies on state and fee change. Max 5.
+      Optional rules: <code>power_drop=[percent]</code>, <code>state=[State]</code>, <code>commission_near=[delta]</code>.
     
-    - <code>/view </code>: View status of monitored validators.
+    - <code>/view </code>: View status of monitored validators, a page at a time.
     
-    - <code>/stop [address|all]</code>: Stop monitoring a validator. Use 'all' to stop all.
+    - <code>/stop [address ...|all] [chain]</code>: Stop monitoring one or more validators. Use 'all' to stop all.
+    
+    - <code>/proposals [on|off]</code>: List the latest governance proposals, or toggle proposal notifications.
 
     Replace [address] with the validator's address. Use without brackets. You can use tendermint address or namada address.
         """
+    if len(CHAINS) > 1:
+        welcome_msg += (f"\n    Followed chains: {', '.join(CHAINS)}. "
+                        f"Commands use <code>{DEFAULT_CHAIN}</code> unless a [chain] is given.\n")
     await message.reply_text(welcome_msg, parse_mode='HTML')
 
 
@@ -72,45 +108,61 @@ async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not check_result.success:
         await message.reply_text("❌ " + check_result.error)
         return
+    chain_result = check_chain(user_input)
+    if not chain_result.success:
+        await message.reply_text("❌ " + chain_result.error)
+        return
+    chain = chain_result.data
+
+    # Answer from the in-memory snapshot; the database is only hit for validators it doesn't know yet.
+    info = snapshot.get(address, check_result.data, chain)
+    if info is None:
+        try:
+            # Identical lookups arriving while one is in flight share its result.
+            info = await status_lookups.run((chain, address), fetch_validator_record, address, check_result.data,
+                                            chain)
+        except Exception as e:
+            logger.error(f"Failed to query validator info: {e}")
+            await message.reply_text("❌ An error occurred while fetching the validator info. Please try again.")
+            return
+
+    if info:
+        reply_msg = render_status(info)
+    else:
+        reply_msg = "❌ No Consensus validator found with the provided address."
+
+    await message.reply_text(reply_msg, parse_mode='HTML', disable_web_page_preview=True)
+
 
-    if check_result.data == 'Namada':
+def fetch_validator_record(address, address_type, chain=DEFAULT_CHAIN):
+    if address_type == 'Namada':
         query_column = "validator_address"
     else:
         query_column = "tendermint_address"
 
-    query_sql = f"SELECT validator_address, tendermint_address, voting_power, state, commission_rate, email, website, discord_handle FROM validators WHERE {query_column} = %s"
+    query_sql = f"SELECT chain_id, validator_address, tendermint_address, voting_power, state, commission_rate, email, website, discord_handle FROM validators WHERE chain_id = %s AND {query_column} = %s"
     db_manager = DatabaseManager(DB_CONFIG)
+    validator_info = db_manager.execute_read(query_sql, (chain, address), model=ValidatorRecord)
+    return validator_info[0] if validator_info else None
 
-    try:
-        validator_info = db_manager.execute_query(query_sql, (address,), commit=False)
-    except Exception as e:
-        logger.error(f"Failed to query validator info: {e}")
-        await message.reply_text("❌ An error occurred while fetching the validator info. Please try again.")
-        return
 
-    if validator_info:
-        info = validator_info[0]
-        reply_msg = (f"🌟 <b>Validator Info</b> 🌟\n\n"
-                     f"🔹 <b>Address:</b> {info['validator_address']}\n"
-                     f"🔹 <b>TM Address:</b> {info['tendermint_address']}\n"
-                     f"🔹 <b>Voting Power:</b> {info['voting_power']}\n"
-                     f"🔹 <b>State:</b> {info['state']}\n"
-                     f"🔹 <b>Commission Rate:</b> {info['commission_rate']}\n"
-                     f"🔹 <b>Email:</b> {info['email']}\n")
-
-        if info.get('website'):
-            reply_msg += f"🔹 <b>Website:</b> <a href='{info['website']}'>{info['website']}</a>\n"
-        if info.get('discord_handle'):
-            reply_msg += f"🔹 <b>Discord:</b> {info['discord_handle']}\n"
-    else:
-        reply_msg = "❌ No Consensus validator found with the provided address."
+async def find_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    message = update.edited_message if update.edited_message else update.message
+    query = " ".join(context.args or [])
+    if len(query.strip()) < MIN_QUERY_LENGTH:
+        await message.reply_text(f"❌ Please provide at least {MIN_QUERY_LENGTH} characters to search for.")
+        return
 
-    await message.reply_text(reply_msg, parse_mode='HTML', disable_web_page_preview=True)
+    records = search_index.search(query)
+    metrics.inc("find_queries_total")
+    if not records:
+        await message.reply_text("❌ No validator matches your search.")
+        return
+    await message.reply_text(render_find(query, records), parse_mode='HTML', disable_web_page_preview=True)
 
 
-async def monitor_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def history_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.edited_message if update.edited_message else update.message
-
     user_input = context.args
     if not user_input:
         await message.reply_text("❌ Please provide an address.")
@@ -121,26 +173,83 @@ async def monitor_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not check_result.success:
         await message.reply_text("❌ " + check_result.error)
         return
+    chain_result = check_chain(user_input)
+    if not chain_result.success:
+        await message.reply_text("❌ " + chain_result.error)
+        return
 
     db_manager = DatabaseManager(DB_CONFIG)
-
+    query = """
+    SELECT height, voting_power, state, commission_rate, recorded_at
+    FROM validator_history
+    WHERE validator_id = %s
+    ORDER BY height DESC
+    LIMIT %s
+    """
     try:
-        validator_id = ensure_validator_exists(db_manager, address, check_result.data)
-
+        validator_id = ensure_validator_exists(db_manager, address, check_result.data, chain_result.data)
         if validator_id is None:
             await message.reply_text("❌ No Consensus validator found with the provided address.")
             return
+        history = db_manager.execute_read(query, (validator_id, HISTORY_DISPLAY_LIMIT))
+    except Exception as e:
+        logger.error(f"Failed to query validator history: {e}")
+        await message.reply_text("❌ An error occurred while fetching the validator history. Please try again.")
+        return
 
-        user_id = ensure_user_exists(db_manager, update.effective_user.id, update.effective_user.username)
-        if not check_subscription_limit(db_manager, user_id):
-            await message.reply_text(
-                "❌ You've reached the maximum number of subscriptions (4). Please stop monitoring a validator to add a new one.")
-            return
+    if not history:
+        await message.reply_text("❌ No history recorded for this validator yet.")
+        return
+
+    reply_msg = f"🕒 <b>Validator History</b>\n\n🔹 <b>Address:</b> {address}\n"
+    for row in history:
+        reply_msg += "─────────────────────────────────\n"
+        reply_msg += (
+            f"🔹 <b>Height:</b> {row['height']} ({row['recorded_at'].strftime('%Y-%m-%d %H:%M:%S')})\n"
+            f"🔹 <b>State:</b> {row['state']}\n"
+            f"🔹 <b>Voting Power:</b> {row['voting_power']}\n"
+            f"🔹 <b>Commission Rate:</b> {row['commission_rate']}\n"
+        )
+
+    reply_msg = reply_msg.rstrip('\n')
+    await message.reply_text(reply_msg, parse_mode='HTML')
+
+
+async def monitor_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    message = update.edited_message if update.edited_message else update.message
+
+    addresses, rule_args, chain, reply_lines = parse_address_args(context.args)
+    if not addresses and not reply_lines:
+        await message.reply_text("❌ Please provide an address.")
+        return
+
+    rules_result = parse_rule_args(rule_args)
+    if not rules_result.success:
+        await message.reply_text("❌ " + rules_result.error)
+        return
+    rules = rules_result.data
+
+    db_manager = DatabaseManager(DB_CONFIG)
 
-        if create_subscription(db_manager, user_id, validator_id):
-            await message.reply_text("✅ You're now monitoring the validator.")
-        else:
-            await message.reply_text("🔔 You're already monitoring this validator.")
+    try:
+        validator_ids = lookup_validator_ids(db_manager, addresses, chain)
+        reply_lines += [f"❌ {address}: No Consensus validator found." for address in addresses
+                        if address not in validator_ids]
+        if validator_ids:
+            user_id = ensure_user_exists(db_manager, update.effective_user.id, update.effective_user.username)
+            subscribe_result = subscribe_validators(db_manager, user_id, list(validator_ids.values()), rules)
+            if not subscribe_result.success:
+                await message.reply_text("❌ " + subscribe_result.error)
+                return
+            for address, validator_id in validator_ids.items():
+                if validator_id in subscribe_result.data:
+                    reply_lines.append(f"✅ Now monitoring {address}")
+                else:
+                    reply_lines.append(f"🔔 Already monitoring {address}")
+            if rules:
+                reply_lines.append("📏 Alert rules set: " + ", ".join(f"{rule_type}={rule_value}"
+                                                                      for rule_type, rule_value in rules))
+        await message.reply_text("\n".join(reply_lines))
     except Exception as e:
         logger.error(f"Failed to monitor validator: {e}")
         await message.reply_text("❌ An error occurred. Please try again.")
@@ -152,43 +261,91 @@ async def view_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     db_manager = DatabaseManager(DB_CONFIG)
     user_id = ensure_user_exists(db_manager, update.effective_user.id, update.effective_user.username)
 
-    query = """
-    SELECT v.validator_address, v.tendermint_address, v.state, v.commission_rate, v.website, v.email, v.discord_handle, v.voting_power 
-    FROM subscriptions s
-    JOIN validators v ON s.validator_id = v.validator_id
-    WHERE s.user_id = %s
-    ORDER BY s.created_at DESC
-    """
     try:
-        subscriptions = db_manager.execute_query(query, (user_id,))
+        page = view_page(db_manager, user_id, update.effective_user.id)
     except Exception as e:
         logger.error(f"Failed to fetch subscription data: {e}")
         await message.reply_text("❌ An error occurred while fetching your subscriptions. Please try again later.")
         return
 
-    if not subscriptions:
+    if page is None:
         await message.reply_text("❌ You are not monitoring any validators.")
         return
 
-    reply_msg = "<b>🔎 Your Monitored Validators</b>\n\n"
-    for sub in subscriptions:
-        reply_msg += "─────────────────────────────────\n"
-        reply_msg += (
-            f"🔹 <b>Address:</b> {sub['validator_address']}\n"
-            f"🔹 <b>TM Address:</b> {sub['tendermint_address']}\n"
-            f"🔹 <b>State:</b> {sub['state']}\n"
-            f"🔹 <b>Voting Power:</b> {sub['voting_power']}\n"
-            f"🔹 <b>Commission Rate:</b> {sub['commission_rate']}\n"
-            f"🔹 <b>Email:</b> {sub['email']}\n"
-        )
+    text, keyboard = page
+    await message.reply_text(text, parse_mode='HTML', disable_web_page_preview=True, reply_markup=keyboard)
 
-        if sub.get('discord_handle'):
-            reply_msg += f"🔹 <b>Discord:</b> {sub['discord_handle']}\n"
-        if sub.get('website'):
-            reply_msg += f"🔹 <b>Website:</b> <a href='{sub['website']}'>{sub['website']}</a>\n"
 
-    reply_msg = reply_msg.rstrip('\n')
-    await message.reply_text(reply_msg, parse_mode='HTML', disable_web_page_preview=True)
+async def view_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Turn the page of a /view message; the buttons carry view:<telegram id>:<older|newer>:<subscription id>."""
+    query = update.callback_query
+    try:
+        _, owner, direction, subscription_id = query.data.split(':')
+        owner, cursor = int(owner), (direction, int(subscription_id))
+        if direction not in ('older', 'newer'):
+            raise ValueError(direction)
+    except ValueError:
+        await query.answer("❌ This button is no longer valid; use /view again.")
+        return
+    if owner != update.effective_user.id:
+        await query.answer("These are someone else's validators; use /view to see yours.")
+        return
+
+    db_manager = DatabaseManager(DB_CONFIG)
+    user_id = ensure_user_exists(db_manager, update.effective_user.id, update.effective_user.username)
+    try:
+        # A page emptied by /stop in the meantime falls back to the first page.
+        page = view_page(db_manager, user_id, update.effective_user.id, cursor) or \
+            view_page(db_manager, user_id, update.effective_user.id)
+    except Exception as e:
+        logger.error(f"Failed to fetch subscription page: {e}")
+        await query.answer("❌ An error occurred. Please try again later.")
+        return
+    await query.answer()
+
+    if page is None:
+        await query.edit_message_text("❌ You are not monitoring any validators.")
+        return
+    text, keyboard = page
+    try:
+        await query.edit_message_text(text, parse_mode='HTML', disable_web_page_preview=True, reply_markup=keyboard)
+    except BadRequest as e:
+        # Pressing a button of a page that did not change leaves the message as it is.
+        logger.debug(f"View page not edited: {e}")
+
+
+def view_page(db_manager, user_id, telegram_id, cursor=None):
+    """
+    The rendered /view page at `cursor` and its keyboard, or None when there is nothing to show there.
+    Pages are cached until the snapshot or any subscription changes, so turning pages back and forth between
+    update cycles costs no query and no rendering.
+    """
+    key = (user_id, cursor)
+    stamp = (snapshot.version, subscription_index.generation)
+    page = view_pages.get(key, stamp)
+    if page is not None:
+        metrics.inc("view_page_cache_hits_total")
+        return page
+    metrics.inc("view_page_cache_misses_total")
+
+    entries, newer_id, older_id = fetch_view_page(db_manager, user_id, cursor)
+    if not entries:
+        return None
+    records = [record for _, record in entries]
+    text = render_view(records)
+    # Long metadata can push a full page past Telegram's limit; the validators left out open the next page.
+    while len(text) > MESSAGE_LIMIT and len(records) > 1:
+        records.pop()
+        older_id = entries[len(records) - 1][0]
+        text = render_view(records)
+    buttons = []
+    if newer_id is not None:
+        buttons.append(InlineKeyboardButton("◀️ Newer", callback_data=f"view:{telegram_id}:newer:{newer_id}"))
+    if older_id is not None:
+        buttons.append(InlineKeyboardButton("Older ▶️", callback_data=f"view:{telegram_id}:older:{older_id}"))
+    page = (text, InlineKeyboardMarkup([buttons]) if buttons else None)
+    view_pages.put(key, stamp, page)
+    return page
 
 
 async def stop_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -209,77 +366,239 @@ async def stop_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if user_input[0].lower() == "all":
         try:
             db_manager.delete_data('subscriptions', {'user_id': user_id})
-            await update.message.reply_text("✅ Stopped monitoring all validators.")
+            rule_engine.invalidate()
+            subscription_index.invalidate()
+            await message.reply_text("✅ Stopped monitoring all validators.")
         except Exception as e:
             logger.error(f"Failed to stop monitoring all validators: {e}")
-            await update.message.reply_text("❌ An error occurred. Please try again.")
-    else:
-        address = user_input[0].replace(" ", "")
-        check_result = check_address_format(address)
-        if not check_result.success:
-            await update.message.reply_text("❌ " + check_result.error)
-            return
+            await message.reply_text("❌ An error occurred. Please try again.")
+        return
 
-        validator_id = ensure_validator_exists(db_manager, address, check_result.data)
-        if validator_id is None:
-            await update.message.reply_text("❌ No Consensus validator found with the provided address.")
-            return
+    addresses, _, chain, reply_lines = parse_address_args(user_input)
+    if not addresses and not reply_lines:
+        # Only a chain name or rule arguments: nothing to stop.
+        await message.reply_text("❌ Please provide an address or 'all' to stop monitoring.")
+        return
+    try:
+        validator_ids = lookup_validator_ids(db_manager, addresses, chain)
+        reply_lines += [f"❌ {address}: No Consensus validator found." for address in addresses
+                        if address not in validator_ids]
+        if validator_ids:
+            stopped = unsubscribe_validators(db_manager, user_id, list(validator_ids.values()))
+            for address, validator_id in validator_ids.items():
+                if validator_id in stopped:
+                    reply_lines.append(f"✅ Stopped monitoring {address}")
+                else:
+                    reply_lines.append(f"🔔 You are not monitoring {address}")
+        await message.reply_text("\n".join(reply_lines))
+    except Exception as e:
+        logger.error(f"Failed to stop monitoring validator: {e}")
+        await message.reply_text("❌ An error occurred. Please try again.")
 
-        # Attempt to delete the specific subscription
-        try:
-            subscription_exists = db_manager.execute_query(
-                "SELECT id FROM subscriptions WHERE user_id = %s AND validator_id = %s",
-                (user_id, validator_id),
-                commit=False
-            )
-            if subscription_exists:
-                db_manager.delete_data('subscriptions', {'user_id': user_id, 'validator_id': validator_id})
-                await update.message.reply_text("✅ Stopped monitoring the validator.")
+
+async def proposals_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    message = update.edited_message if update.edited_message else update.message
+    user_input = context.args
+    db_manager = DatabaseManager(DB_CONFIG)
+
+    try:
+        if user_input and user_input[0].lower() in ('on', 'off'):
+            user_id = ensure_user_exists(db_manager, update.effective_user.id, update.effective_user.username)
+            subscribed = db_manager.execute_query(
+                "SELECT id FROM proposal_subscriptions WHERE user_id = %s", (user_id,))
+            if user_input[0].lower() == 'on':
+                if not subscribed:
+                    db_manager.insert_data('proposal_subscriptions', {'user_id': user_id})
+                await message.reply_text("✅ You'll be notified about new proposals and their voting periods.")
             else:
-                await update.message.reply_text("🔔 You are not monitoring this validator.")
-        except Exception as e:
-            logger.error(f"Failed to stop monitoring validator: {e}")
-            await update.message.reply_text("❌ An error occurred. Please try again.")
+                if subscribed:
+                    db_manager.delete_data('proposal_subscriptions', {'user_id': user_id})
+                await message.reply_text("✅ Stopped governance proposal notifications.")
+            return
+
+        proposals = db_manager.execute_read(
+            "SELECT proposal_id, title, proposal_type, status, voting_start_epoch, voting_end_epoch "
+            "FROM proposals ORDER BY proposal_id DESC LIMIT 5")
+    except Exception as e:
+        logger.error(f"Failed to handle proposals command: {e}")
+        await message.reply_text("❌ An error occurred. Please try again.")
+        return
+
+    if not proposals:
+        await message.reply_text("❌ No governance proposals found yet.")
+        return
+
+    reply_msg = "<b>🗳 Latest Governance Proposals</b>\n\n"
+    for proposal in proposals:
+        reply_msg += "─────────────────────────────────\n"
+        reply_msg += (
+            f"🔹 <b>ID:</b> {proposal['proposal_id']} ({proposal['proposal_type']})\n"
+            f"🔹 <b>Title:</b> {html.escape(proposal['title'] or '')}\n"
+            f"🔹 <b>Status:</b> {proposal['status']}\n"
+            f"🔹 <b>Voting:</b> epoch {proposal['voting_start_epoch']} ➔ {proposal['voting_end_epoch']}\n"
+        )
+    reply_msg += "\nUse <code>/proposals on</code> or <code>/proposals off</code> to toggle notifications."
+    await message.reply_text(reply_msg, parse_mode='HTML')
+
 
+def fetch_view_page(db_manager, user_id, cursor=None):
+    """
+    One page of a user's subscriptions, newest first, located by keyset on subscriptions.id: the first page without
+    a cursor, the page after subscription `id` for ('older', id) and the page before it for ('newer', id).
+    Returns the (subscription id, validator record) pairs of the page, and the cursor ids of the newer and the older
+    page, None where there is no such page.
+    """
+    query = "SELECT id, validator_id FROM subscriptions WHERE user_id = %s"
+    if cursor is None:
+        rows = db_manager.execute_read(query + " ORDER BY id DESC LIMIT %s", (user_id, VIEW_PAGE_SIZE + 1))
+        has_newer, has_older = False, len(rows) > VIEW_PAGE_SIZE
+        rows = rows[:VIEW_PAGE_SIZE]
+    elif cursor[0] == 'older':
+        rows = db_manager.execute_read(query + " AND id < %s ORDER BY id DESC LIMIT %s",
+                                       (user_id, cursor[1], VIEW_PAGE_SIZE + 1))
+        has_newer, has_older = True, len(rows) > VIEW_PAGE_SIZE
+        rows = rows[:VIEW_PAGE_SIZE]
+    else:
+        rows = db_manager.execute_read(query + " AND id > %s ORDER BY id ASC LIMIT %s",
+                                       (user_id, cursor[1], VIEW_PAGE_SIZE + 1))
+        has_newer, has_older = len(rows) > VIEW_PAGE_SIZE, True
+        rows = rows[:VIEW_PAGE_SIZE][::-1]
+
+    records = {record.validator_id: record
+               for record in fetch_validator_records(db_manager, [row['validator_id'] for row in rows])}
+    entries = [(row['id'], records[row['validator_id']]) for row in rows if row['validator_id'] in records]
+    if not entries:
+        return [], None, None
+    return entries, entries[0][0] if has_newer else None, entries[-1][0] if has_older else None
 
-def ensure_validator_exists(db_manager, address, address_type):
+
+def fetch_validator_records(db_manager, validator_ids):
+    """
+    Records of the given validators in the given order, from the snapshot where possible; the database is only
+    queried, once, for validators the snapshot does not hold yet.
+    """
+    records = {validator_id: snapshot.get_by_id(validator_id) for validator_id in validator_ids}
+    missing = [validator_id for validator_id, record in records.items() if record is None]
+    if missing:
+        placeholders = ", ".join(["%s"] * len(missing))
+        for record in db_manager.execute_read(
+                f"SELECT * FROM validators WHERE validator_id IN ({placeholders})", tuple(missing),
+                model=ValidatorRecord):
+            records[record.validator_id] = record
+    return [records[validator_id] for validator_id in validator_ids if records[validator_id] is not None]
+
+
+def ensure_validator_exists(db_manager, address, address_type, chain=DEFAULT_CHAIN):
     query_column = "validator_address" if address_type == 'Namada' else "tendermint_address"
-    query_sql = f"SELECT validator_id FROM validators WHERE {query_column} = %s"
-    validator_info = db_manager.execute_query(query_sql, (address,))
+    query_sql = f"SELECT validator_id FROM validators WHERE chain_id = %s AND {query_column} = %s"
+    validator_info = db_manager.execute_query(query_sql, (chain, address))
     return validator_info[0]['validator_id'] if validator_info else None
 
 
 def ensure_user_exists(db_manager, telegram_id, telegram_name):
+    # Users are never deleted, so a user_id once seen stays valid for the lifetime of the process
+    if telegram_id in known_users:
+        return known_users[telegram_id]
+
     user_query_sql = "SELECT user_id FROM users WHERE telegram_id = %s"
     # Attempt to fetch the existing user by telegram_id
     user_info = db_manager.execute_query(user_query_sql, (str(telegram_id),))
 
     if user_info:
         # User already exists, return the existing user_id
-        return user_info[0]['user_id']
+        user_id = user_info[0]['user_id']
     else:
         # User does not exist, insert new user and return the new user_id
         user_data = {'telegram_id': str(telegram_id), 'telegram_name': telegram_name or ''}
-        new_user_id = db_manager.insert_data_and_get_id('users', user_data)
-        return new_user_id
+        user_id = db_manager.insert_data_and_get_id('users', user_data)
+    known_users[telegram_id] = user_id
+    return user_id
 
 
-def check_subscription_limit(db_manager, user_id, limit=USER_SUBSCRIPTION_LIMIT):
-    subscription_count_query = "SELECT COUNT(*) as count FROM subscriptions WHERE user_id = %s"
-
-    count_result = db_manager.execute_query(subscription_count_query, (user_id,))
-    if count_result and count_result[0]['count'] >= limit:
-        return False
-    return True
+def parse_address_args(args):
+    """
+    Split /monitor and /stop arguments into validator addresses (in order, without duplicates), rule arguments,
+    which are the ones containing '=', the chain the addresses belong to, which is the default chain unless an
+    argument names another one, and reply lines for addresses that are not well formed.
+    """
+    addresses, rule_args, chain, errors = [], [], DEFAULT_CHAIN, []
+    for arg in args:
+        if '=' in arg:
+            rule_args.append(arg)
+            continue
+        if arg in CHAINS:
+            chain = arg
+            continue
+        check_result = check_address_format(arg)
+        if not check_result.success:
+            errors.append(f"❌ {arg}: {check_result.error}")
+        elif arg not in addresses:
+            addresses.append(arg)
+    return addresses, rule_args, chain, errors
 
 
-def create_subscription(db_manager, user_id, validator_id):
-    subscription_exists = db_manager.execute_query(
-        "SELECT id FROM subscriptions WHERE user_id = %s AND validator_id = %s", (user_id, validator_id))
-    if not subscription_exists:
-        db_manager.insert_data('subscriptions', {'user_id': user_id, 'validator_id': validator_id})
-        return True
-    return False
+def lookup_validator_ids(db_manager, addresses, chain=DEFAULT_CHAIN):
+    """
+    Resolve Namada and Tendermint addresses of one chain to validator ids with one query; unknown addresses are
+    left out.
+    """
+    if not addresses:
+        return {}
+    placeholders = ", ".join(["%s"] * len(addresses))
+    rows = db_manager.execute_query(
+        f"SELECT validator_id, validator_address, tendermint_address FROM validators "
+        f"WHERE chain_id = %s AND (validator_address IN ({placeholders}) OR tendermint_address IN ({placeholders}))",
+        (chain, *addresses, *addresses))
+    ids = {}
+    for row in rows:
+        ids[row['validator_address']] = row['validator_id']
+        ids[row['tendermint_address']] = row['validator_id']
+    return {address: ids[address] for address in addresses if address in ids}
+
+
+def subscribe_validators(db_manager, user_id, validator_ids, rules, limit=USER_SUBSCRIPTION_LIMIT):
+    """
+    Subscribe a user to several validators and set their alert rules in one transaction.
+    Returns a Result with the set of newly subscribed validator ids, or an error without writing anything
+    when the batch would exceed the subscription limit.
+    """
+    with db_manager.transaction() as tx:
+        # Locking the user row serializes concurrent /monitor commands of the same user,
+        # so the count checked here is still the count when the insert below commits.
+        tx.execute("SELECT user_id FROM users WHERE user_id = %s FOR UPDATE", (user_id,))
+        subscribed = {row['validator_id'] for row in tx.execute(
+            "SELECT validator_id FROM subscriptions WHERE user_id = %s", (user_id,))}
+        new_ids = {validator_id for validator_id in validator_ids if validator_id not in subscribed}
+        if len(subscribed) + len(new_ids) > limit:
+            return Result(False, error=f"This would exceed the maximum number of subscriptions ({limit}). "
+                                       f"Please stop monitoring a validator to add a new one.")
+        tx.insert_many('subscriptions', [{'user_id': user_id, 'validator_id': validator_id}
+                                         for validator_id in new_ids])
+        if rules:
+            placeholders = ", ".join(["%s"] * len(validator_ids))
+            subscription_ids = [row['id'] for row in tx.execute(
+                f"SELECT id FROM subscriptions WHERE user_id = %s AND validator_id IN ({placeholders})",
+                (user_id, *validator_ids))]
+            set_alert_rules(tx, subscription_ids, rules)
+    rule_engine.invalidate()
+    subscription_index.invalidate()
+    return Result(True, new_ids)
+
+
+def unsubscribe_validators(db_manager, user_id, validator_ids):
+    """Remove a user's subscriptions to the given validators. Returns the set of ids that were subscribed."""
+    placeholders = ", ".join(["%s"] * len(validator_ids))
+    with db_manager.transaction() as tx:
+        subscribed = {row['validator_id'] for row in tx.execute(
+            f"SELECT validator_id FROM subscriptions WHERE user_id = %s AND validator_id IN ({placeholders})",
+            (user_id, *validator_ids))}
+        if subscribed:
+            tx.execute(f"DELETE FROM subscriptions WHERE user_id = %s AND validator_id IN ({placeholders})",
+                       (user_id, *validator_ids))
+    if subscribed:
+        rule_engine.invalidate()
+        subscription_index.invalidate()
+    return subscribed
 
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE):
@@ -287,11 +606,15 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE):
 
 
 def setup_handlers(application):
-    application.add_handler(CommandHandler("start", start_command))
-    application.add_handler(CommandHandler("status", status_command))
-    application.add_handler(CommandHandler("monitor", monitor_command))
-    application.add_handler(CommandHandler("view", view_command))
-    application.add_handler(CommandHandler("stop", stop_command))
+    application.add_handler(CommandHandler("start", rate_limited(start_command)))
+    application.add_handler(CommandHandler("status", rate_limited(status_command)))
+    application.add_handler(CommandHandler("find", rate_limited(find_command)))
+    application.add_handler(CommandHandler("history", rate_limited(history_command)))
+    application.add_handler(CommandHandler("monitor", rate_limited(monitor_command)))
+    application.add_handler(CommandHandler("view", rate_limited(view_command)))
+    application.add_handler(CallbackQueryHandler(rate_limited(view_page_callback), pattern=r'^view:'))
+    application.add_handler(CommandHandler("stop", rate_limited(stop_command)))
+    application.add_handler(CommandHandler("proposals", rate_limited(proposals_command)))
     application.add_error_handler(error_handler)
 
 
@@ -0,0 +1,117 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+from config.settings import DB_CONFIG, CHANGE_RETENTION_DAYS, COMPACTION_BATCH_SIZE, HISTORY_RETENTION_DAYS
+from db.database_manager import LazyDatabaseManager
+
+logger = logging.getLogger(__name__)
+
+db_manager = LazyDatabaseManager(DB_CONFIG)
+
+# Archive column of each column copied from a change table: before/after pairs go to previous_value/new_value,
+# the missed block count of a liveness change and its window to columns of their own.
+ARCHIVED_TABLES = {
+    'validator_state_changes': {'previous_state': 'previous_value', 'new_state': 'new_value'},
+    'commission_rate_changes': {'previous_rate': 'previous_value', 'new_rate': 'new_value'},
+    'liveness_changes': {'missed_blocks': 'missed_blocks', 'window_blocks': 'window_blocks'},
+}
+
+# Delivered notifications that are deleted instead of archived, by primary key. What they report is kept
+# elsewhere: proposals in the proposals table, the validator changes behind rule alerts in validator_history.
+PURGED_TABLES = {
+    'rule_alerts': 'alert_id',
+    'proposal_events': 'event_id',
+}
+
+# Pause between batches so the notifier and the updater get the tables in between.
+BATCH_PAUSE = 0.1
+
+
+def compact_changes():
+    """
+    Move delivered changes older than CHANGE_RETENTION_DAYS into the archive table, delete delivered rule alerts
+    and proposal events of the same age, and drop validator history older than HISTORY_RETENTION_DAYS.
+    """
+    cutoff = datetime.now() - timedelta(days=CHANGE_RETENTION_DAYS)
+    for table_name, columns in ARCHIVED_TABLES.items():
+        moved = in_batches(lambda: archive_batch(table_name, columns, cutoff))
+        if moved:
+            logger.info(f"Archived {moved} delivered change(s) from `{table_name}`.")
+    for table_name, key_column in PURGED_TABLES.items():
+        deleted = in_batches(lambda: delete_batch(table_name, key_column,
+                                                  "notifications_sent = 1 AND change_timestamp < %s", (cutoff,)))
+        if deleted:
+            logger.info(f"Deleted {deleted} delivered notification(s) from `{table_name}`.")
+    prune_history()
+
+
+def prune_history():
+    """
+    Delete validator history older than HISTORY_RETENTION_DAYS, one batch at a time. A row is only written when
+    a validator changes, so the newest row of each validator before the cutoff is kept: it is still the state of
+    a validator that has been stable since, and the baseline of the changes after it.
+    """
+    cutoff = datetime.now() - timedelta(days=HISTORY_RETENTION_DAYS)
+    superseded = ("recorded_at < %s AND EXISTS (SELECT 1 FROM validator_history newer "
+                  "WHERE newer.validator_id = validator_history.validator_id "
+                  "AND newer.height > validator_history.height AND newer.recorded_at < %s)")
+    pruned = in_batches(lambda: delete_batch('validator_history', 'history_id', superseded, (cutoff, cutoff)))
+    if pruned:
+        logger.info(f"Pruned {pruned} validator history row(s).")
+
+
+def in_batches(batch):
+    """Run batch() until it returns fewer than COMPACTION_BATCH_SIZE rows, pausing in between; returns the total."""
+    total = 0
+    while True:
+        size = batch()
+        total += size
+        if size < COMPACTION_BATCH_SIZE:
+            return total
+        time.sleep(BATCH_PAUSE)
+
+
+def delete_batch(table_name, key_column, condition, params):
+    """
+    Delete one batch of rows matching `condition`, keyed by primary key so the statement only locks the rows
+    of the batch. Returns the size of the batch.
+    """
+    rows = db_manager.execute_query(
+        f"SELECT {key_column} FROM `{table_name}` WHERE {condition} ORDER BY {key_column} LIMIT %s",
+        (*params, COMPACTION_BATCH_SIZE))
+    if not rows:
+        return 0
+    keys = [row[key_column] for row in rows]
+    placeholders = ", ".join(["%s"] * len(keys))
+    db_manager.execute_query(
+        f"DELETE FROM `{table_name}` WHERE {key_column} IN ({placeholders})", tuple(keys), commit=True)
+    return len(keys)
+
+
+def archive_batch(table_name, columns, cutoff):
+    """
+    Archive and delete one batch of delivered changes older than `cutoff`, keyed by primary key so each
+    statement only locks the rows of the batch. Returns the size of the batch.
+    The archive keeps (source_table, change_id) unique, so a batch interrupted between the copy and the
+    delete is simply copied again on the next run.
+    """
+    rows = db_manager.execute_query(
+        f"SELECT change_id FROM `{table_name}` WHERE notifications_sent = 1 AND change_timestamp < %s "
+        f"ORDER BY change_id LIMIT %s",
+        (cutoff, COMPACTION_BATCH_SIZE))
+    if not rows:
+        return 0
+
+    change_ids = [row['change_id'] for row in rows]
+    placeholders = ", ".join(["%s"] * len(change_ids))
+    db_manager.execute_query(
+        f"INSERT IGNORE INTO validator_changes_archive "
+        f"(source_table, change_id, validator_id, {', '.join(columns.values())}, change_timestamp) "
+        f"SELECT %s, change_id, validator_id, {', '.join(columns)}, change_timestamp "
+        f"FROM `{table_name}` WHERE change_id IN ({placeholders})",
+        (table_name, *change_ids),
+        commit=True)
+    db_manager.execute_query(
+        f"DELETE FROM `{table_name}` WHERE change_id IN ({placeholders})", tuple(change_ids), commit=True)
+    return len(change_ids)
@@ -1,14 +1,56 @@
 import logging
 
-from config.settings import DB_CONFIG, DB_POOL_SIZE
+from config.settings import DB_CONFIG, DB_POOL_SIZE, DEFAULT_CHAIN
 from db.database_manager import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Version 1 is the full set of tables created by create_tables(). Later schema changes bump SCHEMA_VERSION
+# and register a step in MIGRATIONS (end of this module) that upgrades the previous version, so a fresh database runs
+# create_tables() followed by every migration.
+SCHEMA_VERSION = 7
+
 
 def init_database():
     db_manager = DatabaseManager(DB_CONFIG, pool_name='namada_notify_pool', pool_size=DB_POOL_SIZE)
 
+    version = get_schema_version(db_manager)
+    if version == SCHEMA_VERSION:
+        logger.info(f"Database schema is up to date (version {version}).")
+        return
+
+    if version is None:
+        create_tables(db_manager)
+        set_schema_version(db_manager, 1)
+        version = 1
+    # Each step is recorded as soon as it succeeds, so a boot that fails halfway resumes at the failed step
+    # instead of replaying steps that cannot run twice (ADD COLUMN, CREATE INDEX). Backends with transactional
+    # DDL (SQLite) also roll a failed step back entirely; MySQL commits every DDL statement on its own.
+    for target_version in range(version + 1, SCHEMA_VERSION + 1):
+        logger.info(f"Migrating database schema to version {target_version}...")
+        with db_manager.transaction():
+            MIGRATIONS[target_version](db_manager)
+            set_schema_version(db_manager, target_version)
+
+
+def get_schema_version(db_manager):
+    """
+    Return the recorded schema version, or None for a new database or one created before versioning.
+    Any other database error is raised, so an unreachable database is never mistaken for an empty one.
+    """
+    if not db_manager.table_exists('schema_version'):
+        return None
+    rows = db_manager.execute_query("SELECT MAX(version) AS version FROM schema_version")
+    return rows[0]['version'] if rows else None
+
+
+def set_schema_version(db_manager, version):
+    db_manager.create_table('schema_version', {'version': 'INT NOT NULL'})
+    db_manager.execute_query("DELETE FROM schema_version", commit=True)
+    db_manager.insert_data('schema_version', {'version': version})
+
+
+def create_tables(db_manager):
     tables = {
         'users': {
             'user_id': 'INT AUTO_INCREMENT PRIMARY KEY',
@@ -48,6 +90,9 @@ def init_database():
         db_manager.create_table(table_name, columns, fk_constraints)
 
     create_change_tables(db_manager)
+    create_history_table(db_manager)
+    create_alert_tables(db_manager)
+    create_proposal_tables(db_manager)
 
 
 def create_change_tables(db_manager):
@@ -69,8 +114,206 @@ def create_change_tables(db_manager):
         'notifications_sent': 'TINYINT(1) DEFAULT 0'
     }
 
+    liveness_changes_table = {
+        'change_id': 'INT AUTO_INCREMENT PRIMARY KEY',
+        'validator_id': 'INT NOT NULL',
+        'missed_blocks': 'INT',
+        'window_blocks': 'INT',
+        'change_timestamp': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP',
+        'notifications_sent': 'TINYINT(1) DEFAULT 0'
+    }
+
     foreign_keys_state = ['FOREIGN KEY(validator_id) REFERENCES validators(validator_id)']
     foreign_keys_commission = ['FOREIGN KEY(validator_id) REFERENCES validators(validator_id)']
+    foreign_keys_liveness = ['FOREIGN KEY(validator_id) REFERENCES validators(validator_id)']
 
     db_manager.create_table('validator_state_changes', state_changes_table, foreign_keys_state)
     db_manager.create_table('commission_rate_changes', commission_changes_table, foreign_keys_commission)
+    db_manager.create_table('liveness_changes', liveness_changes_table, foreign_keys_liveness)
+
+
+def create_history_table(db_manager):
+    # Append-only: the updater writes a row only when voting power, state or commission differ from the last one.
+    history_table = {
+        'history_id': 'BIGINT AUTO_INCREMENT PRIMARY KEY',
+        'validator_id': 'INT NOT NULL',
+        'height': 'BIGINT NOT NULL',
+        'voting_power': 'BIGINT',
+        'state': 'VARCHAR(16)',
+        'commission_rate': 'FLOAT',
+        'recorded_at': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'
+    }
+
+    constraints = [
+        'INDEX idx_history_validator_height (validator_id, height)',
+        'INDEX idx_history_recorded_at (recorded_at)',
+        'FOREIGN KEY(validator_id) REFERENCES validators(validator_id)'
+    ]
+
+    db_manager.create_table('validator_history', history_table, constraints)
+
+
+def create_alert_tables(db_manager):
+    alert_rules_table = {
+        'rule_id': 'INT AUTO_INCREMENT PRIMARY KEY',
+        'subscription_id': 'INT NOT NULL',
+        'rule_type': 'VARCHAR(32) NOT NULL',
+        'rule_value': 'VARCHAR(32) NOT NULL',
+        'created_at': 'DATETIME DEFAULT CURRENT_TIMESTAMP'
+    }
+
+    rule_alerts_table = {
+        'alert_id': 'INT AUTO_INCREMENT PRIMARY KEY',
+        'rule_id': 'INT NOT NULL',
+        'validator_id': 'INT NOT NULL',
+        'detail': 'VARCHAR(255)',
+        'change_timestamp': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP',
+        'notifications_sent': 'TINYINT(1) DEFAULT 0'
+    }
+
+    # Rules and their pending alerts go away together with the subscription they belong to.
+    foreign_keys_rules = ['FOREIGN KEY(subscription_id) REFERENCES subscriptions(id) ON DELETE CASCADE']
+    foreign_keys_alerts = [
+        'FOREIGN KEY(rule_id) REFERENCES alert_rules(rule_id) ON DELETE CASCADE',
+        'FOREIGN KEY(validator_id) REFERENCES validators(validator_id)'
+    ]
+
+    db_manager.create_table('alert_rules', alert_rules_table, foreign_keys_rules)
+    db_manager.create_table('rule_alerts', rule_alerts_table, foreign_keys_alerts)
+
+
+def create_proposal_tables(db_manager):
+    proposals_table = {
+        'proposal_id': 'BIGINT PRIMARY KEY',
+        'author': 'VARCHAR(64)',
+        'proposal_type': 'VARCHAR(16)',
+        'title': 'VARCHAR(255)',
+        'content': 'TEXT',
+        'voting_start_epoch': 'BIGINT',
+        'voting_end_epoch': 'BIGINT',
+        'grace_epoch': 'BIGINT',
+        'status': 'VARCHAR(16)',
+        'created_at': 'DATETIME DEFAULT CURRENT_TIMESTAMP'
+    }
+
+    proposal_events_table = {
+        'event_id': 'INT AUTO_INCREMENT PRIMARY KEY',
+        'proposal_id': 'BIGINT NOT NULL',
+        'event_type': 'VARCHAR(16) NOT NULL',
+        'change_timestamp': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP',
+        'notifications_sent': 'TINYINT(1) DEFAULT 0'
+    }
+
+    proposal_subscriptions_table = {
+        'id': 'INT AUTO_INCREMENT PRIMARY KEY',
+        'user_id': 'INT NOT NULL',
+        'created_at': 'DATETIME DEFAULT CURRENT_TIMESTAMP'
+    }
+
+    db_manager.create_table('proposals', proposals_table, ['INDEX idx_proposals_status (status)'])
+    db_manager.create_table('proposal_events', proposal_events_table,
+                            ['FOREIGN KEY(proposal_id) REFERENCES proposals(proposal_id)'])
+    db_manager.create_table('proposal_subscriptions', proposal_subscriptions_table,
+                            ['UNIQUE KEY uq_proposal_subscriptions_user (user_id)',
+                             'FOREIGN KEY(user_id) REFERENCES users(user_id)'])
+
+
+def create_job_tables(db_manager):
+    # One row per validator and update cycle; see service.job_queue for the lease protocol.
+    work_items_table = {
+        'item_id': 'BIGINT AUTO_INCREMENT PRIMARY KEY',
+        'job': 'VARCHAR(32) NOT NULL',
+        'cycle_height': 'BIGINT NOT NULL',
+        'item_key': 'VARCHAR(64) NOT NULL',
+        'payload': 'VARCHAR(255)',
+        'done': 'TINYINT(1) DEFAULT 0',
+        'lease_token': 'VARCHAR(96)',
+        'lease_expires': 'DATETIME',
+        'attempts': 'INT DEFAULT 0',
+        'created_at': 'DATETIME DEFAULT CURRENT_TIMESTAMP'
+    }
+
+    checkpoints_table = {
+        'job': 'VARCHAR(32) PRIMARY KEY',
+        'height': 'BIGINT NOT NULL',
+        'updated_at': 'DATETIME DEFAULT CURRENT_TIMESTAMP'
+    }
+
+    constraints = [
+        'UNIQUE KEY uq_work_items_cycle_key (job, cycle_height, item_key)',
+        'INDEX idx_work_items_lease (lease_token)'
+    ]
+
+    db_manager.create_table('work_items', work_items_table, constraints)
+    db_manager.create_table('checkpoints', checkpoints_table)
+
+
+def create_change_archive(db_manager):
+    # The notifier scans every change table for notifications_sent = 0; the compaction job for old delivered rows.
+    for table_name in ('validator_state_changes', 'commission_rate_changes', 'liveness_changes', 'rule_alerts',
+                       'proposal_events'):
+        db_manager.create_index(table_name, f"idx_{table_name}_pending", ['notifications_sent', 'change_timestamp'])
+
+    # Delivered changes moved out of the change tables by service.compact_changes, one row per change. Liveness
+    # changes get missed_blocks/window_blocks columns in migration 7.
+    archive_table = {
+        'source_table': 'VARCHAR(32) NOT NULL',
+        'change_id': 'INT NOT NULL',
+        'validator_id': 'INT NOT NULL',
+        'previous_value': 'VARCHAR(32)',
+        'new_value': 'VARCHAR(32)',
+        'change_timestamp': 'TIMESTAMP NULL'
+    }
+
+    constraints = [
+        'PRIMARY KEY (source_table, change_id)',
+        'INDEX idx_changes_archive_validator (validator_id, change_timestamp)'
+    ]
+
+    db_manager.create_table('validator_changes_archive', archive_table, constraints)
+
+
+def add_unique_subscriptions(db_manager):
+    # Keep the oldest of any duplicate subscriptions left by earlier versions before enforcing uniqueness.
+    # The derived table lets MySQL select from the table it deletes from.
+    db_manager.execute_query(
+        "DELETE FROM subscriptions WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM subscriptions GROUP BY user_id, validator_id) AS keep)",
+        commit=True)
+    db_manager.create_index('subscriptions', 'uq_subscriptions_user_validator', ['user_id', 'validator_id'],
+                            unique=True)
+
+
+def add_chain_column(db_manager):
+    # Validators stored before multi-chain support belong to the default chain. Changes, history and subscriptions
+    # reference a validator_id, which is specific to one chain, so they carry the chain through that key.
+    db_manager.execute_query(
+        f"ALTER TABLE validators ADD COLUMN chain_id VARCHAR(16) NOT NULL DEFAULT '{DEFAULT_CHAIN}'", commit=True)
+    db_manager.create_index('validators', 'idx_validators_chain_tm', ['chain_id', 'tendermint_address'])
+    db_manager.create_index('validators', 'idx_validators_chain_address', ['chain_id', 'validator_address'])
+
+
+def add_subscription_page_index(db_manager):
+    # /view pages through a user's subscriptions by id (keyset pagination).
+    db_manager.create_index('subscriptions', 'idx_subscriptions_user_id', ['user_id', 'id'])
+
+
+def add_liveness_archive_columns(db_manager):
+    # A liveness change is a count of missed blocks out of a window, not a before/after pair, so it is archived
+    # in columns of its own instead of previous_value/new_value. Rows archived before this step are moved over.
+    db_manager.execute_query("ALTER TABLE validator_changes_archive ADD COLUMN missed_blocks INT", commit=True)
+    db_manager.execute_query("ALTER TABLE validator_changes_archive ADD COLUMN window_blocks INT", commit=True)
+    db_manager.execute_query(
+        "UPDATE validator_changes_archive SET missed_blocks = CAST(previous_value AS SIGNED), "
+        "window_blocks = CAST(new_value AS SIGNED), previous_value = NULL, new_value = NULL "
+        "WHERE source_table = %s", ('liveness_changes',), commit=True)
+
+
+MIGRATIONS = {
+    2: create_job_tables,
+    3: create_change_archive,
+    4: add_unique_subscriptions,
+    5: add_chain_column,
+    6: add_subscription_page_index,
+    7: add_liveness_archive_columns,
+}
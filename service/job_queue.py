@@ -0,0 +1,104 @@
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from config.settings import JOB_LEASE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process in lease tokens, so a stuck lease can be traced back to the instance holding it.
+WORKER_NAME = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    Durable work queue for one job, stored in the work_items and checkpoints tables.
+
+    A cycle enqueues one item per key at a given height. Workers lease batches of items, process them and mark
+    them done; leases that are not completed in time expire and are picked up again, by this or another instance.
+    When every item of a cycle is done the height becomes the job's checkpoint and the items are removed.
+    Items must therefore be safe to process more than once.
+    """
+
+    def __init__(self, db_manager, job, lease_seconds=JOB_LEASE_SECONDS):
+        self.db_manager = db_manager
+        self.job = job
+        self.lease_seconds = lease_seconds
+
+    def get_checkpoint(self):
+        """Return the height of the last completed cycle, or None if the job never completed one."""
+        rows = self.db_manager.execute_query("SELECT height FROM checkpoints WHERE job = %s", (self.job,))
+        return rows[0]['height'] if rows else None
+
+    def set_checkpoint(self, height):
+        if self.get_checkpoint() is None:
+            self.db_manager.insert_data('checkpoints', {'job': self.job, 'height': height})
+        else:
+            self.db_manager.update_data('checkpoints', {'height': height, 'updated_at': datetime.now()},
+                                        {'job': self.job})
+
+    def open_cycle(self):
+        """Return the height of a cycle that was started but not finished, e.g. before a restart."""
+        rows = self.db_manager.execute_query(
+            "SELECT MIN(cycle_height) AS height FROM work_items WHERE job = %s", (self.job,))
+        return rows[0]['height'] if rows else None
+
+    def enqueue(self, height, items):
+        """Add (item_key, payload) pairs to the cycle at `height`; items already queued are left as they are."""
+        rows = [{'job': self.job, 'cycle_height': height, 'item_key': key, 'payload': payload}
+                for key, payload in items]
+        self.db_manager.insert_many('work_items', rows, ignore=True)
+
+    def claim(self, height, batch_size):
+        """
+        Lease up to `batch_size` pending items of the cycle at `height` and return them as
+        (item_id, item_key, payload) tuples. Items leased by another worker are skipped until their lease expires.
+        """
+        now = datetime.now()
+        candidates = self.db_manager.execute_query(
+            "SELECT item_id FROM work_items WHERE job = %s AND cycle_height = %s AND done = 0 "
+            "AND (lease_expires IS NULL OR lease_expires < %s) ORDER BY item_id LIMIT %s",
+            (self.job, height, now, batch_size))
+        if not candidates:
+            return []
+
+        # The conditional update is what makes the claim exclusive: when two workers race for the same
+        # items, only the rows whose lease is still free when the update runs get this worker's token.
+        token = f"{WORKER_NAME}:{uuid.uuid4().hex[:12]}"
+        item_ids = [row['item_id'] for row in candidates]
+        placeholders = ", ".join(["%s"] * len(item_ids))
+        self.db_manager.execute_query(
+            f"UPDATE work_items SET lease_token = %s, lease_expires = %s, attempts = attempts + 1 "
+            f"WHERE item_id IN ({placeholders}) AND done = 0 AND (lease_expires IS NULL OR lease_expires < %s)",
+            (token, now + timedelta(seconds=self.lease_seconds), *item_ids, now),
+            commit=True)
+        rows = self.db_manager.execute_query(
+            "SELECT item_id, item_key, payload FROM work_items WHERE lease_token = %s", (token,))
+        return [(row['item_id'], row['item_key'], row['payload']) for row in rows]
+
+    def complete(self, item_ids):
+        if not item_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(item_ids))
+        self.db_manager.execute_query(
+            f"UPDATE work_items SET done = 1 WHERE item_id IN ({placeholders})", tuple(item_ids), commit=True)
+
+    def finish_cycle(self, height):
+        """
+        Close the cycle at `height` once all of its items are done. Returns True for the worker that closed it,
+        False while items are still pending or leased by another worker.
+        """
+        rows = self.db_manager.execute_query(
+            "SELECT COUNT(*) AS remaining FROM work_items WHERE job = %s AND cycle_height = %s AND done = 0",
+            (self.job, height))
+        if rows[0]['remaining']:
+            return False
+        deleted = self.db_manager.execute_query(
+            "DELETE FROM work_items WHERE job = %s AND cycle_height = %s", (self.job, height), commit=True)
+        if not deleted:
+            # Another worker closed the cycle first.
+            return False
+        self.set_checkpoint(height)
+        return True
@@ -0,0 +1,35 @@
+import threading
+import time
+
+
+class Metrics:
+    """
+    Process-wide counters and gauges, rendered in the Prometheus text format by the /metrics endpoint.
+    Updated from the event loop and from executor threads alike, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self.started_at = time.time()
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def render(self):
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+        lines = [f"namada_bot_uptime_seconds {time.time() - self.started_at:.0f}"]
+        lines += [f"namada_bot_{name} {value}" for name, value in counters]
+        lines += [f"namada_bot_{name} {value}" for name, value in gauges]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -1,31 +1,49 @@
 import asyncio
+import contextvars
+import functools
+import html
 import logging
 
 from telegram import Bot
 
 from config.settings import DB_CONFIG, TELEGRAM_BOT_TOKEN
-from db.database_manager import DatabaseManager
+from db.database_manager import LazyDatabaseManager
+from service.metrics import metrics
+from service.profiling import profiled_cycle
+from service.rendering import validator_header
 
 logger = logging.getLogger(__name__)
 
-bot = Bot(token=TELEGRAM_BOT_TOKEN)
-db_manager = DatabaseManager(DB_CONFIG)
+db_manager = LazyDatabaseManager(DB_CONFIG)
+_bot = None
+
+
+def get_bot():
+    """Create the Telegram Bot on first use instead of at import time."""
+    global _bot
+    if _bot is None:
+        _bot = Bot(token=TELEGRAM_BOT_TOKEN)
+    return _bot
 
 
 async def run_in_executor(func, *args, **kwargs):
     """Run synchronous functions in the default Executor (thread pool) to make them compatible with asynchronous calls"""
     loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+    # Carry the caller's context into the worker thread so its work is counted in the running profile cycle.
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(None, context.run, functools.partial(func, *args, **kwargs))
 
 
 async def send_telegram_message(chat_id, text, parse_mode='HTML', retries=3, delay=5):
     for attempt in range(retries):
         try:
-            await bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+            await get_bot().send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+            metrics.inc("notifications_sent_total")
             return True
         except Exception as e:
             logger.error(f"Attempt {attempt + 1}: Error sending message to {chat_id}, retrying in {delay} seconds...")
             await asyncio.sleep(delay)
+    metrics.inc("notifications_failed_total")
     return False
 
 
@@ -37,7 +55,7 @@ async def get_subscribers(validator_id):
     WHERE s.validator_id = %s
     """
     # Adapting synchronous database operations to an asynchronous environment
-    return await run_in_executor(db_manager.execute_query, query, (validator_id,))
+    return await run_in_executor(db_manager.execute_read, query, (validator_id,))
 
 
 async def update_notifications_sent(table_name, change_id):
@@ -46,7 +64,7 @@ async def update_notifications_sent(table_name, change_id):
 
 async def notify_state_changes():
     query = """
-    SELECT sc.*, v.validator_address, v.tendermint_address, v.validator_id
+    SELECT sc.*, v.validator_address, v.tendermint_address, v.validator_id, v.chain_id
     FROM validator_state_changes sc
     JOIN validators v ON sc.validator_id = v.validator_id
     WHERE sc.notifications_sent = 0
@@ -60,7 +78,8 @@ async def notify_state_changes():
         else:
             message = format_state_change_message(change['validator_address'], change['tendermint_address'],
                                                   change['previous_state'], change['new_state'], change['change_id'],
-                                                  change['change_timestamp'].strftime("%Y-%m-%d %H:%M:%S"))
+                                                  change['change_timestamp'].strftime("%Y-%m-%d %H:%M:%S"),
+                                                  change['chain_id'])
             for subscriber in subscribers:
                 if not await send_telegram_message(subscriber['telegram_id'], message):
                     all_sent = False
@@ -71,7 +90,7 @@ async def notify_state_changes():
 
 async def notify_commission_changes():
     query = """
-    SELECT cc.*, v.validator_address, v.tendermint_address, v.validator_id
+    SELECT cc.*, v.validator_address, v.tendermint_address, v.validator_id, v.chain_id
     FROM commission_rate_changes cc
     JOIN validators v ON cc.validator_id = v.validator_id
     WHERE cc.notifications_sent = 0
@@ -85,7 +104,8 @@ async def notify_commission_changes():
         else:
             message = format_commission_change_message(change['validator_address'], change['tendermint_address'],
                                                        change['previous_rate'], change['new_rate'], change['change_id'],
-                                                       change['change_timestamp'].strftime("%Y-%m-%d %H:%M:%S"))
+                                                       change['change_timestamp'].strftime("%Y-%m-%d %H:%M:%S"),
+                                                       change['chain_id'])
             for subscriber in subscribers:
                 if not await send_telegram_message(subscriber['telegram_id'], message, parse_mode='HTML'):
                     all_sent = False
@@ -94,13 +114,91 @@ async def notify_commission_changes():
             await update_notifications_sent('commission_rate_changes', change['change_id'])
 
 
+async def notify_liveness_changes():
+    query = """
+    SELECT lc.*, v.validator_address, v.tendermint_address, v.validator_id, v.chain_id
+    FROM liveness_changes lc
+    JOIN validators v ON lc.validator_id = v.validator_id
+    WHERE lc.notifications_sent = 0
+    """
+    changes = await run_in_executor(db_manager.execute_query, query)
+    for change in changes:
+        subscribers = await get_subscribers(change['validator_id'])
+        all_sent = True
+        if not subscribers:
+            logger.info(f"No subscribers for validator {change['validator_id']}, no messages sent.")
+        else:
+            message = format_liveness_change_message(change['validator_address'], change['tendermint_address'],
+                                                     change['missed_blocks'], change['window_blocks'],
+                                                     change['change_id'],
+                                                     change['change_timestamp'].strftime("%Y-%m-%d %H:%M:%S"),
+                                                     change['chain_id'])
+            for subscriber in subscribers:
+                if not await send_telegram_message(subscriber['telegram_id'], message):
+                    all_sent = False
+                    break
+        if all_sent:
+            await update_notifications_sent('liveness_changes', change['change_id'])
+
+
+async def notify_proposal_events():
+    query = """
+    SELECT pe.*, p.title, p.proposal_type, p.author, p.voting_start_epoch, p.voting_end_epoch
+    FROM proposal_events pe
+    JOIN proposals p ON pe.proposal_id = p.proposal_id
+    WHERE pe.notifications_sent = 0
+    """
+    events = await run_in_executor(db_manager.execute_query, query)
+    if not events:
+        return
+    subscribers = await run_in_executor(db_manager.execute_query, """
+    SELECT u.telegram_id
+    FROM proposal_subscriptions ps
+    JOIN users u ON ps.user_id = u.user_id
+    """)
+    for event in events:
+        all_sent = True
+        message = format_proposal_event_message(event['proposal_id'], event['event_type'], event['title'],
+                                                event['proposal_type'], event['author'],
+                                                event['voting_start_epoch'], event['voting_end_epoch'])
+        for subscriber in subscribers:
+            if not await send_telegram_message(subscriber['telegram_id'], message):
+                all_sent = False
+                break
+        if all_sent:
+            await run_in_executor(db_manager.update_data, 'proposal_events', {'notifications_sent': 1},
+                                  {'event_id': event['event_id']})
+
+
+async def notify_rule_alerts():
+    query = """
+    SELECT ra.*, r.rule_type, r.rule_value, u.telegram_id, v.validator_address, v.tendermint_address, v.chain_id
+    FROM rule_alerts ra
+    JOIN alert_rules r ON ra.rule_id = r.rule_id
+    JOIN subscriptions s ON r.subscription_id = s.id
+    JOIN users u ON s.user_id = u.user_id
+    JOIN validators v ON ra.validator_id = v.validator_id
+    WHERE ra.notifications_sent = 0
+    """
+    alerts = await run_in_executor(db_manager.execute_query, query)
+    for alert in alerts:
+        # Each alert belongs to exactly one subscriber: the owner of the rule that fired.
+        message = format_rule_alert_message(alert['validator_address'], alert['tendermint_address'],
+                                            f"{alert['rule_type']}={alert['rule_value']}", alert['detail'],
+                                            alert['alert_id'],
+                                            alert['change_timestamp'].strftime("%Y-%m-%d %H:%M:%S"),
+                                            alert['chain_id'])
+        if await send_telegram_message(alert['telegram_id'], message):
+            await run_in_executor(db_manager.update_data, 'rule_alerts', {'notifications_sent': 1},
+                                  {'alert_id': alert['alert_id']})
+
+
 def format_state_change_message(validator_address, tendermint_address, previous_state, new_state, change_id,
-                                change_timestamp):
+                                change_timestamp, chain_id=None):
     """Format the message for state change notifications using HTML."""
     return (f"🔔 <b>Validator State Change Alert</b>\n\n"
             f"🆔 Change ID: {change_id}\n"
-            f"🔹 Address: <code>{validator_address}</code>\n"
-            f"🔹 TM Address: <code>{tendermint_address}</code>\n"
+            f"{validator_header(validator_address, tendermint_address, chain_id)}"
             f"🔹 State Change: <b>⚠️{previous_state} ➔ {new_state}⚠️</b>\n"
             f"🔹 Detected At: 🕒{change_timestamp}\n\n"
             f"Please ignore this message if you have received it before.\n"
@@ -108,18 +206,63 @@ def format_state_change_message(validator_address, tendermint_address, previous_
 
 
 def format_commission_change_message(validator_address, tendermint_address, previous_rate, new_rate, change_id,
-                                     change_timestamp):
+                                     change_timestamp, chain_id=None):
     """Format the message for commission rate change notifications using HTML."""
     return (f"🔔 <b>Validator Commission Change Alert</b>\n\n"
             f"🆔 Change ID: {change_id}\n"
-            f"🔹 Address: <code>{validator_address}</code>\n"
-            f"🔹 TM Address: <code>{tendermint_address}</code>\n"
+            f"{validator_header(validator_address, tendermint_address, chain_id)}"
             f"🔹 Commission Rate: <b>⚠️{previous_rate}% ➔ {new_rate}⚠️</b>\n"
             f"🔹 Detected At: 🕒{change_timestamp}\n\n"
             f"Please ignore this message if you have received it before.\n"
             f"Keep an eye on your validators' performance.")
 
 
+def format_liveness_change_message(validator_address, tendermint_address, missed_blocks, window_blocks, change_id,
+                                   change_timestamp, chain_id=None):
+    """Format the message for missed block notifications using HTML."""
+    return (f"🔔 <b>Validator Missed Blocks Alert</b>\n\n"
+            f"🆔 Change ID: {change_id}\n"
+            f"{validator_header(validator_address, tendermint_address, chain_id)}"
+            f"🔹 Missed Blocks: <b>⚠️{missed_blocks} of the last {window_blocks}⚠️</b>\n"
+            f"🔹 Detected At: 🕒{change_timestamp}\n\n"
+            f"Please ignore this message if you have received it before.\n"
+            f"Check your node before it gets jailed.")
+
+
+PROPOSAL_EVENT_TITLES = {
+    'new': "New Governance Proposal",
+    'voting_started': "Proposal Voting Started",
+    'voting_ended': "Proposal Voting Ended",
+}
+
+
+def format_proposal_event_message(proposal_id, event_type, title, proposal_type, author, voting_start_epoch,
+                                  voting_end_epoch):
+    """Format the message for governance proposal notifications using HTML."""
+    return (f"🗳 <b>{PROPOSAL_EVENT_TITLES.get(event_type, event_type)}</b>\n\n"
+            f"🆔 Proposal ID: {proposal_id}\n"
+            f"🔹 Title: {html.escape(title or '')}\n"
+            f"🔹 Type: {proposal_type}\n"
+            f"🔹 Author: <code>{author}</code>\n"
+            f"🔹 Voting: epoch {voting_start_epoch} ➔ {voting_end_epoch}")
+
+
+def format_rule_alert_message(validator_address, tendermint_address, rule, detail, alert_id, change_timestamp,
+                              chain_id=None):
+    """Format the message for alert rule notifications using HTML."""
+    return (f"🔔 <b>Validator Alert Rule Triggered</b>\n\n"
+            f"🆔 Alert ID: {alert_id}\n"
+            f"{validator_header(validator_address, tendermint_address, chain_id)}"
+            f"🔹 Rule: <code>{rule}</code>\n"
+            f"🔹 Detail: <b>⚠️{html.escape(detail or '')}⚠️</b>\n"
+            f"🔹 Detected At: 🕒{change_timestamp}\n\n"
+            f"Please ignore this message if you have received it before.")
+
+
+@profiled_cycle
 async def notify_users():
     await notify_state_changes()
     await notify_commission_changes()
+    await notify_liveness_changes()
+    await notify_rule_alerts()
+    await notify_proposal_events()
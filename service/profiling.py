@@ -0,0 +1,77 @@
+import asyncio
+import cProfile
+import functools
+import json
+import logging
+import os
+
+from config.settings import PROFILING, PROFILE_DIR, PROFILE_CPROFILE
+# span() lives in the RPC library, which must not depend on this package; the rest of the bot imports it from here.
+from nam_lib.spans import SpanCollector, current_cycle, span, take_background
+
+logger = logging.getLogger(__name__)
+
+
+def profiled_cycle(func):
+    """
+    Record a report for every run of a scheduled cycle (sync or async). Without PROFILING the function is
+    returned unchanged.
+    """
+    if not PROFILING:
+        return func
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            collector, token, profiler = _start_cycle(func.__name__)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _finish_cycle(collector, token, profiler)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        collector, token, profiler = _start_cycle(func.__name__)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _finish_cycle(collector, token, profiler)
+    return wrapper
+
+
+def _start_cycle(name):
+    collector = SpanCollector(name)
+    token = current_cycle.set(collector)
+    profiler = None
+    if PROFILE_CPROFILE:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another cycle on a different thread is already being profiled; only one profiler can be active.
+            profiler = None
+    return collector, token, profiler
+
+
+def _finish_cycle(collector, token, profiler):
+    current_cycle.reset(token)
+    if profiler is not None:
+        profiler.disable()
+    stamp = collector.started_at.strftime('%Y%m%dT%H%M%S')
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        write_report(collector.report(collector.drain()), os.path.join(PROFILE_DIR, f"{collector.name}-{stamp}.json"))
+        background = take_background()
+        durations = background.drain()
+        if durations:
+            write_report(background.report(durations), os.path.join(PROFILE_DIR, f"commands-{stamp}.json"))
+        if profiler is not None:
+            profiler.dump_stats(os.path.join(PROFILE_DIR, f"{collector.name}-{stamp}.prof"))
+    except OSError as e:
+        logger.error(f"Failed to write profile report for {collector.name}: {e}")
+
+
+def write_report(report, path):
+    with open(path, 'w') as report_file:
+        json.dump(report, report_file, separators=(',', ':'))
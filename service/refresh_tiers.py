@@ -0,0 +1,100 @@
+import logging
+import threading
+
+from config.settings import UPDATE_COLD_EVERY, UPDATE_HOT_POWER_MARGIN, LIVENESS_MISS_THRESHOLD
+from service.snapshot import snapshot
+from service.track_liveness import trackers
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionIndex:
+    """
+    Ids of the validators at least one user monitors, kept in memory so the updater can tell monitored
+    validators apart without a query per validator. Reloaded on first use after invalidate(), which the
+    commands call whenever subscriptions change, and by reload() at the start of every update cycle, which
+    picks up subscriptions written by other instances. `generation` counts the changes, so anything derived
+    from subscriptions can tell whether it is still current.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._validator_ids = None
+        self.generation = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._validator_ids = None
+            self.generation += 1
+
+    def reload(self, db_manager):
+        """Load the set again, unless it was invalidated meanwhile (the next use then loads it)."""
+        with self._lock:
+            generation = self.generation
+        validator_ids = self._load(db_manager)
+        with self._lock:
+            if self.generation == generation and validator_ids != self._validator_ids:
+                if self._validator_ids is not None:
+                    self.generation += 1
+                self._validator_ids = validator_ids
+
+    def validator_ids(self, db_manager):
+        with self._lock:
+            if self._validator_ids is None:
+                self._validator_ids = self._load(db_manager)
+            return self._validator_ids
+
+    @staticmethod
+    def _load(db_manager):
+        rows = db_manager.execute_query("SELECT DISTINCT validator_id FROM subscriptions")
+        validator_ids = frozenset(row['validator_id'] for row in rows)
+        logger.info(f"Loaded the subscription index: {len(validator_ids)} monitored validator(s).")
+        return validator_ids
+
+
+subscription_index = SubscriptionIndex()
+
+
+class RefreshTiers:
+    """
+    Decides which validators an update cycle refreshes, per chain. Hot validators are refreshed every cycle:
+    validators not stored yet, monitored ones, ones outside the Consensus state, ones whose voting power is
+    within UPDATE_HOT_POWER_MARGIN percent of the smallest in the set (they are the next to drop out of it),
+    and ones that missed at least half the blocks that raise a liveness alert. Every other validator is only
+    refreshed by a full cycle, which runs after boot, on every epoch change and every UPDATE_COLD_EVERY cycles.
+    """
+
+    def __init__(self, cold_every=UPDATE_COLD_EVERY, power_margin=UPDATE_HOT_POWER_MARGIN):
+        self.cold_every = cold_every
+        self.power_margin = power_margin
+        self._epochs = {}
+        self._cycles = {}
+
+    def select(self, chain, validators, epoch, subscribed):
+        """
+        Pick the (tendermint_address, voting_power) pairs to refresh from the validator set of this cycle.
+        Returns them and whether this is a full cycle. An unknown epoch never forces a full cycle.
+        """
+        epoch_changed = epoch is not None and self._epochs.get(chain) != epoch
+        cycles = self._cycles.get(chain, 0) + 1
+        if epoch_changed or chain not in self._cycles or cycles >= self.cold_every:
+            if epoch is not None:
+                self._epochs[chain] = epoch
+            self._cycles[chain] = 0
+            return validators, True
+        self._cycles[chain] = cycles
+
+        power_cutoff = min(int(power) for _, power in validators) * (100 + self.power_margin) / 100 \
+            if validators else 0
+        tracker = trackers.get(chain)
+        hot = []
+        for tm_addr, voting_power in validators:
+            record = snapshot.get(tm_addr, 'Tendermint', chain)
+            if (record is None or record.validator_id in subscribed or record.state != 'Consensus'
+                    or int(voting_power) <= power_cutoff
+                    or (tracker is not None and tracker.miss_rate(tm_addr) * 2 >= LIVENESS_MISS_THRESHOLD)):
+                hot.append((tm_addr, voting_power))
+        return hot, False
+
+
+refresh_tiers = RefreshTiers()
@@ -0,0 +1,110 @@
+import functools
+import html
+from collections import OrderedDict
+
+from config.settings import CHAINS, VIEW_CACHE_SIZE
+
+SEPARATOR = "─────────────────────────────────\n"
+
+
+class ValidatorRenderer:
+    """
+    Renders the HTML block describing a validator and keeps it until that validator changes.
+    The snapshot only swaps in a new record object for validators whose values changed, so a cached block is
+    current exactly as long as it was rendered from the record the caller holds.
+    """
+
+    def __init__(self):
+        self._blocks = {}
+
+    def block(self, record):
+        key = (record.chain_id, record.tendermint_address)
+        cached = self._blocks.get(key)
+        if cached is not None and cached[0] is record:
+            return cached[1]
+        block = render_validator_block(record)
+        self._blocks[key] = (record, block)
+        return block
+
+
+renderer = ValidatorRenderer()
+
+
+class PageCache:
+    """
+    Least recently used cache of rendered /view pages. An entry is only returned while the stamp it was stored
+    with (snapshot version and subscription generation) is still the current one.
+    """
+
+    def __init__(self, max_entries=VIEW_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._pages = OrderedDict()
+
+    def get(self, key, stamp):
+        entry = self._pages.get(key)
+        if entry is None or entry[0] != stamp:
+            return None
+        self._pages.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, stamp, page):
+        self._pages[key] = (stamp, page)
+        self._pages.move_to_end(key)
+        if len(self._pages) > self.max_entries:
+            self._pages.popitem(last=False)
+
+
+view_pages = PageCache()
+
+
+def render_validator_block(record):
+    """HTML lines of one validator; every value that comes from on-chain metadata is escaped."""
+    block = f"🔹 <b>Chain:</b> {escape(record.chain_id)}\n" if len(CHAINS) > 1 else ""
+    block += (f"🔹 <b>Address:</b> {escape(record.validator_address)}\n"
+             f"🔹 <b>TM Address:</b> {escape(record.tendermint_address)}\n"
+             f"🔹 <b>State:</b> {escape(record.state)}\n"
+             f"🔹 <b>Voting Power:</b> {record.voting_power}\n"
+             f"🔹 <b>Commission Rate:</b> {record.commission_rate}\n"
+             f"🔹 <b>Email:</b> {escape(record.email)}\n")
+    if record.website:
+        website = escape(record.website)
+        block += f"🔹 <b>Website:</b> <a href='{website}'>{website}</a>\n"
+    if record.discord_handle:
+        block += f"🔹 <b>Discord:</b> {escape(record.discord_handle)}\n"
+    return block
+
+
+def render_status(record):
+    return "🌟 <b>Validator Info</b> 🌟\n\n" + renderer.block(record).rstrip('\n')
+
+
+def render_view(records):
+    blocks = "".join(SEPARATOR + renderer.block(record) for record in records)
+    return ("<b>🔎 Your Monitored Validators</b>\n\n" + blocks).rstrip('\n')
+
+
+def render_find(query, records):
+    """One compact entry per search result, with the address to pass to /status."""
+    reply = f"🔎 <b>Validators matching</b> <code>{escape(query)}</code>\n\n"
+    for record in records:
+        contacts = " · ".join(escape(value) for value in (record.email, record.website, record.discord_handle) if value)
+        reply += SEPARATOR
+        if len(CHAINS) > 1:
+            reply += f"🔹 <b>Chain:</b> {escape(record.chain_id)}\n"
+        reply += (f"🔹 <code>{escape(record.validator_address)}</code>\n"
+                  f"🔹 {escape(record.state)}, voting power {record.voting_power}\n")
+        if contacts:
+            reply += f"🔹 {contacts}\n"
+    return reply + "\nUse <code>/status [address]</code> for the details of a validator."
+
+
+@functools.lru_cache(maxsize=4096)
+def validator_header(validator_address, tendermint_address, chain_id=None):
+    """Address lines shared by every notification about a validator, led by its chain when several are followed."""
+    header = f"🔹 Chain: {escape(chain_id)}\n" if len(CHAINS) > 1 else ""
+    return (header + f"🔹 Address: <code>{escape(validator_address)}</code>\n"
+            f"🔹 TM Address: <code>{escape(tendermint_address)}</code>\n")
+
+
+def escape(value):
+    return html.escape(str(value)) if value is not None else ''
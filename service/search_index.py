@@ -0,0 +1,196 @@
+import bisect
+import heapq
+import logging
+import re
+import threading
+from collections import Counter, defaultdict
+
+from config.settings import FIND_RESULT_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# Validator metadata carries no moniker, so these are what users know a validator by.
+METADATA_FIELDS = ('email', 'website', 'discord_handle', 'description')
+ADDRESS_FIELDS = ('validator_address', 'tendermint_address')
+# Every validator address starts with this, so a query that is only part of it does not select anything.
+ADDRESS_PREFIX = 'tnam1q'
+MIN_QUERY_LENGTH = 2
+# Shorter queries are too unspecific for trigram overlap to mean anything.
+MIN_FUZZY_LENGTH = 4
+# Candidate sets larger than 1/WALK_RATIO of the index are searched by walking the voting power ranking.
+WALK_RATIO = 8
+
+_TOKEN = re.compile(r'[0-9a-z]+')
+_EMPTY = frozenset()
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def index_keys(text):
+    """
+    Trigrams of the text, plus the two-character prefix of every word so two-character queries are indexed too,
+    and the first two and three characters of every field, which find the matches at the start of a field.
+    """
+    keys = trigrams(text) | {'\0' + token[:2] for token in _TOKEN.findall(text) if len(token) >= 2}
+    for field in text.split('\n'):
+        keys.update(('\1' + field[:2], '\1' + field[:3]))
+    return keys
+
+
+class SearchIndex:
+    """
+    Case-insensitive search over validator metadata and addresses.
+
+    The metadata fields of each validator are lowercased into one text and every trigram of it is posted to an
+    inverted index. A query is answered by intersecting the postings of its own trigrams, smallest first, and
+    checking the candidates left for the full substring; when nothing contains the query, validators sharing
+    at least half of its trigrams are returned instead, which absorbs typos. Addresses are random, so instead of
+    trigrams they are kept in a sorted list and matched by prefix with a binary search.
+    Validators are also kept ranked by voting power: a broad query walks that ranking and stops once it has
+    enough results, instead of checking and sorting every candidate.
+    Only the records that changed are re-indexed after an update cycle.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts = {}
+        self._records = {}
+        self._postings = defaultdict(set)
+        self._addresses = []
+        self._ranking = []
+
+    def __len__(self):
+        return len(self._records)
+
+    def rebuild(self, records):
+        with self._lock:
+            self._texts, self._records, self._postings, self._addresses, self._ranking = {}, {}, defaultdict(set), [], []
+            for record in records:
+                self._add(record, self._addresses.append, self._ranking.append)
+            self._addresses.sort()
+            self._ranking.sort()
+        logger.info(f"Built the search index over {len(records)} validator(s).")
+
+    def update(self, records):
+        """Re-index the given records, e.g. the changed ones returned by ValidatorSnapshot.apply()."""
+        if not records:
+            return
+        with self._lock:
+            for record in records:
+                self._remove(record.validator_id)
+            for record in records:
+                self._add(record, lambda entry: bisect.insort(self._addresses, entry),
+                          lambda entry: bisect.insort(self._ranking, entry))
+
+    def _add(self, record, add_address, add_ranking):
+        text = "\n".join((getattr(record, field) or '').lower() for field in METADATA_FIELDS)
+        postings = self._postings
+        for key in index_keys(text):
+            postings[key].add(record.validator_id)
+        for field in ADDRESS_FIELDS:
+            address = getattr(record, field)
+            if address:
+                add_address((address.lower(), record.validator_id))
+        add_ranking((-(record.voting_power or 0), record.validator_id))
+        self._texts[record.validator_id] = text
+        self._records[record.validator_id] = record
+
+    def _remove(self, validator_id):
+        record = self._records.pop(validator_id, None)
+        if record is None:
+            return
+        for key in index_keys(self._texts.pop(validator_id)):
+            postings = self._postings[key]
+            postings.discard(validator_id)
+            if not postings:
+                del self._postings[key]
+        entries = [(self._addresses, (address.lower(), validator_id))
+                   for address in (getattr(record, field) for field in ADDRESS_FIELDS) if address]
+        entries.append((self._ranking, (-(record.voting_power or 0), validator_id)))
+        for sorted_list, entry in entries:
+            position = bisect.bisect_left(sorted_list, entry)
+            if position < len(sorted_list) and sorted_list[position] == entry:
+                del sorted_list[position]
+
+    def search(self, query, limit=FIND_RESULT_LIMIT):
+        """
+        Records matching `query`, best first: address prefixes, then metadata matching at the start of a field,
+        then anywhere, each by voting power. Fuzzy matches come last, by the number of trigrams in common.
+        """
+        query = query.strip().lower()
+        if len(query) < MIN_QUERY_LENGTH:
+            return []
+        with self._lock:
+            found = self._address_matches(query, limit)
+            if len(found) < limit:
+                found += [validator_id for validator_id in self._metadata_matches(query, limit)
+                          if validator_id not in found]
+            return [self._records[validator_id] for validator_id in found[:limit]]
+
+    def _address_matches(self, query, limit):
+        """
+        The first `limit` validators whose address starts with `query`, by voting power. A prefix shared by many
+        addresses does not rank all of them; the user narrows it down by typing on.
+        """
+        if ADDRESS_PREFIX.startswith(query):
+            return []
+        # A dict keeps validators whose two addresses both match once.
+        matches = {}
+        position = bisect.bisect_left(self._addresses, (query,))
+        while (len(matches) < limit and position < len(self._addresses)
+               and self._addresses[position][0].startswith(query)):
+            matches[self._addresses[position][1]] = None
+            position += 1
+        return sorted(matches, key=self._power_key)
+
+    def _metadata_matches(self, query, limit):
+        if len(query) < 3:
+            candidates = self._postings.get('\0' + query, _EMPTY)
+            postings = []
+        else:
+            postings = sorted((self._postings.get(gram, _EMPTY) for gram in trigrams(query)), key=len)
+            candidates = postings[0]
+            # Large candidate sets are walked in ranking order anyway, where the substring check does the rest.
+            if len(candidates) * WALK_RATIO < len(self._ranking):
+                candidates = candidates.intersection(*postings[1:])
+        if candidates:
+            texts = self._texts
+            field_start = '\n' + query
+            starts = candidates & self._postings.get('\1' + query[:3], _EMPTY)
+            found = self._top_by_power(starts, limit, lambda validator_id: (
+                texts[validator_id].startswith(query) or field_start in texts[validator_id]))
+            if len(found) < limit:
+                first = set(found)
+                found += self._top_by_power(candidates, limit - len(found), lambda validator_id: (
+                    validator_id not in first and query in texts[validator_id]))
+            if found:
+                return found
+        if len(query) < MIN_FUZZY_LENGTH:
+            return []
+        counts = Counter()
+        for validator_ids in postings:
+            counts.update(validator_ids)
+        return [validator_id for validator_id, count in counts.most_common(limit)
+                if count >= 2 and count * 2 >= len(postings)]
+
+    def _top_by_power(self, validator_ids, limit, accept):
+        """The `limit` validators of `validator_ids` with the largest voting power that `accept` lets through."""
+        if not validator_ids:
+            return []
+        if len(validator_ids) * WALK_RATIO < len(self._ranking):
+            return heapq.nsmallest(limit, filter(accept, validator_ids), key=self._power_key)
+        found = []
+        for _, validator_id in self._ranking:
+            if validator_id in validator_ids and accept(validator_id):
+                found.append(validator_id)
+                if len(found) == limit:
+                    break
+        return found
+
+    def _power_key(self, validator_id):
+        return -(self._records[validator_id].voting_power or 0)
+
+
+search_index = SearchIndex()
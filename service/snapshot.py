@@ -0,0 +1,71 @@
+import logging
+import threading
+
+from config.settings import DEFAULT_CHAIN
+from db.models import ValidatorRecord
+
+logger = logging.getLogger(__name__)
+
+
+class ValidatorSnapshot:
+    """
+    In-memory copy of the validators table. It is loaded once at boot so commands can answer before the
+    first update cycle finishes, and kept current by the updater after every cycle.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_address = {}
+        self._by_tm_address = {}
+        self.version = 0
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def load(self, db_manager):
+        records = db_manager.execute_query("SELECT * FROM validators", model=ValidatorRecord)
+        with self._lock:
+            self._by_id, self._by_address, self._by_tm_address = {}, {}, {}
+            self._index(records)
+            self.version += 1
+            self.loaded = True
+        logger.info(f"Loaded {len(records)} validator(s) into the in-memory snapshot.")
+
+    def apply(self, records):
+        """
+        Replace the entries of the given freshly fetched records. Validators whose values did not change keep
+        their current record object, which is what lets cached renderings stay valid. Returns the changed records.
+        """
+        with self._lock:
+            changed = [record for record in records if self._by_id.get(record.validator_id) != record]
+            if changed:
+                self._index(changed)
+                self.version += 1
+        return changed
+
+    def _index(self, records):
+        for record in records:
+            self._by_id[record.validator_id] = record
+            if record.validator_address:
+                self._by_address[(record.chain_id, record.validator_address)] = record
+            self._by_tm_address[(record.chain_id, record.tendermint_address)] = record
+
+    def get(self, address, address_type, chain=DEFAULT_CHAIN):
+        """
+        Look up a validator of `chain` by its Namada or Tendermint address, as classified by check_address_format.
+        The same key can validate on several chains, so addresses are only unique together with the chain.
+        """
+        if address_type == 'Namada':
+            return self._by_address.get((chain, address))
+        return self._by_tm_address.get((chain, address))
+
+    def get_by_id(self, validator_id):
+        return self._by_id.get(validator_id)
+
+    def records(self):
+        return list(self._by_id.values())
+
+
+snapshot = ValidatorSnapshot()
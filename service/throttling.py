@@ -0,0 +1,103 @@
+import asyncio
+import functools
+import logging
+import time
+
+from config.settings import COMMAND_RATE_LIMIT, COMMAND_BURST
+from service.metrics import metrics
+from service.profiling import span
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated', 'warned')
+
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+        self.warned = False
+
+
+class RateLimiter:
+    """Per-user token bucket: `burst` commands at once, refilled at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute=COMMAND_RATE_LIMIT, burst=COMMAND_BURST, max_users=10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_users = max_users
+        self._buckets = {}
+
+    def acquire(self, user_id):
+        """
+        Take one token for the user. Returns True when the command may run, False when it is throttled,
+        or None when it is throttled and the user was already told so.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= self.max_users:
+                self._prune(now)
+            bucket = self._buckets[user_id] = TokenBucket(self.burst, now)
+        else:
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            bucket.warned = False
+            return True
+        if bucket.warned:
+            return None
+        bucket.warned = True
+        return False
+
+    def _prune(self, now):
+        """Forget users whose bucket has refilled completely; they would start from a full bucket anyway."""
+        self._buckets = {user_id: bucket for user_id, bucket in self._buckets.items()
+                         if bucket.tokens + (now - bucket.updated) * self.rate < self.burst}
+
+
+rate_limiter = RateLimiter()
+
+
+def rate_limited(handler):
+    """Wrap a command handler so each user goes through the rate limiter first."""
+
+    @functools.wraps(handler)
+    async def wrapper(update, context):
+        metrics.inc("commands_total")
+        user = update.effective_user
+        if user is not None:
+            allowed = rate_limiter.acquire(user.id)
+            if not allowed:
+                metrics.inc("commands_throttled_total")
+                if allowed is False and update.callback_query:
+                    await update.callback_query.answer("⏳ Too many requests, please wait a moment and try again.")
+                elif allowed is False and update.effective_message:
+                    await update.effective_message.reply_text("⏳ Too many commands, please wait a moment and try again.")
+                logger.info(f"Throttled {handler.__name__} for user {user.id}.")
+                return
+        with span(f"command.{handler.__name__}"):
+            return await handler(update, context)
+
+    return wrapper
+
+
+class RequestCoalescer:
+    """
+    Runs a blocking lookup in the default executor once per key: callers asking for the same key while it
+    is in flight await the same result instead of issuing their own query.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+
+    async def run(self, key, func, *args):
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(None, func, *args)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield: one caller being cancelled must not cancel the lookup for the others
+        return await asyncio.shield(future)
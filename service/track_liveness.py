@@ -0,0 +1,153 @@
+import logging
+from array import array
+
+from config.settings import DB_CONFIG, CHAINS, DEFAULT_CHAIN, LIVENESS_WINDOW, LIVENESS_MISS_THRESHOLD, \
+    LIVENESS_MIN_BLOCKS
+from db.database_manager import LazyDatabaseManager
+from nam_lib.namada_api import NamadaAPI
+
+logger = logging.getLogger(__name__)
+
+db_manager = LazyDatabaseManager(DB_CONFIG)
+
+
+class LivenessTracker:
+    """
+    Sliding window of signed/missed blocks per validator.
+
+    Every validator owns one row of `window` bits inside a single bytearray; the bit for a height lives at
+    slot `height % window`, so recording a block overwrites the block that left the window. A set bit means
+    the block was missed. Missed and recorded block counts are kept alongside in unsigned arrays so the miss
+    rate never needs a scan of the bitmap. No alert is raised before `min_blocks` blocks of a validator were
+    recorded, so the first blocks after a restart cannot make up a 100% miss rate on their own.
+    """
+
+    def __init__(self, namada_api, window=LIVENESS_WINDOW, miss_threshold=LIVENESS_MISS_THRESHOLD,
+                 min_blocks=LIVENESS_MIN_BLOCKS):
+        self.namada_api = namada_api
+        self.window = window
+        self.miss_threshold = miss_threshold
+        self.min_blocks = max(1, min(min_blocks, window))
+        self.row_bytes = (window + 7) // 8
+        self.last_height = None
+        self._rows = {}
+        self._bitmap = bytearray()
+        self._missed = array('I')
+        self._recorded = array('I')
+        self._alerted = set()
+        self._validator_set = []
+
+    def _row(self, tm_addr):
+        row = self._rows.get(tm_addr)
+        if row is None:
+            row = self._rows[tm_addr] = len(self._missed)
+            self._bitmap.extend(bytes(self.row_bytes))
+            self._missed.append(0)
+            self._recorded.append(0)
+        return row
+
+    def record(self, height, tm_addr, signed):
+        row = self._row(tm_addr)
+        slot = height % self.window
+        index = row * self.row_bytes + (slot >> 3)
+        mask = 1 << (slot & 7)
+        was_missed = self._bitmap[index] & mask
+        if self._recorded[row] < self.window:
+            self._recorded[row] += 1
+        if signed:
+            if was_missed:
+                self._bitmap[index] &= ~mask
+                self._missed[row] -= 1
+        elif not was_missed:
+            self._bitmap[index] |= mask
+            self._missed[row] += 1
+
+    def record_block(self, height, signatures):
+        """
+        Record the commit signatures of one block. Absent signatures carry no address, so they are matched
+        to the validator set by position; the set is re-fetched whenever a signed entry does not line up.
+        """
+        if len(signatures) != len(self._validator_set) or any(
+                addr is not None and addr != self._validator_set[i] for i, (addr, _) in enumerate(signatures)):
+            validators_result = self.namada_api.get_validators(height)
+            if not validators_result.success:
+                logger.error(f"Failed to get validator set at height {height}: {validators_result.error}")
+                return False
+            self._validator_set = [tm_addr for tm_addr, _ in validators_result.data]
+            if len(signatures) != len(self._validator_set):
+                logger.error(f"Commit at height {height} does not match the validator set, skipping it.")
+                return False
+
+        for tm_addr, (_, signed) in zip(self._validator_set, signatures):
+            self.record(height, tm_addr, signed)
+        self.last_height = height
+        return True
+
+    def miss_rate(self, tm_addr):
+        row = self._rows.get(tm_addr)
+        if row is None or not self._recorded[row]:
+            return 0.0
+        return self._missed[row] * 100 / self._recorded[row]
+
+    def collect_alerts(self):
+        """
+        Return (tendermint_address, missed, recorded) for validators whose miss rate just crossed the threshold.
+        A validator is reported again only after its miss rate has dropped back below the threshold.
+        """
+        alerts = []
+        for tm_addr, row in self._rows.items():
+            recorded = self._recorded[row]
+            over = recorded >= self.min_blocks and self._missed[row] * 100 >= self.miss_threshold * recorded
+            if over and tm_addr not in self._alerted:
+                self._alerted.add(tm_addr)
+                alerts.append((tm_addr, self._missed[row], recorded))
+            elif not over:
+                self._alerted.discard(tm_addr)
+        return alerts
+
+
+# Every chain has its own validator set and block heights, hence its own tracker.
+trackers = {chain: LivenessTracker(NamadaAPI(rpc_url)) for chain, rpc_url in CHAINS.items()}
+
+
+def track_liveness(latest_height=None, chain=DEFAULT_CHAIN):
+    """Process every block up to latest_height, or up to the chain tip when no height was pushed to us."""
+    tracker = trackers[chain]
+    namada_api = tracker.namada_api
+    if latest_height is None:
+        height_result = namada_api.get_latest_height()
+        if not height_result.success:
+            logger.error(f"Failed to get latest block height: {height_result.error}")
+            return
+        latest_height = int(height_result.data)
+
+    # Never replay more than one window: older blocks would be overwritten straight away.
+    start_height = latest_height if tracker.last_height is None else tracker.last_height + 1
+    start_height = max(start_height, latest_height - tracker.window + 1)
+    for height in range(start_height, latest_height + 1):
+        signatures_result = namada_api.get_commit_signatures(height)
+        if not signatures_result.success:
+            logger.error(f"Failed to get commit signatures at height {height}: {signatures_result.error}")
+            break
+        if not tracker.record_block(height, signatures_result.data):
+            break
+
+    record_liveness_changes(tracker.collect_alerts(), chain)
+
+
+def record_liveness_changes(alerts, chain=DEFAULT_CHAIN):
+    if not alerts:
+        return
+    tm_addresses = [tm_addr for tm_addr, _, _ in alerts]
+    placeholders = ", ".join(["%s"] * len(tm_addresses))
+    rows = db_manager.execute_query(
+        f"SELECT validator_id, tendermint_address FROM validators "
+        f"WHERE chain_id = %s AND tendermint_address IN ({placeholders})",
+        (chain, *tm_addresses))
+    validator_ids = {row['tendermint_address']: row['validator_id'] for row in rows}
+
+    db_manager.insert_many('liveness_changes', [
+        {'validator_id': validator_ids[tm_addr], 'missed_blocks': missed, 'window_blocks': recorded}
+        for tm_addr, missed, recorded in alerts if tm_addr in validator_ids
+    ])
+    logger.info(f"{len(alerts)} validator(s) of chain {chain} crossed the missed block threshold.")
@@ -1,70 +1,228 @@
 import logging
-from config.settings import DB_CONFIG, NAMADA_RPC_URL
-from db.database_manager import DatabaseManager
+import multiprocessing
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from config.settings import DB_CONFIG, CHAINS, DEFAULT_CHAIN, UPDATE_WORKERS, JOB_BATCH_SIZE
+from db.database_manager import LazyDatabaseManager
+from db.models import ValidatorRecord, ChangeEvent
 from nam_lib.namada_api import NamadaAPI
+from service.alert_rules import rule_engine
+from service.job_queue import JobQueue
+from service.metrics import metrics
+from service.profiling import profiled_cycle
+from service.refresh_tiers import refresh_tiers, subscription_index
+from service.search_index import search_index
+from service.snapshot import snapshot
 
 logger = logging.getLogger(__name__)
 
-namada_api = NamadaAPI(NAMADA_RPC_URL)
-db_manager = DatabaseManager(DB_CONFIG)
+db_manager = LazyDatabaseManager(DB_CONFIG)
+# One RPC client and one work queue per chain; the database pool is shared by all of them.
+namada_apis = {chain: NamadaAPI(rpc_url) for chain, rpc_url in CHAINS.items()}
+
+
+def job_name(chain):
+    # The default chain keeps the job name of single-chain versions, so an existing checkpoint stays valid.
+    return 'update_validators' if chain == DEFAULT_CHAIN else f"validators@{chain}"
+
+
+job_queues = {chain: JobQueue(db_manager, job_name(chain)) for chain in CHAINS}
+
+# Worker processes are spawned (not forked) so each one builds its own RPC client and database pool
+# on first use, instead of sharing the parent's sockets.
+_worker_pool = None
 
 
-def update_database():
-    logger.info("Starting to update database with Namada Validator Info...")
+@profiled_cycle
+def update_database(chain=DEFAULT_CHAIN):
+    logger.info(f"Starting to update database with Namada Validator Info of chain {chain}...")
+    started = time.perf_counter()
+    job_queue = job_queues[chain]
+    # Other instances sharing the database may have changed subscriptions and alert rules since the last cycle.
+    subscription_index.reload(db_manager)
+    rule_engine.reload(db_manager)
+
+    # A cycle interrupted by a restart, or still being worked on by another instance, is finished first.
+    height = job_queue.open_cycle()
+    if height is not None:
+        logger.info(f"Resuming update cycle of chain {chain} at height {height}.")
+    else:
+        height = start_cycle(chain)
+        if height is None:
+            return
+
+    changed = 0
+    while True:
+        items = job_queue.claim(height, JOB_BATCH_SIZE)
+        if not items:
+            break
+        changed += process_batch(job_queue, items, height, chain)
+
+    if not job_queue.finish_cycle(height):
+        logger.info(f"Update cycle at height {height} still has items leased by another worker.")
+        return
+    label = f'{{chain="{chain}"}}'
+    metrics.inc("update_cycles_total" + label)
+    metrics.set("update_last_duration_seconds" + label, round(time.perf_counter() - started, 3))
+    metrics.set("update_last_height" + label, height)
+    logger.info(f"Database update of chain {chain} finished, {changed} validator(s) changed.")
+
 
-    # Fetch latest block height
+def start_cycle(chain):
+    """
+    Queue one work item per validator due for a refresh (see service.refresh_tiers) at the latest height.
+    Returns the cycle height, or None if there is none.
+    """
+    namada_api, job_queue = namada_apis[chain], job_queues[chain]
     height_result = namada_api.get_latest_height()
     if not height_result.success:
         logger.error(f"Failed to get latest block height: {height_result.error}")
-        return
-    latest_height = height_result.data
-    logger.info(f"Latest block height: {latest_height}.")
+        return None
+    latest_height = int(height_result.data)
+    logger.info(f"Latest block height of chain {chain}: {latest_height}.")
+
+    checkpoint = job_queue.get_checkpoint()
+    if checkpoint is not None and latest_height <= checkpoint:
+        logger.info(f"Validators are already up to date at height {checkpoint}.")
+        return None
 
     validators_result = namada_api.get_validators(latest_height)
     if not validators_result.success:
         logger.error(f"Failed to get validators: {validators_result.error}")
-        return
+        return None
+    epoch_result = namada_api.get_current_epoch()
+    if not epoch_result.success:
+        logger.warning(f"Failed to get current epoch: {epoch_result.error}")
 
-    for tm_addr, voting_power in validators_result.data:
-        validator_info = fetch_validator_info(tm_addr)
-        if not validator_info:
-            continue
+    validators, full = refresh_tiers.select(chain, validators_result.data,
+                                            epoch_result.data if epoch_result.success else None,
+                                            subscription_index.validator_ids(db_manager))
+    label = f'{{chain="{chain}"}}'
+    metrics.set("update_refreshed_validators" + label, len(validators))
+    metrics.set("update_skipped_validators" + label, len(validators_result.data) - len(validators))
+    logger.info(f"Refreshing {len(validators)} of {len(validators_result.data)} validator(s) of chain {chain} "
+                f"({'full' if full else 'hot tier only'}).")
+    if not validators:
+        job_queue.set_checkpoint(latest_height)
+        return None
+    job_queue.enqueue(latest_height, [(tm_addr, str(voting_power)) for tm_addr, voting_power in validators])
+    return latest_height
 
-        validator_address, metadata, commission_rate, max_commission_change, state = validator_info
 
-        existing_validator = db_manager.execute_query(
-            "SELECT validator_id, state, commission_rate FROM validators WHERE tendermint_address = %s",
-            (tm_addr,),
-            commit=False
+def process_batch(job_queue, items, height, chain=DEFAULT_CHAIN):
+    """
+    Update one leased batch of work items and record what changed. Returns the number of changed validators.
+
+    The RPC work comes first. The stored validators, their change events, rule alerts and history rows and the
+    completion of the items are then committed in one transaction, so a batch interrupted before that commit
+    (crash, expired lease) leaves nothing behind and is processed again from scratch, changes included.
+    """
+    validators = [(tm_addr, int(voting_power)) for _, tm_addr, voting_power in items]
+    if UPDATE_WORKERS > 1:
+        records = fetch_validators_sharded(validators, UPDATE_WORKERS, chain)
+    else:
+        records = fetch_validators(validators, chain)
+
+    changes, history = [], []
+    with db_manager.transaction():
+        for record in records:
+            store_validator(record, height, changes, history)
+        # Change events are recorded by the coordinator only, so the notifier sees a single writer.
+        for change in changes:
+            if change.state_changed or change.rate_changed:
+                record_changes(change.validator_id, change.previous_state, change.new_state,
+                               change.previous_rate, change.new_rate)
+        rule_engine.evaluate(db_manager, changes)
+        db_manager.insert_many('validator_history', history)
+        job_queue.complete([item_id for item_id, _, _ in items])
+    search_index.update(snapshot.apply(records))
+    return len(changes)
+
+
+def shard_for(tm_addr, num_shards):
+    """Return a shard index for a Tendermint address that is stable across processes and restarts."""
+    return zlib.crc32(tm_addr.encode()) % num_shards
+
+
+def get_worker_pool(num_workers):
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context('spawn'))
+    return _worker_pool
+
+
+def fetch_validators_sharded(validators, num_shards, chain=DEFAULT_CHAIN):
+    """Split the validator set by Tendermint address across worker processes and merge the fetched records."""
+    shards = [[] for _ in range(num_shards)]
+    for tm_addr, voting_power in validators:
+        shards[shard_for(tm_addr, num_shards)].append((tm_addr, voting_power))
+
+    records = []
+    for shard_records in get_worker_pool(num_shards).map(fetch_validators, shards, repeat(chain)):
+        records.extend(shard_records)
+    logger.info(f"Fetched {len(validators)} validator(s) across {num_shards} worker process(es).")
+    return records
+
+
+def fetch_validators(validators, chain=DEFAULT_CHAIN):
+    """Fetch the info of the given (tendermint_address, voting_power) pairs of `chain`, skipping failed ones."""
+    return [record for record in (fetch_validator_info(tm_addr, voting_power, chain)
+                                  for tm_addr, voting_power in validators) if record is not None]
+
+
+def store_validator(record, height, changes, history):
+    """
+    Insert or update one fetched validator inside the batch transaction, collecting the change event of an
+    already known validator whose voting power, state or commission differ from the stored ones, and its
+    history row.
+    """
+    tm_addr = record.tendermint_address
+    # The row lock makes a batch re-run by another worker wait for this one, then compare against its result.
+    existing = db_manager.execute_query(
+        "SELECT validator_id, voting_power, state, commission_rate FROM validators "
+        "WHERE chain_id = %s AND tendermint_address = %s FOR UPDATE",
+        (record.chain_id, tm_addr),
+        commit=False,
+        model=ValidatorRecord
+    )
+
+    if existing:
+        previous = existing[0]
+        record.validator_id = previous.validator_id
+        db_manager.update_data('validators', record.to_row(), {'validator_id': record.validator_id})
+        change = ChangeEvent(
+            validator_id=record.validator_id,
+            previous_power=previous.voting_power,
+            new_power=record.voting_power,
+            previous_state=previous.state,
+            new_state=record.state,
+            previous_rate=previous.commission_rate,
+            new_rate=record.commission_rate,
+            max_commission_change=record.max_commission_change
         )
+        changed = change.previous_power != change.new_power or change.state_changed or change.rate_changed
+        if changed:
+            changes.append(change)
+    else:
+        record.validator_id = db_manager.insert_data_and_get_id('validators', record.to_row())
+        changed = True
+    if changed:
+        history.append({
+            'validator_id': record.validator_id,
+            'height': int(height),
+            'voting_power': record.voting_power,
+            'state': record.state,
+            'commission_rate': record.commission_rate
+        })
+    logger.info(
+        f"Validator data for {tm_addr} has been {'updated' if existing else 'inserted'} successfully.")
 
-        data = {
-            'validator_address': validator_address,
-            'tendermint_address': tm_addr,
-            'voting_power': voting_power,
-            'email': metadata.get('email', ''),
-            'description': metadata.get('description', ''),
-            'website': metadata.get('website', ''),
-            'discord_handle': metadata.get('discord_handle', ''),
-            'avatar': metadata.get('avatar', ''),
-            'commission_rate': commission_rate,
-            'max_commission_change': max_commission_change,
-            'state': state
-        }
-
-        if existing_validator:
-            validator_id = existing_validator[0]['validator_id']
-            previous_state = existing_validator[0]['state']
-            previous_rate = existing_validator[0]['commission_rate']
-            db_manager.update_data('validators', data, {'validator_id': validator_id})
-            record_changes(validator_id, previous_state, state, previous_rate, commission_rate)
-        else:
-            db_manager.insert_data('validators', data)
-        logger.info(
-            f"Validator data for {tm_addr} has been {'updated' if existing_validator else 'inserted'} successfully.")
-
-
-def fetch_validator_info(tm_addr):
+
+def fetch_validator_info(tm_addr, voting_power, chain=DEFAULT_CHAIN):
+    namada_api = namada_apis[chain]
     tm_result = namada_api.get_validator_from_tm(tm_addr)
     if not tm_result.success:
         logger.error(f"Error parsing {tm_addr}: {tm_result.error}")
@@ -79,8 +237,22 @@ def fetch_validator_info(tm_addr):
         log_error_details(validator_address, metadata_result, commission_result, state_result)
         return None
 
+    metadata = metadata_result.data
     commission_rate, max_commission_change = commission_result.data
-    return validator_address, metadata_result.data, commission_rate, max_commission_change, state_result.data
+    return ValidatorRecord(
+        chain_id=chain,
+        validator_address=validator_address,
+        tendermint_address=tm_addr,
+        voting_power=int(voting_power),
+        email=metadata.get('email', ''),
+        description=metadata.get('description', ''),
+        website=metadata.get('website', ''),
+        discord_handle=metadata.get('discord_handle', ''),
+        avatar=metadata.get('avatar', ''),
+        commission_rate=commission_rate,
+        max_commission_change=max_commission_change,
+        state=state_result.data
+    )
 
 
 def log_error_details(validator_address, metadata_result, commission_result, state_result):
@@ -93,14 +265,8 @@ def log_error_details(validator_address, metadata_result, commission_result, sta
 
 
 def record_changes(validator_id, previous_state, new_state, previous_rate, new_rate):
-    # Check if any user has subscribed to changes for this validator
-    subscriptions_query = """
-    SELECT COUNT(*) as subscription_count
-    FROM subscriptions
-    WHERE validator_id = %s
-    """
-    subscription_result = db_manager.execute_query(subscriptions_query, (validator_id,))
-    if subscription_result[0]['subscription_count'] == 0:
+    # Only monitored validators get change events; nobody would be notified about the others.
+    if validator_id not in subscription_index.validator_ids(db_manager):
         return
 
     if previous_state != new_state:
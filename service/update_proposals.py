@@ -0,0 +1,96 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import DB_CONFIG, NAMADA_RPC_URL, PROPOSAL_FETCH_BATCH
+from db.database_manager import LazyDatabaseManager
+from nam_lib.namada_api import NamadaAPI
+
+logger = logging.getLogger(__name__)
+
+namada_api = NamadaAPI(NAMADA_RPC_URL)
+db_manager = LazyDatabaseManager(DB_CONFIG)
+
+
+def proposal_status(proposal, epoch):
+    if epoch < proposal['voting_start_epoch']:
+        return 'pending'
+    if epoch < proposal['voting_end_epoch']:
+        return 'voting'
+    return 'ended'
+
+
+def fetch_new_proposals(next_id):
+    """
+    Fetch proposals with ids from next_id upwards, PROPOSAL_FETCH_BATCH at a time in parallel,
+    until the first id that does not exist yet.
+    """
+    proposals = []
+    with ThreadPoolExecutor(max_workers=PROPOSAL_FETCH_BATCH) as executor:
+        while True:
+            ids = range(next_id, next_id + PROPOSAL_FETCH_BATCH)
+            for proposal_id, result in zip(ids, executor.map(namada_api.get_proposal, ids)):
+                if not result.success:
+                    logger.error(f"Failed to fetch proposal {proposal_id}: {result.error}")
+                    return proposals
+                if result.data is None:
+                    return proposals
+                proposals.append(result.data)
+            next_id += PROPOSAL_FETCH_BATCH
+
+
+def update_proposals():
+    logger.info("Starting to update governance proposals...")
+
+    epoch_result = namada_api.get_current_epoch()
+    if not epoch_result.success:
+        logger.error(f"Failed to get current epoch: {epoch_result.error}")
+        return
+    epoch = epoch_result.data
+
+    last_seen = db_manager.execute_query("SELECT MAX(proposal_id) AS last_id FROM proposals")[0]['last_id']
+    new_proposals = fetch_new_proposals(0 if last_seen is None else last_seen + 1)
+
+    # Another bot instance or an overlapping run may store the same proposals. The locking reads below make
+    # such writers wait for each other, and the second one then only sees what the first one left to do, so
+    # no proposal is inserted twice and no event is emitted twice.
+    with db_manager.transaction() as tx:
+        last_stored = tx.execute("SELECT MAX(proposal_id) AS last_id FROM proposals FOR UPDATE")[0]['last_id']
+        rows, events = [], []
+        for proposal in new_proposals:
+            if last_stored is not None and proposal['id'] <= last_stored:
+                continue
+            status = proposal_status(proposal, epoch)
+            rows.append({
+                'proposal_id': proposal['id'],
+                'author': proposal['author'],
+                'proposal_type': proposal['type'],
+                'title': proposal['content'].get('title', '')[:255],
+                'content': json.dumps(proposal['content']),
+                'voting_start_epoch': proposal['voting_start_epoch'],
+                'voting_end_epoch': proposal['voting_end_epoch'],
+                'grace_epoch': proposal['grace_epoch'],
+                'status': status
+            })
+            # Backfilled proposals whose voting is already over are stored silently.
+            if status != 'ended':
+                events.append({'proposal_id': proposal['id'], 'event_type': 'new'})
+        tx.insert_many('proposals', rows)
+
+        open_proposals = tx.execute(
+            "SELECT proposal_id, voting_start_epoch, voting_end_epoch, status FROM proposals WHERE status != %s "
+            "FOR UPDATE", ('ended',))
+        for proposal in open_proposals:
+            status = proposal_status(proposal, epoch)
+            if status == proposal['status']:
+                continue
+            tx.execute("UPDATE proposals SET status = %s WHERE proposal_id = %s", (status, proposal['proposal_id']))
+            if status == 'voting':
+                events.append({'proposal_id': proposal['proposal_id'], 'event_type': 'voting_started'})
+            else:
+                if proposal['status'] == 'pending':
+                    events.append({'proposal_id': proposal['proposal_id'], 'event_type': 'voting_started'})
+                events.append({'proposal_id': proposal['proposal_id'], 'event_type': 'voting_ended'})
+        tx.insert_many('proposal_events', events)
+
+    logger.info(f"Stored {len(rows)} new proposal(s) and {len(events)} proposal event(s) at epoch {epoch}.")
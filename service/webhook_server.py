@@ -0,0 +1,65 @@
+import asyncio
+import hmac
+import logging
+
+from aiohttp import web
+from telegram import Update
+
+from config.settings import WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_SECRET
+from service.metrics import metrics
+from service.snapshot import snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def create_web_app(application):
+    """
+    HTTP endpoints served next to the bot: the Telegram webhook receiver, /health and /metrics.
+    TLS is expected to be terminated by a reverse proxy in front of this server.
+    """
+
+    async def receive_update(request):
+        secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        if WEBHOOK_SECRET and not hmac.compare_digest(secret, WEBHOOK_SECRET):
+            metrics.inc("webhook_rejected_total")
+            return web.Response(status=403)
+        try:
+            update = Update.de_json(await request.json(), application.bot)
+        except ValueError:
+            return web.Response(status=400)
+        metrics.inc("telegram_updates_total")
+        await application.update_queue.put(update)
+        return web.Response()
+
+    async def health(request):
+        status = 200 if snapshot.loaded else 503
+        return web.json_response({'status': 'ok' if snapshot.loaded else 'starting',
+                                  'validators': len(snapshot)}, status=status)
+
+    async def render_metrics(request):
+        return web.Response(text=metrics.render(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_post(f"/{WEBHOOK_PATH}", receive_update)
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", render_metrics)
+    return app
+
+
+async def run_webhook(application, start_jobs):
+    """Run the webhook receiver, the health/metrics endpoints and the scheduler on the current event loop."""
+    runner = web.AppRunner(create_web_app(application))
+    async with application:
+        await application.start()
+        await runner.setup()
+        await web.TCPSite(runner, WEBHOOK_LISTEN, WEBHOOK_PORT).start()
+        await application.bot.set_webhook(url=f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}",
+                                          secret_token=WEBHOOK_SECRET or None,
+                                          allowed_updates=Update.ALL_TYPES)
+        logger.info(f"Webhook server listening on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}.")
+        await start_jobs()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+            await application.stop()
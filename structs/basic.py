@@ -1,5 +1,7 @@
 from borsh_construct import CStruct, String, Option, Enum, U8
 
+from structs.borsh_reader import BorshReader
+
 ValidatorMetaData = CStruct(
     'email' / String,
     'description' / Option(String),
@@ -18,3 +20,15 @@ ValidatorState = Enum(
 )
 
 Address = CStruct('data' / U8[21])
+
+
+def parse_validator_metadata(data) -> dict:
+    """Decodes ValidatorMetaData in place from a bytes-like object, without building construct containers."""
+    reader = BorshReader(data)
+    return {
+        'email': reader.string(),
+        'description': reader.option(reader.string),
+        'website': reader.option(reader.string),
+        'discord_handle': reader.option(reader.string),
+        'avatar': reader.option(reader.string),
+    }
@@ -0,0 +1,45 @@
+class BorshReader:
+    """
+    Sequential Borsh decoder over a memoryview: fields are read in place without copying the buffer,
+    which keeps bulk decoding (e.g. backfilling every governance proposal) cheap.
+    """
+    __slots__ = ('data', 'pos')
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def read(self, size: int) -> memoryview:
+        end = self.pos + size
+        if end > len(self.data):
+            raise ValueError(f"Unexpected end of data: need {size} byte(s) at position {self.pos}.")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def u8(self) -> int:
+        return self.read(1)[0]
+
+    def u32(self) -> int:
+        return int.from_bytes(self.read(4), byteorder='little')
+
+    def u64(self) -> int:
+        return int.from_bytes(self.read(8), byteorder='little')
+
+    def u256(self) -> int:
+        return int.from_bytes(self.read(32), byteorder='little')
+
+    def bool(self) -> bool:
+        return self.u8() != 0
+
+    def string(self) -> str:
+        return str(self.read(self.u32()), 'utf-8')
+
+    def option(self, read_value):
+        return read_value() if self.u8() else None
+
+    def vec(self, read_item) -> list:
+        return [read_item() for _ in range(self.u32())]
+
+    def remaining(self) -> int:
+        return len(self.data) - self.pos
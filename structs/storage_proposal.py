@@ -1,50 +1,80 @@
-from construct import Struct, GreedyBytes, Byte, Container
-from borsh_construct import CStruct, U8, Vec, U64, String
-from construct.core import Int64ul  # Use for direct integer parsing
-from basic import Address
-from bech32m import bech32m_encode
+from structs.bech32m import bech32m_encode
+from structs.borsh_reader import BorshReader
 
-# This feature is not implemented due to issues with parsing the ProposalType.
-StorageProposal = Struct(
-    'id' / U64,
-    'content' / Vec(CStruct('key' / String, 'value' / String)),
-    'author' / Address,
-    "rest_bytes" / GreedyBytes,
-)
+PROPOSAL_TYPES = ("Default", "PGFSteward", "PGFPayment")
+ADD_REMOVE = ("Add", "Remove")
 
 
-def parse_storage_proposal(data):
-    initial_parse = StorageProposal.parse(data)
+def parse_address(reader: BorshReader) -> str:
+    """
+    Reads a Borsh encoded Address (established or implicit) and returns its bech32m form.
+    The Borsh enum tag is 0 for established and 1 for implicit addresses, the bech32m payload uses the opposite.
+    """
+    tag = reader.u8()
+    if tag > 1:
+        raise ValueError(f"Unsupported address kind {tag}: internal addresses are not decoded.")
+    return bech32m_encode('tnam', bytes((tag ^ 1,)) + reader.read(20))
+
+
+def parse_add_remove(reader: BorshReader, parse_value):
+    action = reader.u8()
+    if action >= len(ADD_REMOVE):
+        raise ValueError(f"Unknown AddRemove variant {action}.")
+    return {'action': ADD_REMOVE[action], 'value': parse_value(reader)}
+
+
+def parse_pgf_target(reader: BorshReader):
+    kind = reader.u8()
+    if kind == 0:
+        return {'kind': 'Internal', 'target': parse_address(reader), 'amount': reader.u256()}
+    if kind == 1:
+        return {'kind': 'Ibc', 'target': reader.string(), 'amount': reader.u256(),
+                'port_id': reader.string(), 'channel_id': reader.string()}
+    raise ValueError(f"Unknown PGFTarget variant {kind}.")
+
 
-    # Extract fixed known fields from the end of rest_bytes
-    end_fields_length = 8 * 3
-    end_fields_bytes = initial_parse.rest_bytes[-end_fields_length:]
-    voting_start_epoch, voting_end_epoch, grace_epoch = Int64ul[3].parse(end_fields_bytes)
+def parse_pgf_action(reader: BorshReader):
+    kind = reader.u8()
+    if kind == 0:
+        return {'kind': 'Continuous', **parse_add_remove(reader, parse_pgf_target)}
+    if kind == 1:
+        return {'kind': 'Retro', 'value': parse_pgf_target(reader)}
+    raise ValueError(f"Unknown PGFAction variant {kind}.")
 
-    # Process the remaining part of rest_bytes before these known fields
-    type_data_bytes = initial_parse.rest_bytes[:-end_fields_length]
 
-    # Here you'd implement your logic based on the specific structure of type_data
-    # For demonstration purposes, let's return the raw bytes
-    # You would replace this with actual parsing logic based on 'type'
-    type_data_parsed = type_data_bytes
+def parse_proposal_type(reader: BorshReader):
+    """
+    ProposalType is Default(Option<Hash>), PGFSteward(BTreeSet<AddRemove<Address>>) or
+    PGFPayment(BTreeSet<PGFAction>); sets are encoded like vectors.
+    """
+    kind = reader.u8()
+    if kind == 0:
+        code_hash = reader.option(lambda: reader.read(32).hex())
+        return PROPOSAL_TYPES[kind], code_hash
+    if kind == 1:
+        return PROPOSAL_TYPES[kind], reader.vec(lambda: parse_add_remove(reader, parse_address))
+    if kind == 2:
+        return PROPOSAL_TYPES[kind], reader.vec(lambda: parse_pgf_action(reader))
+    raise ValueError(f"Unknown ProposalType variant {kind}.")
 
-    bytes_list = list(initial_parse.author.data)
-    bytes_list[0] ^= 1
-    author = bech32m_encode('tnam', bytes_list)
 
-    # Constructing and returning a dictionary with properly parsed fields
-    result = {
-        'id': initial_parse.id,
-        'content': {item.key: item.value for item in initial_parse.content},
+def parse_storage_proposal(data):
+    reader = BorshReader(data)
+    proposal_id = reader.u64()
+    content = dict(reader.vec(lambda: (reader.string(), reader.string())))
+    author = parse_address(reader)
+    proposal_type, type_data = parse_proposal_type(reader)
+    voting_start_epoch = reader.u64()
+    voting_end_epoch = reader.u64()
+    grace_epoch = reader.u64()
+
+    return {
+        'id': proposal_id,
+        'content': content,
         'author': author,
-        'type_data': type_data_parsed,  # Placeholder for the actual parsed structure or interpretation
+        'type': proposal_type,
+        'type_data': type_data,
         'voting_start_epoch': voting_start_epoch,
         'voting_end_epoch': voting_end_epoch,
         'grace_epoch': grace_epoch,
     }
-
-    return result
-
-
-
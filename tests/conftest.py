@@ -0,0 +1,57 @@
+import os
+import tempfile
+
+# Settings are read at import time, so the tests pick their backend before any project module is imported.
+os.environ.update(DB_BACKEND='sqlite', SQLITE_PATH=os.path.join(tempfile.mkdtemp(), 'test.db'),
+                  NAMADA_RPC_URL='http://localhost:26657')
+os.environ.pop('NAMADA_CHAINS', None)
+
+import pytest
+
+from nam_lib.result import Result
+
+TABLES = ('proposal_events', 'proposals', 'rule_alerts', 'alert_rules', 'validator_state_changes', 'commission_rate_changes', 'liveness_changes',
+          'validator_history', 'work_items', 'checkpoints', 'subscriptions', 'users', 'validators')
+
+
+class FakeNamadaAPI:
+    """NamadaAPI stand-in serving a fixed validator set; tests change `height` and `commission` between cycles."""
+
+    def __init__(self, validators):
+        self.validators = validators
+        self.height = '100'
+        self.epoch = 1
+        self.commission = {}
+
+    def get_latest_height(self):
+        # Like the node, the height comes back as the string of the status response.
+        return Result(True, self.height)
+
+    def get_validators(self, height):
+        return Result(True, [(tm_addr, str(voting_power)) for tm_addr, voting_power in self.validators])
+
+    def get_current_epoch(self):
+        return Result(True, self.epoch)
+
+    def get_validator_from_tm(self, tm_address):
+        return Result(True, 'tnam1q' + tm_address.lower())
+
+    def get_validator_metadata(self, validator_address):
+        return Result(True, {'email': f"{validator_address[-4:]}@example.com"})
+
+    def get_validator_commission(self, validator_address):
+        return Result(True, (self.commission.get(validator_address, 0.05), 0.01))
+
+    def get_validator_state(self, validator_address):
+        return Result(True, 'Consensus')
+
+
+@pytest.fixture
+def db():
+    """The test database with the current schema and no rows."""
+    from service.init_database import init_database
+    from service.update_database import db_manager
+    init_database()
+    for table_name in TABLES:
+        db_manager.execute_query(f"DELETE FROM {table_name}", commit=True)
+    return db_manager
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from config.settings import DEFAULT_CHAIN
+from service import block_listener
+from tests.conftest import FakeNamadaAPI
+
+
+class FakeJob:
+    def __init__(self):
+        self.wakeups = []
+
+    def modify(self, **changes):
+        self.wakeups.append(changes)
+
+
+def test_epoch_change_wakes_the_scheduled_update(monkeypatch):
+    monkeypatch.setattr(block_listener, 'track_liveness', lambda height, chain: None)
+    pipeline = block_listener.BlockPipeline(DEFAULT_CHAIN, 'http://localhost:26657')
+    pipeline.namada_api = FakeNamadaAPI([])
+    pipeline.update_job = FakeJob()
+
+    async def follow(heights_and_epochs):
+        for height, epoch in heights_and_epochs:
+            pipeline.namada_api.epoch = epoch
+            await pipeline.on_new_block(height)
+    asyncio.run(follow([(10, 1), (11, 1), (12, 2), (13, 2)]))
+
+    assert len(pipeline.update_job.wakeups) == 1
+    assert 'next_run_time' in pipeline.update_job.wakeups[0]
+
+
+def test_old_and_repeated_heights_are_ignored(monkeypatch):
+    tracked = []
+    monkeypatch.setattr(block_listener, 'track_liveness', lambda height, chain: tracked.append(height))
+    pipeline = block_listener.BlockPipeline(DEFAULT_CHAIN, 'http://localhost:26657')
+    pipeline.namada_api = FakeNamadaAPI([])
+
+    async def follow(heights):
+        for height in heights:
+            await pipeline.on_new_block(height)
+            # Let each liveness run finish, so none is skipped as still running.
+            await pipeline._running['liveness']
+    asyncio.run(follow([10, 11, 11, 9, 12]))
+
+    assert tracked == [10, 11, 12]
+
+
+class FlakyWebSocket:
+    """Fails on the first subscription and delivers two blocks on the second."""
+
+    def __init__(self):
+        self.subscriptions = 0
+
+    async def subscribe_new_blocks(self):
+        self.subscriptions += 1
+        if self.subscriptions == 1:
+            raise ConnectionError("connection refused")
+        for height in (20, 21):
+            yield height
+
+
+def test_listener_polls_while_the_websocket_is_down(monkeypatch):
+    pipeline = block_listener.pipelines[DEFAULT_CHAIN]
+    monkeypatch.setattr(pipeline, 'ws_client', FlakyWebSocket())
+    received, polls = [], []
+
+    async def on_new_block(height):
+        received.append(height)
+    monkeypatch.setattr(pipeline, 'on_new_block', on_new_block)
+
+    async def poll_new_blocks(polled, duration):
+        polls.append(duration)
+        if len(polls) == 2:
+            raise asyncio.CancelledError
+    monkeypatch.setattr(block_listener, 'poll_new_blocks', poll_new_blocks)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(block_listener.listen_new_blocks(DEFAULT_CHAIN))
+
+    # Polled after the failure, reconnected, then polled again once the node closed the subscription;
+    # the backoff was reset by the blocks received in between.
+    assert received == [20, 21]
+    assert polls == [1, 1]
@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import DEFAULT_CHAIN
+from service.bot_commands import stop_command, view_page_callback
+
+
+class FakeCallbackQuery:
+    def __init__(self, data):
+        self.data = data
+        self.answers = []
+
+    async def answer(self, text=None):
+        self.answers.append(text)
+
+
+@pytest.mark.parametrize('data', ['view:abc:older:1', 'view:42:sideways:1', 'view:42:older', 'view:42:older:x'])
+def test_malformed_view_callback_is_answered(data):
+    query = FakeCallbackQuery(data)
+    update = SimpleNamespace(callback_query=query, effective_user=SimpleNamespace(id=42, username='test'))
+    asyncio.run(view_page_callback(update, None))
+    assert len(query.answers) == 1 and 'no longer valid' in query.answers[0]
+
+
+class FakeMessage:
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+def test_stop_with_only_a_chain_asks_for_an_address(db):
+    message = FakeMessage()
+    update = SimpleNamespace(message=message, edited_message=None,
+                             effective_user=SimpleNamespace(id=42, username='test'))
+    asyncio.run(stop_command(update, SimpleNamespace(args=[DEFAULT_CHAIN])))
+    assert message.replies == ["❌ Please provide an address or 'all' to stop monitoring."]
+
+
+def test_known_users_skip_the_users_table(db, monkeypatch):
+    from service import bot_commands
+    monkeypatch.setattr(bot_commands, 'known_users', {})
+    queries = []
+    execute_query = db.execute_query
+
+    def counting(query, params=None, commit=False, model=None):
+        queries.append(query)
+        return execute_query(query, params, commit, model)
+    monkeypatch.setattr(db, 'execute_query', counting)
+
+    user_id = bot_commands.ensure_user_exists(db, 42, 'test')
+    assert bot_commands.ensure_user_exists(db, 42, 'test') == user_id
+    assert len(queries) == 1
+    assert execute_query("SELECT COUNT(*) AS n FROM users")[0]['n'] == 1
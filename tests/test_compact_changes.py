@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from service import compact_changes
+
+
+def test_history_is_pruned_in_batches(db, monkeypatch):
+    monkeypatch.setattr(compact_changes, 'COMPACTION_BATCH_SIZE', 3)
+    monkeypatch.setattr(compact_changes, 'BATCH_PAUSE', 0)
+    validator_id = db.insert_data_and_get_id('validators', {'tendermint_address': 'A' * 40})
+    old, recent = datetime.now() - timedelta(days=1000), datetime.now()
+    db.insert_many('validator_history', [
+        {'validator_id': validator_id, 'height': height, 'recorded_at': old if height < 8 else recent}
+        for height in range(10)])
+    deletes = []
+    execute_query = db.execute_query
+
+    def counting(query, params=None, commit=False, model=None):
+        if query.startswith("DELETE"):
+            deletes.append(len(params))
+        return execute_query(query, params, commit, model)
+    monkeypatch.setattr(compact_changes.db_manager, 'execute_query', counting)
+
+    compact_changes.prune_history()
+
+    # The newest row before the cutoff stays as the baseline of the recent ones.
+    assert deletes == [3, 3, 1]
+    assert [row['height'] for row in execute_query("SELECT height FROM validator_history ORDER BY height")] == [7, 8, 9]
+
+
+def test_history_of_a_stable_validator_is_kept(db, monkeypatch):
+    monkeypatch.setattr(compact_changes, 'BATCH_PAUSE', 0)
+    stable = db.insert_data_and_get_id('validators', {'tendermint_address': 'A' * 40})
+    changed = db.insert_data_and_get_id('validators', {'tendermint_address': 'B' * 40})
+    old = datetime.now() - timedelta(days=1000)
+    db.insert_many('validator_history', [
+        {'validator_id': stable, 'height': 1, 'voting_power': 100, 'recorded_at': old},
+        {'validator_id': changed, 'height': 1, 'voting_power': 100, 'recorded_at': old},
+        {'validator_id': changed, 'height': 2, 'voting_power': 200, 'recorded_at': old}])
+
+    compact_changes.prune_history()
+
+    rows = db.execute_query("SELECT validator_id, height FROM validator_history ORDER BY validator_id, height")
+    assert [(row['validator_id'], row['height']) for row in rows] == [(stable, 1), (changed, 2)]
+
+
+def test_delivered_alerts_and_proposal_events_are_deleted(db, monkeypatch):
+    monkeypatch.setattr(compact_changes, 'BATCH_PAUSE', 0)
+    user_id = db.insert_data_and_get_id('users', {'telegram_id': '1'})
+    validator_id = db.insert_data_and_get_id('validators', {'tendermint_address': 'A' * 40})
+    subscription_id = db.insert_data_and_get_id('subscriptions', {'user_id': user_id, 'validator_id': validator_id})
+    rule_id = db.insert_data_and_get_id('alert_rules', {'subscription_id': subscription_id, 'rule_type': 'state',
+                                                        'rule_value': 'Jailed'})
+    db.insert_data('proposals', {'proposal_id': 1, 'title': 'Upgrade'})
+    old, recent = datetime.now() - timedelta(days=1000), datetime.now()
+    # Delivered and old, pending and old, delivered and recent: only the first row of each table goes.
+    for notifications_sent, change_timestamp in ((1, old), (0, old), (1, recent)):
+        db.insert_data('rule_alerts', {'rule_id': rule_id, 'validator_id': validator_id, 'detail': 'Jailed',
+                                       'change_timestamp': change_timestamp, 'notifications_sent': notifications_sent})
+        db.insert_data('proposal_events', {'proposal_id': 1, 'event_type': 'new', 'change_timestamp': change_timestamp,
+                                           'notifications_sent': notifications_sent})
+
+    compact_changes.compact_changes()
+
+    for table_name in ('rule_alerts', 'proposal_events'):
+        rows = db.execute_query(f"SELECT notifications_sent, change_timestamp FROM {table_name}")
+        assert sorted((row['notifications_sent'], row['change_timestamp'] > old) for row in rows) == [(0, False),
+                                                                                                      (1, True)]
+
+
+def test_liveness_changes_keep_their_own_archive_columns(db, monkeypatch):
+    monkeypatch.setattr(compact_changes, 'BATCH_PAUSE', 0)
+    db.execute_query("DELETE FROM validator_changes_archive", commit=True)
+    validator_id = db.insert_data_and_get_id('validators', {'tendermint_address': 'A' * 40})
+    old = datetime.now() - timedelta(days=1000)
+    db.insert_data('validator_state_changes', {'validator_id': validator_id, 'previous_state': 'Consensus',
+                                               'new_state': 'Jailed', 'change_timestamp': old, 'notifications_sent': 1})
+    db.insert_data('liveness_changes', {'validator_id': validator_id, 'missed_blocks': 40, 'window_blocks': 100,
+                                        'change_timestamp': old, 'notifications_sent': 1})
+
+    compact_changes.compact_changes()
+
+    rows = db.execute_query("SELECT source_table, previous_value, new_value, missed_blocks, window_blocks "
+                            "FROM validator_changes_archive ORDER BY source_table")
+    assert [tuple(row.values()) for row in rows] == [('liveness_changes', None, None, 40, 100),
+                                                     ('validator_state_changes', 'Consensus', 'Jailed', None, None)]
@@ -0,0 +1,44 @@
+import os
+import uuid
+
+import mysql.connector
+import pytest
+
+from db import database_manager
+from db.database_manager import DatabaseManager
+
+# The pooling test needs a MySQL server; point MYSQL_TEST_HOST (and MYSQL_TEST_USER, MYSQL_TEST_PASSWORD,
+# MYSQL_TEST_DATABASE) at a scratch database to run it.
+MYSQL_TEST_CONFIG = {
+    'host': os.getenv('MYSQL_TEST_HOST'),
+    'port': int(os.getenv('MYSQL_TEST_PORT', '3306')),
+    'user': os.getenv('MYSQL_TEST_USER', 'root'),
+    'password': os.getenv('MYSQL_TEST_PASSWORD', ''),
+    'database': os.getenv('MYSQL_TEST_DATABASE', 'namada_notify_test'),
+}
+
+
+def test_pooled_connections_autocommit(monkeypatch):
+    created = {}
+    monkeypatch.setattr(database_manager.pooling, 'MySQLConnectionPool', lambda **kwargs: created.update(kwargs))
+    DatabaseManager._create_pool('test_pool', 2, {'host': 'localhost'})
+    assert created['autocommit'] is True
+    assert created['pool_reset_session'] is False
+
+
+@pytest.mark.skipif(not MYSQL_TEST_CONFIG['host'], reason="MYSQL_TEST_HOST is not set")
+def test_pooled_read_sees_writes_committed_by_another_connection():
+    manager = object.__new__(DatabaseManager)
+    # A single pooled connection, so the second read reuses the session of the first one.
+    manager._pool = DatabaseManager._create_pool(f"test_{uuid.uuid4().hex[:8]}", 1, MYSQL_TEST_CONFIG)
+    manager.execute_query("CREATE TABLE IF NOT EXISTS pool_visibility (id INT PRIMARY KEY)", commit=True)
+    manager.execute_query("DELETE FROM pool_visibility", commit=True)
+    assert manager.execute_query("SELECT COUNT(*) AS n FROM pool_visibility")[0]['n'] == 0
+
+    with mysql.connector.connect(**MYSQL_TEST_CONFIG) as writer:
+        with writer.cursor() as cursor:
+            cursor.execute("INSERT INTO pool_visibility (id) VALUES (1)")
+        writer.commit()
+
+    assert manager.execute_query("SELECT COUNT(*) AS n FROM pool_visibility")[0]['n'] == 1
+    manager.execute_query("DROP TABLE pool_visibility", commit=True)
@@ -0,0 +1,52 @@
+import pytest
+
+from service import init_database
+
+
+def test_failed_migration_resumes_at_the_failed_step(db, monkeypatch):
+    # Take the schema back to version 4: drop what migrations 5 to 7 added.
+    for column in ('missed_blocks', 'window_blocks'):
+        db.execute_query(f"ALTER TABLE validator_changes_archive DROP COLUMN {column}", commit=True)
+    for index_name in ('idx_validators_chain_tm', 'idx_validators_chain_address', 'idx_subscriptions_user_id'):
+        db.execute_query(f"DROP INDEX {index_name}", commit=True)
+    db.execute_query("ALTER TABLE validators DROP COLUMN chain_id", commit=True)
+    init_database.set_schema_version(db, 4)
+
+    def fail(db_manager):
+        raise RuntimeError("migration failed")
+    monkeypatch.setitem(init_database.MIGRATIONS, 6, fail)
+    with pytest.raises(RuntimeError):
+        init_database.init_database()
+    assert init_database.get_schema_version(db) == 5
+
+    # The next boot only runs the step that failed; migration 5 cannot add its column twice.
+    monkeypatch.undo()
+    init_database.init_database()
+    assert init_database.get_schema_version(db) == init_database.SCHEMA_VERSION
+
+
+def test_schema_version_errors_are_not_hidden(db, monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("database unreachable")
+    monkeypatch.setattr(db, 'execute_query', unreachable)
+    with pytest.raises(ConnectionError):
+        init_database.get_schema_version(db)
+
+
+def test_archived_liveness_changes_move_to_their_own_columns(db):
+    db.execute_query("DELETE FROM validator_changes_archive", commit=True)
+    for column in ('missed_blocks', 'window_blocks'):
+        db.execute_query(f"ALTER TABLE validator_changes_archive DROP COLUMN {column}", commit=True)
+    db.insert_many('validator_changes_archive', [
+        {'source_table': 'liveness_changes', 'change_id': 1, 'validator_id': 1, 'previous_value': '40',
+         'new_value': '100'},
+        {'source_table': 'commission_rate_changes', 'change_id': 1, 'validator_id': 1, 'previous_value': '0.05',
+         'new_value': '0.1'}])
+
+    with db.transaction():
+        init_database.add_liveness_archive_columns(db)
+
+    rows = db.execute_query("SELECT source_table, previous_value, new_value, missed_blocks, window_blocks "
+                            "FROM validator_changes_archive ORDER BY source_table")
+    assert [tuple(row.values()) for row in rows] == [('commission_rate_changes', '0.05', '0.1', None, None),
+                                                     ('liveness_changes', None, None, 40, 100)]
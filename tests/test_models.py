@@ -0,0 +1,34 @@
+import tracemalloc
+
+from db.models import ValidatorRecord
+
+COLUMNS = ValidatorRecord.__slots__
+
+
+def rows(count):
+    return [(index, 'namada', f"tnam1q{index:039x}", f"{index:040X}", 1000 + index, f"ops{index}@example.com",
+             None, None, None, None, 0.05, 0.01, 'Consensus') for index in range(count)]
+
+
+def allocated(build):
+    tracemalloc.start()
+    try:
+        built = build()
+        return tracemalloc.get_traced_memory()[0], built
+    finally:
+        tracemalloc.stop()
+
+
+def test_records_are_built_from_cursor_rows():
+    record = ValidatorRecord.from_columns(COLUMNS + ('extra',), rows(1)[0] + ('ignored',))
+    assert record.tendermint_address == f"{0:040X}" and record.state == 'Consensus'
+    assert not hasattr(record, '__dict__')
+    assert ValidatorRecord.from_row(record.as_dict()) == record
+
+
+def test_records_stay_smaller_than_dict_rows():
+    values = rows(2000)
+    dict_size, _ = allocated(lambda: [dict(zip(COLUMNS, row)) for row in values])
+    record_size, _ = allocated(lambda: [ValidatorRecord.from_columns(COLUMNS, row) for row in values])
+    # About a third with 13 columns; a __dict__ slipping back in would make them as large as the dicts.
+    assert record_size < dict_size / 2
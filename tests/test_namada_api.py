@@ -0,0 +1,60 @@
+import base64
+import json
+
+import pytest
+
+from nam_lib.namada_api import NamadaAPI
+from structs.basic import ValidatorMetaData
+from structs.bech32m import bech32m_encode
+
+METADATA = {'email': 'ops@example.com', 'description': None, 'website': 'https://example.com',
+            'discord_handle': 'ops#1', 'avatar': None}
+
+
+class StubResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode()
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def node(monkeypatch):
+    """Answers every request with the payload stored under node['payload']."""
+    state = {}
+    monkeypatch.setattr('requests.Session.request',
+                        lambda session, method, url, **kwargs: StubResponse(state['payload']))
+    return state
+
+
+def abci_value(value):
+    return {'jsonrpc': '2.0', 'id': '1', 'result': {'response': {
+        'code': 0, 'info': '', 'value': base64.b64encode(value).decode() if value else None}}}
+
+
+def test_metadata_is_decoded_in_place(node):
+    node['payload'] = abci_value(b'\x01' + ValidatorMetaData.build(METADATA))
+    assert NamadaAPI('http://node').get_validator_metadata('tnam1q').data == METADATA
+
+
+def test_validator_address_matches_the_byte_list_encoding(node):
+    payload = bytes(range(1, 22))
+    node['payload'] = abci_value(b'\x01\x00' + payload)
+    address = NamadaAPI('http://node').get_validator_from_tm('A' * 40).data
+    assert address == bech32m_encode('tnam', [1] + list(payload))
+
+
+def test_missing_value_returns_the_node_info(node):
+    node['payload'] = {'result': {'response': {'code': 1, 'info': 'not found', 'value': None}}}
+    result = NamadaAPI('http://node').get_validator_metadata('tnam1q')
+    assert not result.success and result.error == 'not found'
+
+
+def test_latest_height_reads_sync_info(node):
+    node['payload'] = {'result': {'sync_info': {'latest_block_height': '42', 'catching_up': False}}}
+    assert NamadaAPI('http://node').get_latest_height().data == '42'
+    node['payload'] = {'result': {'sync_info': {'latest_block_height': '42', 'catching_up': True}}}
+    assert not NamadaAPI('http://node').get_latest_height().success
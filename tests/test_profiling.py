@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+from nam_lib import spans
+from service import profiling
+
+
+def test_rpc_library_imports_without_the_service_package():
+    code = "import sys, nam_lib.namada_api; print(sorted({name.split('.')[0] for name in sys.modules} & {'service', 'db'}))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == '[]'
+
+
+def test_rpc_spans_are_recorded_in_the_current_cycle(monkeypatch):
+    monkeypatch.setattr(spans, 'PROFILING', True)
+    assert profiling.span is spans.span
+    collector = profiling.SpanCollector('update_database')
+    token = profiling.current_cycle.set(collector)
+    try:
+        with spans.span('rpc.status'):
+            pass
+    finally:
+        profiling.current_cycle.reset(token)
+    with spans.span('command.status'):
+        pass
+
+    assert list(collector.drain()) == ['rpc.status']
+    assert list(profiling.take_background().drain()) == ['command.status']
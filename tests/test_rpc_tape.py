@@ -0,0 +1,59 @@
+import gzip
+import json
+
+from nam_lib import client
+from nam_lib.client import NamHTTPClient
+from nam_lib.rpc_tape import RpcTape
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode()
+
+    def raise_for_status(self):
+        pass
+
+
+def record_status_calls(monkeypatch, path, heights):
+    monkeypatch.setattr(client, 'tape', RpcTape(mode='record', path=path))
+    responses = iter(FakeResponse({'height': height}) for height in heights)
+    rpc = NamHTTPClient('http://node:26657')
+    monkeypatch.setattr(rpc.session, 'request', lambda *args, **kwargs: next(responses))
+    for _ in heights:
+        assert rpc.send_request('status').success
+    client.tape.close()
+
+
+def replay_status_calls(monkeypatch, path, count):
+    monkeypatch.setattr(client, 'tape', RpcTape(mode='replay', path=path, delay_percent=0))
+    rpc = NamHTTPClient('http://node:26657')
+    return [rpc.send_request('status').data['height'] for _ in range(count)]
+
+
+def test_recorded_responses_are_replayed_in_order(tmp_path, monkeypatch):
+    path = str(tmp_path / 'tape.jsonl')
+    record_status_calls(monkeypatch, path, ['1', '2'])
+    # The last response is repeated once the others are used up.
+    assert replay_status_calls(monkeypatch, path, 3) == ['1', '2', '2']
+
+
+def test_truncated_last_record_is_skipped(tmp_path, monkeypatch):
+    path = str(tmp_path / 'tape.jsonl')
+    record_status_calls(monkeypatch, path, ['1', '2'])
+    # A recorder killed while writing its third record.
+    with open(path, 'a', encoding='utf-8') as tape_file:
+        tape_file.write('{"k":"GET http://node:26657/status","t":0.1,"s":200,"b":"{\\"hei')
+    assert replay_status_calls(monkeypatch, path, 3) == ['1', '2', '2']
+
+
+def test_gzip_tape_without_end_marker_is_replayed(tmp_path, monkeypatch):
+    path = str(tmp_path / 'tape.jsonl')
+    lines = "".join(json.dumps({'k': 'GET http://node:26657/status', 't': 0.1, 's': 200,
+                                'b': json.dumps({'height': height}), 'e': None}) + '\n' for height in ('1', '2'))
+    compressed = gzip.compress(lines.encode())
+    with open(path, 'wb') as tape_file:
+        # Cut off the gzip trailer, as when the recording process is killed before closing the stream.
+        tape_file.write(compressed[:-8])
+    assert replay_status_calls(monkeypatch, path, 2) == ['1', '2']
@@ -0,0 +1,51 @@
+from db.models import ValidatorRecord
+from service.search_index import SearchIndex
+
+
+def validator(validator_id, voting_power, email='', description=''):
+    return ValidatorRecord(validator_id=validator_id, chain_id='namada',
+                           validator_address=f"tnam1q{validator_id:039d}", tendermint_address=f"{validator_id:040X}",
+                           voting_power=voting_power, email=email, description=description, state='Consensus')
+
+
+def ids(records):
+    return [record.validator_id for record in records]
+
+
+def build(records):
+    index = SearchIndex()
+    index.rebuild(records)
+    return index
+
+
+def test_broad_query_ranks_field_start_then_voting_power():
+    # Most validators match, so the ranking walk answers the query.
+    records = [validator(i, i, email=f"ops{i}@example.com") for i in range(1, 41)]
+    records.append(validator(41, 1, email="comms@example.org"))
+    index = build(records)
+    assert ids(index.search('com', limit=4)) == [41, 40, 39, 38]
+    assert ids(index.search('example', limit=3)) == [40, 39, 38]
+
+
+def test_selective_query_and_typo():
+    index = build([validator(1, 10, description="Reliable staking"), validator(2, 20, description="Secure node"),
+                   validator(3, 30, description="Staking services")])
+    assert ids(index.search('staking')) == [3, 1]
+    # Both share two of the four trigrams of the misspelling.
+    assert sorted(ids(index.search('stakng'))) == [1, 3]
+
+
+def test_address_prefix_shared_by_every_validator_is_ignored():
+    index = build([validator(i, i) for i in range(1, 30)])
+    assert index.search('tnam1q') == []
+    assert ids(index.search(f"tnam1q{7:039d}")) == [7]
+    assert ids(index.search(f"{12:040X}"[:38] + "0C")) == [12]
+    assert len(index.search('tnam1q000', limit=5)) == 5
+
+
+def test_update_reindexes_changed_records():
+    index = build([validator(1, 10, email="old@example.com"), validator(2, 20)])
+    index.update([validator(1, 50, email="new@example.org")])
+    assert index.search('old@') == []
+    assert ids(index.search('example')) == [1]
+    assert ids(index.search('tnam1q0')) == [1, 2]
@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_settings(**env):
+    """Import config.settings in a fresh interpreter with `env` added, as the bot does at start."""
+    code = "from config.settings import CHAINS, DEFAULT_CHAIN; print(DEFAULT_CHAIN, sorted(CHAINS))"
+    return subprocess.run([sys.executable, '-c', code], env={**os.environ, **env}, cwd=ROOT, capture_output=True,
+                          text=True)
+
+
+def test_valid_chain_names_are_accepted():
+    result = load_settings(NAMADA_CHAINS='mainnet=https://rpc.example.com,housefire-test.1=http://node:26657')
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[0] == 'mainnet'
+
+
+@pytest.mark.parametrize('chains, name', [
+    ('a-chain-name-over-16=http://node:26657', 'a-chain-name-over-16'),
+    ("main'net=http://node:26657", "main'net"),
+    ('main net=http://node:26657', 'main net'),
+])
+def test_invalid_chain_names_fail_at_load(chains, name):
+    result = load_settings(NAMADA_CHAINS=chains)
+    assert result.returncode != 0
+    assert f"Invalid chain name {name!r}" in result.stderr
+
+
+def test_invalid_single_chain_name_fails_at_load():
+    result = load_settings(NAMADA_CHAINS='', CHAIN_NAME="x');DROP")
+    assert result.returncode != 0
+    assert "Invalid chain name" in result.stderr
@@ -0,0 +1,37 @@
+import sqlite3
+import threading
+
+import pytest
+
+from db.sqlite_manager import SQLiteDatabaseManager
+
+
+def test_failed_begin_is_raised_instead_of_hanging(db):
+    manager = SQLiteDatabaseManager._instance
+    # Leave the writer connection inside a transaction, so the next BEGIN IMMEDIATE fails.
+    manager._submit(lambda conn: conn.execute("BEGIN")).result()
+    outcome = []
+
+    def write():
+        try:
+            with manager.transaction() as tx:
+                tx.execute("SELECT 1")
+            outcome.append(None)
+        except sqlite3.Error as e:
+            outcome.append(e)
+    try:
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive(), "transaction() hung after a failed BEGIN"
+        assert isinstance(outcome[0], sqlite3.OperationalError)
+    finally:
+        manager._submit(lambda conn: conn.execute("ROLLBACK")).result()
+
+
+def test_statement_error_rolls_back_the_transaction(db):
+    with pytest.raises(sqlite3.Error):
+        with db.transaction() as tx:
+            tx.execute("INSERT INTO users (telegram_id, telegram_name) VALUES ('1', 'a')")
+            tx.execute("INSERT INTO no_such_table VALUES (1)")
+    assert db.execute_query("SELECT COUNT(*) AS users FROM users")[0]['users'] == 0
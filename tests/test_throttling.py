@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from service import throttling
+from service.throttling import RateLimiter, RequestCoalescer, rate_limited
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_burst_then_refill(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(throttling.time, 'monotonic', clock)
+    limiter = RateLimiter(rate_per_minute=60, burst=3)
+
+    # The burst passes, the first throttled command is reported, later ones are dropped silently.
+    assert [limiter.acquire(1) for _ in range(5)] == [True, True, True, False, None]
+    assert limiter.acquire(2) is True
+    clock.now += 1
+    assert limiter.acquire(1) is True
+    assert limiter.acquire(1) is False
+    clock.now += 60
+    assert [limiter.acquire(1) for _ in range(4)] == [True, True, True, False]
+
+
+def test_idle_users_are_pruned(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(throttling.time, 'monotonic', clock)
+    limiter = RateLimiter(rate_per_minute=60, burst=2, max_users=2)
+    limiter.acquire(1)
+    limiter.acquire(1)
+    clock.now += 10
+    limiter.acquire(2)
+    limiter.acquire(3)
+    # User 1 refilled completely and was forgotten; user 2 is still draining.
+    assert set(limiter._buckets) == {2, 3}
+
+
+class FakeMessage:
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+def test_throttled_command_is_answered_once(monkeypatch):
+    monkeypatch.setattr(throttling, 'rate_limiter', RateLimiter(rate_per_minute=1, burst=1))
+    handled = []
+
+    async def status_command(update, context):
+        handled.append(update)
+    message = FakeMessage()
+    update = SimpleNamespace(effective_user=SimpleNamespace(id=7), callback_query=None, effective_message=message)
+
+    async def send(count):
+        for _ in range(count):
+            await rate_limited(status_command)(update, None)
+    asyncio.run(send(3))
+
+    assert len(handled) == 1
+    assert len(message.replies) == 1 and 'Too many commands' in message.replies[0]
+
+
+def test_concurrent_lookups_of_a_key_share_one_call():
+    coalescer = RequestCoalescer()
+    release = threading.Event()
+    calls = []
+
+    def lookup(address):
+        calls.append(address)
+        release.wait(5)
+        return f"validator {address}"
+
+    async def scenario():
+        first = asyncio.ensure_future(coalescer.run('A', lookup, 'A'))
+        cancelled = asyncio.ensure_future(coalescer.run('A', lookup, 'A'))
+        other = asyncio.ensure_future(coalescer.run('B', lookup, 'B'))
+        await asyncio.sleep(0.05)
+        # A caller that goes away does not cancel the lookup the others are waiting for.
+        cancelled.cancel()
+        release.set()
+        results = await asyncio.gather(first, other)
+        # Once done, the next caller runs a fresh lookup.
+        return results, await coalescer.run('A', lookup, 'A')
+    (first, other), again = asyncio.run(scenario())
+
+    assert (first, other, again) == ('validator A', 'validator B', 'validator A')
+    assert sorted(calls) == ['A', 'A', 'B']
@@ -0,0 +1,24 @@
+from service.track_liveness import LivenessTracker
+
+
+def record_blocks(tracker, heights, missed_by):
+    for height in heights:
+        tracker.record(height, 'A', True)
+        tracker.record(height, 'B', missed_by is None or height not in missed_by)
+
+
+def test_no_alert_before_min_blocks():
+    tracker = LivenessTracker(None, window=10, miss_threshold=10, min_blocks=5)
+    record_blocks(tracker, [1], missed_by={1})
+    assert tracker.collect_alerts() == []
+
+    record_blocks(tracker, range(2, 6), missed_by=set())
+    assert tracker.collect_alerts() == [('B', 1, 5)]
+    # Reported once until the miss rate drops back below the threshold.
+    assert tracker.collect_alerts() == []
+
+
+def test_min_blocks_is_capped_at_the_window():
+    tracker = LivenessTracker(None, window=4, miss_threshold=50, min_blocks=100)
+    record_blocks(tracker, range(1, 5), missed_by={1, 2})
+    assert tracker.collect_alerts() == [('B', 2, 4)]
@@ -0,0 +1,95 @@
+import pytest
+
+from config.settings import DEFAULT_CHAIN
+from service import update_database
+from service.alert_rules import rule_engine
+from service.refresh_tiers import RefreshTiers, subscription_index
+from tests.conftest import FakeNamadaAPI
+
+VALIDATORS = [('A' * 40, 10), ('B' * 40, 20)]
+
+
+@pytest.fixture
+def namada_api(db, monkeypatch):
+    api = FakeNamadaAPI(VALIDATORS)
+    monkeypatch.setitem(update_database.namada_apis, DEFAULT_CHAIN, api)
+    monkeypatch.setattr(update_database, 'refresh_tiers', RefreshTiers())
+    # The first validator is monitored, so its commission changes are recorded.
+    update_database.update_database()
+    user_id = db.insert_data_and_get_id('users', {'telegram_id': '1', 'telegram_name': 'test'})
+    validator_id = db.execute_query("SELECT validator_id FROM validators WHERE tendermint_address = %s",
+                                    (VALIDATORS[0][0],))[0]['validator_id']
+    db.insert_data('subscriptions', {'user_id': user_id, 'validator_id': validator_id})
+    subscription_index.invalidate()
+    rule_engine.invalidate()
+    return api
+
+
+def commission_changes(db):
+    return db.execute_query("SELECT previous_rate, new_rate FROM commission_rate_changes")
+
+
+def test_second_cycle_runs_after_checkpoint(db, namada_api):
+    job_queue = update_database.job_queues[DEFAULT_CHAIN]
+    assert job_queue.get_checkpoint() == 100
+
+    namada_api.height = '101'
+    namada_api.commission['tnam1q' + 'a' * 40] = 0.07
+    update_database.update_database()
+
+    assert job_queue.get_checkpoint() == 101
+    assert [round(row['new_rate'], 2) for row in commission_changes(db)] == [0.07]
+    assert db.execute_query("SELECT COUNT(*) AS pending FROM work_items")[0]['pending'] == 0
+
+
+def test_interrupted_batch_is_recorded_when_rerun(db, namada_api, monkeypatch):
+    namada_api.height = '101'
+    namada_api.commission['tnam1q' + 'a' * 40] = 0.07
+
+    def crash(*args):
+        raise RuntimeError("worker died")
+    monkeypatch.setattr(update_database.rule_engine, 'evaluate', crash)
+    with pytest.raises(RuntimeError):
+        update_database.update_database()
+    # Nothing of the batch was committed, so the stored commission is still the old one.
+    assert commission_changes(db) == []
+    assert db.execute_query("SELECT commission_rate FROM validators WHERE tendermint_address = %s",
+                            (VALIDATORS[0][0],))[0]['commission_rate'] == pytest.approx(0.05)
+
+    monkeypatch.undo()
+    monkeypatch.setitem(update_database.namada_apis, DEFAULT_CHAIN, namada_api)
+    # The lease of the crashed batch is still held; let it expire.
+    db.execute_query("UPDATE work_items SET lease_expires = NULL", commit=True)
+    update_database.update_database()
+
+    assert [round(row['new_rate'], 2) for row in commission_changes(db)] == [0.07]
+    assert update_database.job_queues[DEFAULT_CHAIN].get_checkpoint() == 101
+
+
+def test_subscription_written_elsewhere_is_picked_up(db, namada_api):
+    subscription_index.validator_ids(db)
+    # Another instance subscribes to the second validator; this process is never told.
+    user_id = db.execute_query("SELECT user_id FROM users")[0]['user_id']
+    validator_id = db.execute_query("SELECT validator_id FROM validators WHERE tendermint_address = %s",
+                                    (VALIDATORS[1][0],))[0]['validator_id']
+    db.insert_data('subscriptions', {'user_id': user_id, 'validator_id': validator_id})
+
+    namada_api.height = '101'
+    namada_api.commission['tnam1q' + 'b' * 40] = 0.08
+    update_database.update_database()
+
+    assert [round(row['new_rate'], 2) for row in commission_changes(db)] == [0.08]
+
+
+def test_rule_written_elsewhere_fires(db, namada_api):
+    rule_engine.evaluate(db, [])
+    # Another instance adds an alert rule to the existing subscription.
+    subscription_id = db.execute_query("SELECT id FROM subscriptions")[0]['id']
+    db.insert_data('alert_rules', {'subscription_id': subscription_id, 'rule_type': 'commission_near',
+                                   'rule_value': '0'})
+
+    namada_api.height = '101'
+    namada_api.commission['tnam1q' + 'a' * 40] = 0.07
+    update_database.update_database()
+
+    assert len(db.execute_query("SELECT alert_id FROM rule_alerts")) == 1
@@ -0,0 +1,66 @@
+import pytest
+
+from nam_lib.result import Result
+from service import update_proposals
+
+
+class FakeGovernanceAPI:
+    """Serves proposals 0..count-1, each voting from epoch 5 to epoch 10."""
+
+    def __init__(self, count):
+        self.count = count
+        self.epoch = 1
+
+    def get_current_epoch(self):
+        return Result(True, self.epoch)
+
+    def get_proposal(self, proposal_id):
+        if proposal_id >= self.count:
+            return Result(True, None)
+        return Result(True, {'id': proposal_id, 'author': 'tnam1qauthor', 'type': 'Default',
+                             'content': {'title': f"Proposal {proposal_id}"}, 'voting_start_epoch': 5,
+                             'voting_end_epoch': 10, 'grace_epoch': 12})
+
+
+@pytest.fixture
+def node(db, monkeypatch):
+    api = FakeGovernanceAPI(3)
+    monkeypatch.setattr(update_proposals, 'namada_api', api)
+    return api
+
+
+def events(db):
+    rows = db.execute_query("SELECT proposal_id, event_type FROM proposal_events ORDER BY event_id")
+    return sorted((row['proposal_id'], row['event_type']) for row in rows)
+
+
+def overlapped_by_another_run(monkeypatch):
+    """Make the next update_proposals() find another run committing between its fetch and its transaction."""
+    fetch = update_proposals.fetch_new_proposals
+
+    def fetch_then_overlap(next_id):
+        proposals = fetch(next_id)
+        monkeypatch.setattr(update_proposals, 'fetch_new_proposals', fetch)
+        update_proposals.update_proposals()
+        return proposals
+    monkeypatch.setattr(update_proposals, 'fetch_new_proposals', fetch_then_overlap)
+
+
+def test_overlapping_runs_store_new_proposals_once(db, node, monkeypatch):
+    overlapped_by_another_run(monkeypatch)
+    update_proposals.update_proposals()
+
+    assert db.execute_query("SELECT COUNT(*) AS n FROM proposals")[0]['n'] == 3
+    assert events(db) == [(0, 'new'), (1, 'new'), (2, 'new')]
+
+
+def test_overlapping_runs_emit_status_changes_once(db, node, monkeypatch):
+    update_proposals.update_proposals()
+    node.epoch = 6
+    overlapped_by_another_run(monkeypatch)
+    update_proposals.update_proposals()
+
+    assert events(db) == [(proposal_id, event_type) for proposal_id in range(3)
+                          for event_type in ('new', 'voting_started')]
+    statuses = db.execute_query("SELECT DISTINCT status FROM proposals")
+    assert [row['status'] for row in statuses] == ['voting']
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from service import webhook_server
+from service.snapshot import snapshot
+
+UPDATE = {'update_id': 7, 'message': {'message_id': 1, 'date': 0, 'chat': {'id': 1, 'type': 'private'},
+                                      'text': '/status'}}
+
+
+class FakeApplication:
+    bot = None
+
+    def __init__(self):
+        self.update_queue = asyncio.Queue()
+
+
+@pytest.fixture
+def tls_context(tmp_path):
+    """Server context with a throwaway self-signed certificate for 127.0.0.1."""
+    if shutil.which('openssl') is None:
+        pytest.skip("openssl is not installed")
+    cert, key = str(tmp_path / 'cert.pem'), str(tmp_path / 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj', '/CN=127.0.0.1',
+                    '-keyout', key, '-out', cert], check=True, capture_output=True)
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def tls_proxy(backend_url):
+    """Stand-in for the reverse proxy of a deployment: terminates TLS and forwards plain HTTP to the bot."""
+
+    async def forward(request):
+        headers = {name: value for name, value in request.headers.items() if name.lower() != 'host'}
+        async with aiohttp.ClientSession() as session:
+            async with session.request(request.method, f"{backend_url}{request.path_qs}", headers=headers,
+                                       data=await request.read()) as response:
+                return web.Response(status=response.status, body=await response.read(),
+                                    content_type=response.content_type)
+
+    app = web.Application()
+    app.router.add_route('*', '/{path:.*}', forward)
+    return app
+
+
+def run_through_proxy(tls_context, requests):
+    """Serve the webhook app behind the TLS proxy, send `requests` over HTTPS and return the responses."""
+    application = FakeApplication()
+
+    async def scenario():
+        async with TestServer(webhook_server.create_web_app(application)) as backend:
+            proxy = TestServer(tls_proxy(str(backend.make_url('')).rstrip('/')))
+            await proxy.start_server(ssl=tls_context)
+            try:
+                responses = []
+                async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False)) as session:
+                    for method, path, kwargs in requests:
+                        async with session.request(method, proxy.make_url(path), **kwargs) as response:
+                            responses.append((response.status, await response.text()))
+                return responses
+            finally:
+                await proxy.close()
+    responses = asyncio.run(scenario())
+    return responses, application.update_queue
+
+
+def test_updates_with_the_secret_token_are_queued(tls_context, monkeypatch):
+    monkeypatch.setattr(webhook_server, 'WEBHOOK_SECRET', 'secret')
+    responses, queue = run_through_proxy(tls_context, [
+        ('POST', '/telegram', {'json': UPDATE, 'headers': {'X-Telegram-Bot-Api-Secret-Token': 'secret'}}),
+        ('POST', '/telegram', {'json': UPDATE, 'headers': {'X-Telegram-Bot-Api-Secret-Token': 'wrong'}}),
+        ('POST', '/telegram', {'json': UPDATE}),
+        ('POST', '/telegram', {'data': 'not json', 'headers': {'X-Telegram-Bot-Api-Secret-Token': 'secret'}}),
+    ])
+    assert [status for status, _ in responses] == [200, 403, 403, 400]
+    assert queue.qsize() == 1
+    assert queue.get_nowait().update_id == 7
+
+
+def test_health_reports_the_snapshot_and_metrics_are_served(tls_context, monkeypatch):
+    monkeypatch.setattr(snapshot, 'loaded', False)
+    starting, _ = run_through_proxy(tls_context, [('GET', '/health', {})])[0][0]
+    monkeypatch.setattr(snapshot, 'loaded', True)
+    responses, _ = run_through_proxy(tls_context, [('GET', '/health', {}), ('GET', '/metrics', {})])
+    (ready, health), (metrics_status, _) = responses
+    assert (starting, ready) == (503, 200)
+    assert '"status": "ok"' in health
+    assert metrics_status == 200
+
+
+@pytest.mark.parametrize('webhook_url', [None, 'http://bot.example.com'])
+def test_webhook_mode_requires_an_https_url(webhook_url):
+    env = {name: value for name, value in os.environ.items() if name != 'WEBHOOK_URL'}
+    env['BOT_MODE'] = 'webhook'
+    if webhook_url:
+        env['WEBHOOK_URL'] = webhook_url
+    result = subprocess.run([sys.executable, '-c', 'import config.settings'], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.returncode != 0
+    assert "BOT_MODE=webhook needs WEBHOOK_URL" in result.stderr
@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import pytest
+import websockets
+
+from nam_lib.ws_client import NamWebSocketClient, websocket_url
+
+
+def new_block(height):
+    return json.dumps({'jsonrpc': '2.0', 'id': '1', 'result': {'query': "tm.event='NewBlock'", 'data': {
+        'type': 'tendermint/event/NewBlock', 'value': {'block': {'header': {'height': str(height)}}}}}})
+
+
+def serve_and_collect(messages):
+    """Run a CometBFT websocket stand-in sending `messages` after the subscribe request; collect the heights."""
+    requests = []
+
+    async def handler(ws):
+        requests.append(json.loads(await ws.recv()))
+        for message in messages:
+            await ws.send(message)
+
+    async def scenario():
+        async with websockets.serve(handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = NamWebSocketClient(f"http://127.0.0.1:{port}")
+            return [height async for height in client.subscribe_new_blocks()]
+    return asyncio.run(scenario()), requests
+
+
+def test_websocket_url_follows_the_rpc_scheme():
+    assert websocket_url('http://node:26657') == 'ws://node:26657/websocket'
+    assert websocket_url('https://rpc.example.com/namada/') == 'wss://rpc.example.com/namada/websocket'
+
+
+def test_block_heights_are_yielded_until_the_node_closes():
+    acknowledgement = json.dumps({'jsonrpc': '2.0', 'id': '1', 'result': {}})
+    heights, requests = serve_and_collect([acknowledgement, new_block(10), new_block(11)])
+    assert heights == [10, 11]
+    assert requests[0]['method'] == 'subscribe'
+    assert requests[0]['params'] == {'query': "tm.event='NewBlock'"}
+
+
+def test_rejected_subscription_raises():
+    with pytest.raises(ConnectionError):
+        serve_and_collect([json.dumps({'jsonrpc': '2.0', 'id': '1', 'error': {'message': 'too many subscriptions'}})])